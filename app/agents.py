@@ -0,0 +1,174 @@
+# agents.py
+"""Player agents: what answers the human seat's prompts.
+
+Game.steps yields Prompt(actions, kind, seat) whenever the human seat has
+to answer; kind is 'bet', 'insurance', 'action' or 'continue' (the Enter
+between rounds). Game hands each prompt to its agent, anything with
+act(prompt, game) -> str:
+
+    ScriptedAgent   answers from a list, or per kind from iterables
+    StrategyAgent   plays a strategy table (basic by default) at a flat bet
+    RemoteAgent     forwards prompts to a client as JSON lines (server.py's protocol,
+                    whose messages prompt_message and the codec below build)
+    HumanAgent      asks through the game's UI
+
+Without an agent Game keeps its old behaviour: human_actions are answered
+in order, then the UI is asked (or RuntimeError raised when headless).
+
+run_human_rounds drives the full interactive path (human bets, prompts,
+insurance, pauses, Enter between rounds) with no terminal and no sleeps:
+
+    game, seconds = run_human_rounds(100_000)
+"""
+import json
+import random
+import socket
+import time
+from itertools import cycle, repeat
+from typing import Dict, Iterable, List, Optional, Union
+
+from analysis import unseen_counts
+
+
+class HumanAgent:
+    def act(self, prompt, game) -> str:
+        return game.ui.prompt_for_action(prompt.actions)
+
+
+class ScriptedAgent:
+    # answers is one iterable consumed in order, or a dict of iterables by
+    # prompt kind. When a script runs out the fallback agent answers;
+    # without one that is an error.
+    def __init__(self, answers: Union[Iterable[str], Dict[str, Iterable[str]]],
+                 fallback: Optional[object] = None):
+        if isinstance(answers, dict):
+            self._by_kind = {kind: iter(script) for kind, script in answers.items()}
+            self._script = None
+        else:
+            self._by_kind = None
+            self._script = iter(answers)
+        self.fallback = fallback
+
+    def act(self, prompt, game) -> str:
+        script = self._script if self._by_kind is None else self._by_kind.get(prompt.kind)
+        if script is not None:
+            for answer in script:
+                return answer.lower()
+        if self.fallback is None:
+            raise RuntimeError("No human actions available")
+        return self.fallback.act(prompt, game)
+
+
+class StrategyAgent:
+    def __init__(self, strategy='basic', bet: int = 10, rng=None):
+        if strategy is None or isinstance(strategy, str):
+            from strategy import load_strategy
+            strategy = load_strategy(strategy or 'basic')
+        self.strategy = strategy
+        self.bet = str(bet)
+        self.rng = rng if rng is not None else random
+
+    def act(self, prompt, game) -> str:
+        if prompt.kind == 'bet':
+            return self.bet
+        if prompt.kind == 'insurance':
+            return 'n'
+        if prompt.kind != 'action':
+            return ''
+        actions = prompt.actions
+        hand = game.players[prompt.seat].hand
+        dealer_hand = game.dealer_hand
+        action = self.strategy.decide(hand, dealer_hand.cards[1], 'double down' in actions,
+                                      'split' in actions, self.rng,
+                                      unseen=lambda: unseen_counts(game.deck, dealer_hand),
+                                      can_surrender='surrender' in actions, rules=game.rules)
+        return action if action in actions else 'stand'
+
+
+def encode_message(message: Dict) -> bytes:
+    return json.dumps(message, ensure_ascii=False).encode() + b'\n'
+
+
+def decode_message(line: bytes) -> Optional[Dict]:
+    # None for anything but a JSON object
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
+
+
+def dealer_cards(hand, hide_hole: bool) -> List[str]:
+    # The dealer's cards as the table sees them; the hole card is dealt first
+    if hand is None:
+        return []
+    cards = [str(card) for card in hand.cards]
+    if hide_hole and cards:
+        cards[0] = "🂠"
+    return cards
+
+
+def prompt_message(prompt, player, dealer: List[str]) -> Dict:
+    return {
+        'type': 'prompt',
+        'kind': prompt.kind,
+        'actions': prompt.actions,
+        'balance': player.balance,
+        'hands': [[str(card) for card in hand.cards] for hand in player.hands],
+        'dealer': dealer,
+    }
+
+
+class RemoteAgent:
+    # Sends {"type": "prompt", ...} lines and reads {"action": ...} answers;
+    # rfile and wfile are binary file objects, e.g. from socket.makefile.
+    # The hole card shows only once the player's turn is over.
+    def __init__(self, rfile, wfile):
+        self.rfile = rfile
+        self.wfile = wfile
+
+    @classmethod
+    def connect(cls, host: str, port: int) -> 'RemoteAgent':
+        sock = socket.create_connection((host, port))
+        return cls(sock.makefile('rb'), sock.makefile('wb'))
+
+    def act(self, prompt, game) -> str:
+        dealer = dealer_cards(game.dealer_hand, prompt.kind in ('insurance', 'action'))
+        self.wfile.write(encode_message(prompt_message(prompt, game.players[prompt.seat], dealer)))
+        self.wfile.flush()
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError('remote player left the table')
+        message = decode_message(line)
+        if message is None:
+            raise ConnectionError('remote player sent something other than a JSON object')
+        return str(message.get('action', '')).lower()
+
+
+def run_human_rounds(rounds: int, agent=None, num_bots: int = 0, num_decks: int = 6,
+                     seed: int = 0, ui='null', **game_kwargs):
+    """Play rounds through the interactive path; returns (game, seconds).
+
+    The default agent is scripted: a $10 bet, no insurance and a fixed
+    hit/stand cycle, so every prompt kind is exercised without a strategy.
+    """
+    from app import Game
+    from clock import Clock
+    if agent is None:
+        agent = ScriptedAgent({'bet': repeat('10'), 'insurance': repeat('n'),
+                               'action': cycle(['hit', 'stand', 'stand']), 'continue': repeat('')})
+    game_kwargs.setdefault('starting_balance', 10 ** 9)
+    game_kwargs.setdefault('clock', Clock('instant'))
+    game = Game(num_decks, num_bots, interactive=True, ui=ui, rng=random.Random(seed),
+                agent=agent, **game_kwargs)
+    start = time.perf_counter()
+    game.play(max_rounds=rounds)
+    return game, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    import sys
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    game, seconds = run_human_rounds(rounds)
+    print(f'{game.rounds_played:,} human rounds in {seconds:.2f}s '
+          f'({game.rounds_played / seconds:,.0f} rounds/sec); outcomes {dict(game.players[0].outcomes)}')
@@ -0,0 +1,275 @@
+# analysis.py
+"""Exact dealer outcome probabilities for a given up-card and shoe.
+
+Shoe compositions are rank-count vectors: a 10-tuple of how many unseen
+cards of each rank remain, indexed by hard points minus one (A, 2..9, T).
+The dealer recursion is memoized in a bounded LRU cache keyed on that
+vector, so repeated queries during play are cheap.
+
+Everything takes the table's rules.CompiledRules (house rules by default):
+the dealer hits or stands on soft 17 as the table does, and EVs settle
+dealer naturals the way the table does (see _settle).
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from rules import HOUSE, SOFT
+
+# Outcome slots returned by dealer_probabilities
+OUTCOMES = (17, 18, 19, 20, 21, 'bust', 'blackjack')
+BUST = 5
+BLACKJACK = 6
+
+CACHE_SIZE = 200_000
+
+Counts = Tuple[int, ...]
+
+
+def counts_from_cards(cards: Iterable) -> Counts:
+    counts = [0] * 10
+    for card in cards:
+        counts[card.points - 1] += 1
+    return tuple(counts)
+
+
+def unseen_counts(deck, dealer_hand) -> Counts:
+    # From the players' seat the hole card is as unknown as the shoe.
+    # Deck keeps the undealt histogram up to date; other decks are counted.
+    if hasattr(deck, 'remaining_points'):
+        counts = list(deck.remaining_points())
+    else:
+        counts = list(counts_from_cards(deck.cards))
+    counts[dealer_hand.cards[0].points - 1] += 1
+    return tuple(counts)
+
+
+def _value(hard: int, ace: bool) -> int:
+    return hard + 10 if ace and hard <= 11 else hard
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _dealer_from(hard: int, ace: bool, ncards: int, counts: Counts, hit_soft_17: bool) -> Tuple[float, ...]:
+    # Dealer draws below 17, and on soft 17 when the rules say so, as in Game.play
+    value = _value(hard, ace)
+    if value > 17 or (value == 17 and not (hit_soft_17 and ace and hard == 7)):
+        result = [0.0] * 7
+        if value > 21:
+            result[BUST] = 1.0
+        elif value == 21 and ncards == 2:
+            result[BLACKJACK] = 1.0
+        else:
+            result[value - 17] = 1.0
+        return tuple(result)
+    remaining = sum(counts)
+    if remaining == 0:
+        raise ValueError('Shoe ran out while resolving the dealer hand')
+    result = [0.0] * 7
+    for index, count in enumerate(counts):
+        if not count:
+            continue
+        after = counts[:index] + (count - 1,) + counts[index + 1:]
+        sub = _dealer_from(hard + index + 1, ace or index == 0, ncards + 1, after, hit_soft_17)
+        p = count / remaining
+        for i in range(7):
+            result[i] += p * sub[i]
+    return tuple(result)
+
+
+def dealer_probabilities(up_points: int, counts: Counts, rules=HOUSE) -> Tuple[float, ...]:
+    """Probabilities of the dealer finishing on 17, 18, 19, 20, 21, bust or blackjack.
+
+    up_points is the up-card's hard points (ace = 1); counts are the unseen
+    cards the hole card and any draws come from.
+    """
+    return _dealer_from(up_points, up_points == 1, 1, tuple(counts), rules.rules.hit_soft_17)
+
+
+def dealer_probabilities_for(deck, dealer_hand, rules=HOUSE) -> Dict:
+    # Convenience wrapper for a live Game: up-card is the dealer's second card
+    probs = dealer_probabilities(dealer_hand.cards[1].points, unseen_counts(deck, dealer_hand), rules)
+    return dict(zip(OUTCOMES, probs))
+
+
+def cache_stats() -> Dict[str, float]:
+    info = _dealer_from.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'maxsize': info.maxsize,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+    }
+
+
+def clear_cache():
+    _dealer_from.cache_clear()
+
+
+# Composition-dependent expected values, in units of the initial bet, under
+# Game.play's settlement for the given rules; ties push.
+#
+# By default the dealer distribution is computed once, from the composition
+# at decision time, while the player's own draws still deplete the shoe.
+# exact=True recomputes it for every composition the player can reach;
+# the difference is a fraction of a percent of EV but costs seconds rather
+# than milliseconds for low totals.
+
+Dealer = Tuple[float, ...]
+# (hit_soft_17, dealer_peek, dealer_blackjack_wins): the part of the rules
+# the dealer distribution depends on, small enough to key the caches
+Model = Tuple[bool, bool, bool]
+
+
+def _model(rules) -> Model:
+    return rules.rules.hit_soft_17, rules.dealer_peek, rules.dealer_blackjack_wins
+
+
+def _settle(dealer: Dealer, model: Model) -> Dealer:
+    # Recast the blackjack slot as what the player faces at decision time:
+    # with a peek a dealer natural already ended the round, so it is ruled
+    # out; where naturals don't win they are an ordinary 21; otherwise the
+    # slot stays and beats every player total
+    _, peek, blackjack_wins = model
+    natural = dealer[BLACKJACK]
+    if not natural:
+        return dealer
+    if peek:
+        if natural == 1.0:
+            return dealer  # nothing but naturals left; nothing to condition on
+        return tuple(p / (1.0 - natural) for p in dealer[:BLACKJACK]) + (0.0,)
+    if not blackjack_wins:
+        return dealer[:4] + (dealer[4] + natural, dealer[BUST], 0.0)
+    return dealer
+
+
+def _stand_ev(total: int, dealer: Dealer) -> float:
+    if total > 21:
+        return -1.0
+    ev = dealer[BUST] - dealer[BLACKJACK]
+    for index, p in enumerate(dealer[:5]):
+        final = 17 + index
+        if total > final:
+            ev += p
+        elif total < final:
+            ev -= p
+    return ev
+
+
+def _dealer(up_points: int, counts: Counts, fixed: Optional[Dealer], model: Model) -> Dealer:
+    if fixed is not None:
+        return fixed
+    return _settle(_dealer_from(up_points, up_points == 1, 1, counts, model[0]), model)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _play_ev(hard: int, ace: bool, up_points: int, counts: Counts, fixed: Optional[Dealer],
+             model: Model) -> Tuple[float, float]:
+    # (stand EV, best of hit/stand EV) for a hand that may keep drawing
+    value = _value(hard, ace)
+    stand = _stand_ev(value, _dealer(up_points, counts, fixed, model))
+    if value >= 21:
+        return stand, stand
+    return stand, max(stand, _hit_ev(hard, ace, up_points, counts, fixed, model))
+
+
+def _draws(counts: Counts):
+    remaining = sum(counts)
+    for index, count in enumerate(counts):
+        if count:
+            yield index + 1, count / remaining, counts[:index] + (count - 1,) + counts[index + 1:]
+
+
+def _hit_ev(hard: int, ace: bool, up_points: int, counts: Counts, fixed: Optional[Dealer],
+            model: Model) -> float:
+    ev = 0.0
+    for points, p, after in _draws(counts):
+        new_hard = hard + points
+        if new_hard > 21:
+            ev -= p
+        else:
+            ev += p * _play_ev(new_hard, ace or points == 1, up_points, after, fixed, model)[1]
+    return ev
+
+
+def _double_ev(hard: int, ace: bool, up_points: int, counts: Counts, fixed: Optional[Dealer],
+               model: Model) -> float:
+    ev = 0.0
+    for points, p, after in _draws(counts):
+        value = _value(hard + points, ace or points == 1)
+        ev += p * _stand_ev(value, _dealer(up_points, after, fixed, model))
+    return 2 * ev
+
+
+def _split_ev(pair_points: int, up_points: int, counts: Counts, fixed: Optional[Dealer],
+              rules=HOUSE) -> float:
+    # Each post-split hand is scored independently from the same composition
+    # (no re-splits); split aces receive exactly one card unless the rules
+    # let them be hit, and doubling follows double_after_split and the
+    # table's doubling totals.
+    model = _model(rules)
+    ev = 0.0
+    for points, p, after in _draws(counts):
+        hard = pair_points + points
+        ace = pair_points == 1 or points == 1
+        if pair_points == 1 and not rules.hit_split_aces:
+            hand_ev = _stand_ev(_value(hard, ace), _dealer(up_points, after, fixed, model))
+        else:
+            hand_ev = _play_ev(hard, ace, up_points, after, fixed, model)[1]
+            value = _value(hard, ace)
+            if rules.double_after_split and rules.can_double[value + SOFT * (value != hard)]:
+                hand_ev = max(hand_ev, _double_ev(hard, ace, up_points, after, fixed, model))
+        ev += p * hand_ev
+    return 2 * ev
+
+
+def action_evs(hand, up_points: int, counts: Counts, can_double: bool = True,
+               can_split: bool = True, exact: bool = False, rules=HOUSE) -> Dict[str, float]:
+    """Expected value of every available action for `hand` against the dealer's up-card.
+
+    counts are the unseen cards (remaining shoe plus the dealer's hole card).
+    Subsequent hits are assumed to be played optimally.
+    """
+    counts = tuple(counts)
+    model = _model(rules)
+    fixed = None if exact else _settle(dealer_probabilities(up_points, counts, rules), model)
+    hard = sum(card.points for card in hand.cards)
+    ace = any(card.is_ace for card in hand.cards)
+    stand, _ = _play_ev(hard, ace, up_points, counts, fixed, model)
+    evs = {'hit': _hit_ev(hard, ace, up_points, counts, fixed, model), 'stand': stand}
+    if can_double and len(hand.cards) == 2:
+        evs['double down'] = _double_ev(hard, ace, up_points, counts, fixed, model)
+    if can_split and len(hand.cards) == 2 and hand.cards[0].value == hand.cards[1].value:
+        evs['split'] = _split_ev(hand.cards[0].points, up_points, counts, fixed, rules)
+    return evs
+
+
+def best_action(evs: Dict[str, float]) -> str:
+    return max(evs, key=evs.get)
+
+
+def format_hint(evs: Dict[str, float]) -> str:
+    ranked = sorted(evs.items(), key=lambda item: -item[1])
+    return 'Hint: ' + ', '.join(f'{action} {ev:+.3f}' for action, ev in ranked)
+
+
+class OptimalStrategy:
+    # Composition-dependent bot: picks the action with the highest EV.
+    # Plugs into Game like a StrategyTable; needs the unseen-card counts.
+    name = 'optimal'
+
+    def __init__(self, exact: bool = False):
+        self.exact = exact
+
+    def decide(self, hand, dealer_card, can_double: bool, can_split: bool, rng, unseen=None,
+               can_surrender: bool = False, rules=HOUSE) -> str:
+        if unseen is None:
+            raise ValueError('OptimalStrategy needs the unseen card counts')
+        evs = action_evs(hand, dealer_card.points, unseen(), can_double, can_split, self.exact, rules)
+        if can_surrender:
+            evs['surrender'] = -0.5
+        return best_action(evs)
+
+
+def clear_ev_cache():
+    _play_ev.cache_clear()
@@ -1,98 +1,303 @@
 import random
-import time
 import os
-from enum import Enum
-from typing import List, Dict, Optional
-from collections import deque
-try:
-    from rich.console import Console
-    from rich.table import Table
-    from rich.panel import Panel
-    from rich.text import Text
-except ImportError:
-    exit()
-# Terminal control utility functions
+import sys
+from typing import List, Dict, NamedTuple, Optional, Tuple
+from collections import deque, Counter
+from strategy import load_strategy
+from analysis import action_evs, format_hint, unseen_counts
+from agents import HumanAgent, ScriptedAgent
+from clock import Clock
+from counting import get_betting, get_system
+from rules import HOUSE, SOFT, compile_rules
+from metrics import NullMetrics
+# Terminal control escape sequences. Callers append these to a frame
+# buffer and write the whole frame at once rather than printing each one.
 class TerminalUI:
-    @staticmethod
-    def clear_screen():
-        os.system('cls' if os.name == 'nt' else 'clear')
-    
+    CLEAR_SCREEN = "\033[2J\033[H"
+    CLEAR_LINE = "\033[2K"
+    RESET_CURSOR = "\033[H"
+
     @staticmethod
     def move_cursor(x, y):
-        print(f"\033[{y};{x}H", end="")
-    
-    @staticmethod
-    def clear_line():
-        print("\033[2K", end="")
-    
+        return f"\033[{y};{x}H"
+
     @staticmethod
-    def reset_cursor():
-        print("\033[H", end="")
+    def clear_screen():
+        sys.stdout.write(TerminalUI.CLEAR_SCREEN)
+        sys.stdout.flush()
+
+SUITS = ['♥️', '♦️', '♣️', '♠️']
+VALUES = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+# Hard points per rank index; an ace counts 1 here and is promoted to 11 when it fits
+RANK_POINTS = [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 1]
+ACE = 12
+DEALER_SEAT = 255  # seat number used for the dealer in event logs
+INSURANCE_HAND = 255  # hand number used for a seat's insurance bet in event logs
 
 class Card:
-    def __init__(self, suit: str, value: str):
-        self.suit = suit
-        self.value = value
+    # Cards are immutable and interned: Card(suit, value) always returns the
+    # same object for the same suit/value, so a shoe is just a list of
+    # references to 52 shared instances.
+    #   rank   -- index into VALUES (0..12)
+    #   code   -- suit_index * 13 + rank (0..51 for the standard suits)
+    #   points -- hard blackjack points (ace = 1)
+    __slots__ = ('suit', 'value', 'rank', 'suit_index', 'code', 'points', 'is_ace', '_label')
+    _interned: Dict[tuple, 'Card'] = {}
+    _suit_indexes: Dict[str, int] = {suit: i for i, suit in enumerate(SUITS)}
+
+    def __new__(cls, suit: str, value: str):
+        card = cls._interned.get((suit, value))
+        if card is not None:
+            return card
+        if value not in VALUES:
+            raise ValueError(f'Unknown card value: {value!r}')
+        card = object.__new__(cls)
+        rank = VALUES.index(value)
+        suit_index = cls._suit_indexes.setdefault(suit, len(cls._suit_indexes))
+        label = f'{suit.ljust(2)}{value.rjust(3 if value == "10" else 2)}'
+        for name, field in (('suit', suit), ('value', value), ('rank', rank),
+                            ('suit_index', suit_index), ('code', suit_index * 13 + rank),
+                            ('points', RANK_POINTS[rank]), ('is_ace', rank == ACE),
+                            ('_label', label)):
+            object.__setattr__(card, name, field)
+        cls._interned[(suit, value)] = card
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Card is immutable')
+
+    def __reduce__(self):
+        return (Card, (self.suit, self.value))
 
     def __repr__(self):
-        if self.value == '10':
-            return f'{self.suit.ljust(2)}{self.value.rjust(3)}'
-        else:
-            return f'{self.suit.ljust(2)}{self.value.rjust(2)}'
+        return self._label
+
+# The 52 standard cards in suit-major order, indexable by Card.code
+CARDS = [Card(suit, value) for suit in SUITS for value in VALUES]
 
 class Deck:
-    def __init__(self, num_decks: int):
-        self.cards = []
+    # A shoe of num_decks decks. Cards live in one preallocated list and are
+    # dealt by advancing an index; reshuffling permutes that list in place
+    # and rewinds the index, so no Card objects are rebuilt.
+    # Also keeps a histogram of undealt ranks and a running count for one
+    # counting system (counting.py). Both are brought up to date from the
+    # deal index when queried, so each dealt card is tallied once and
+    # deal_card itself does no extra work.
+    def __init__(self, num_decks: int, rng=None, penetration: float = 0.75, continuous: bool = False,
+                 counting=None, shuffler=None):
         self.num_decks = num_decks
-        self.suits = ['♥️', '♦️', '♣️', '♠️']
+        # Any object with the random module's API (e.g. random.Random(seed))
+        self.rng = rng if rng is not None else random
+        self.suits = SUITS
         # self.suits = ['♥', '♦', '♣', '♠']
         #self.suits = ['󱢪', '󱢦', '󱢢', '󱢮']
-        self.values = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-
-        for _ in range(self.num_decks):
-            for suit in self.suits:
-                for value in self.values:
-                    self.cards.append(Card(suit, value))
-        random.shuffle(self.cards)
+        self.values = VALUES
+        # Continuous-shuffling-machine mode reshuffles before every round
+        self.continuous = continuous
+        self.shuffles = 0
+        self.counting = get_system(counting)
+        self._tags = self.counting.tags
+
+        self._shoe = CARDS * self.num_decks
+        self._pos = 0
+        # A shuffle.ShuffleEngine shuffles each shoe from the canonical order
+        # under its own recorded seed; without one self.rng shuffles in place
+        self.shuffler = shuffler
+        self.shoe_record = None
+        self._canonical = tuple(self._shoe) if shuffler is not None else None
+        # Cut card position: reshuffle once this many cards have been dealt
+        self.cut_card = max(1, int(len(self._shoe) * penetration))
+        self.shuffle()
+
+    @property
+    def cards(self) -> List[Card]:
+        # Cards not yet dealt, next card first
+        return self._shoe[self._pos:]
+
+    @property
+    def dealt(self) -> List[Card]:
+        # Cards dealt from the current shoe, in order (after a mid-round
+        # reshuffle the cards left on the table came from the previous one)
+        return self._shoe[self._shoe_start:self._pos]
+
+    def cards_remaining(self) -> int:
+        return len(self._shoe) - self._pos
+
+    def start_round(self):
+        # Marks where the cards of the round about to be dealt begin; the
+        # ones before it are in the discard tray
+        self._round_start = self._pos
+
+    def shuffle(self):
+        if self.shuffler is None:
+            self.rng.shuffle(self._shoe)
+        else:
+            self._shoe[:] = self._canonical
+            self.shoe_record = self.shuffler.shuffle(self._shoe, self.num_decks)
+        self._pos = self._shoe_start = 0
+        self._round_start = None  # no round marked yet
+        self.shuffles += 1
+        # Undealt cards per rank index, and the count for a fresh shoe
+        self._rank_counts = [4 * self.num_decks] * len(VALUES)
+        self._running_count = self.counting.initial_count(self.num_decks)
+        self._counted = 0
+
+    def _tally(self):
+        if self._counted == self._pos:
+            return
+        counts = self._rank_counts
+        tags = self._tags
+        running = self._running_count
+        for card in self._shoe[self._counted:self._pos]:
+            counts[card.rank] -= 1
+            running += tags[card.rank]
+        self._running_count = running
+        self._counted = self._pos
+
+    @property
+    def rank_counts(self) -> List[int]:
+        self._tally()
+        return self._rank_counts
+
+    @property
+    def running_count(self) -> int:
+        self._tally()
+        return self._running_count
+
+    def decks_remaining(self) -> float:
+        return self.cards_remaining() / 52
+
+    def true_count(self, hidden: Tuple[Card, ...] = ()) -> float:
+        # Running count per deck left, dividing by at least one deck. hidden
+        # cards (the dealer's hole card) are out of the shoe but unseen, so
+        # they stay out of the count and among the cards left.
+        running = self.running_count - sum(self._tags[card.rank] for card in hidden)
+        return running / max((self.cards_remaining() + len(hidden)) / 52, 1)
+
+    def remaining_points(self) -> Tuple[int, ...]:
+        # Undealt cards by hard points (A, 2..9, T), as analysis.py counts them
+        counts = self.rank_counts
+        return (counts[ACE],) + tuple(counts[:8]) + (counts[8] + counts[9] + counts[10] + counts[11],)
+
+    def needs_shuffle(self) -> bool:
+        # Checked between rounds
+        return self.continuous or self._pos >= self.cut_card
+
+    def _shuffle_discards(self):
+        # Shoe ran dry mid-round (cut card set too deep): the discard tray is
+        # shuffled into a new shoe behind the cards still on the table, which
+        # stay dealt and stay marked as the round's. Without a start_round
+        # mark nothing counts as in play and the whole shoe is reshuffled.
+        if self._round_start is None:
+            self.shuffle()
+            return
+        in_play = self._shoe[self._round_start:self._pos]
+        discards = self._shoe[:self._round_start]
+        if not discards:
+            raise RuntimeError('The shoe ran dry with every card on the table')
+        if self.shuffler is None:
+            self.rng.shuffle(discards)
+        else:
+            # Recorded like any other shoe; the record lists the tray's cards
+            self.shoe_record = self.shuffler.shuffle_partial(discards, self.num_decks)
+        self._shoe[:] = in_play + discards
+        self._pos = self._counted = self._shoe_start = len(in_play)
+        self._round_start = 0  # the round's cards now open the shoe
+        self.shuffles += 1
+        counts = [4 * self.num_decks] * len(VALUES)
+        running = self.counting.initial_count(self.num_decks)
+        for card in in_play:
+            counts[card.rank] -= 1
+            running += self._tags[card.rank]
+        self._rank_counts = counts
+        self._running_count = running
 
     def deal_card(self) -> Card:
-        return self.cards.pop()
+        if self._pos >= len(self._shoe):
+            self._shuffle_discards()
+        card = self._shoe[self._pos]
+        self._pos += 1
+        return card
 
 class Hand:
+    # Keeps a running hard total and ace count so value queries are O(1).
+    # Change cards through add_card/pop_card rather than editing self.cards.
     def __init__(self):
         self.cards = []
         self.bet = 0
+        self.from_split = False  # split hands can't make Blackjack
+        self.surrendered = False
+        self._hard = 0
+        self._aces = 0
 
     def add_card(self, card: Card):
         self.cards.append(card)
+        self._hard += card.points
+        self._aces += card.is_ace
+
+    def pop_card(self) -> Card:
+        card = self.cards.pop()
+        self._hard -= card.points
+        self._aces -= card.is_ace
+        return card
 
     def get_value(self) -> int:
-        value = 0
-        aces = 0
-        for card in self.cards:
-            if card.value.isnumeric():
-                value += int(card.value)
-            else:
-                if card.value == 'A':
-                    aces += 1
-                    value += 11
-                else:
-                    value += 10
+        # At most one ace can count as 11
+        if self._aces and self._hard <= 11:
+            return self._hard + 10
+        return self._hard
 
-        while value > 21 and aces:
-            value -= 10
-            aces -= 1
-        return value
+    @property
+    def is_soft(self) -> bool:
+        return bool(self._aces) and self._hard <= 11
+
+    @property
+    def is_blackjack(self) -> bool:
+        return not self.from_split and len(self.cards) == 2 and self.get_value() == 21
+
+    @property
+    def is_split_aces(self) -> bool:
+        # Split aces get one card each and no further action
+        return self.from_split and self.cards[0].is_ace
+
+    @property
+    def is_bust(self) -> bool:
+        return self._hard > 21
 
     def __repr__(self):
         return f'Hand value: {self.get_value()} with cards {self.cards}'
 
 class Player:
+    MAX_HANDS = 4  # re-split up to four hands
+
     def __init__(self, name: str, balance: int):
         self.name = name
         self.balance = balance
-        self.hand = Hand()
+        # Hands in play order; hand_index is the one currently being played
+        self.hands = [Hand()]
+        self.hand_index = 0
         self.position = 0  # Display position on screen
+        self.outcomes = Counter()  # win/blackjack/push/lose/bust/surrender tallies (per hand)
+        self.insurance = 0  # side bet taken this round
+        self.seated = True  # cleared when the player runs out of money and leaves
+        self.rounds_played = 0
+
+    @property
+    def hand(self) -> Hand:
+        return self.hands[self.hand_index]
+
+    @hand.setter
+    def hand(self, hand: Hand):
+        # Assigning a hand starts over with that single hand (a new round)
+        self.hands = [hand]
+        self.hand_index = 0
+        self.insurance = 0
+
+    def can_split(self, max_hands: Optional[int] = None, resplit_aces: bool = False) -> bool:
+        cards = self.hand.cards
+        return (len(cards) == 2 and cards[0].value == cards[1].value
+                and len(self.hands) < (max_hands or self.MAX_HANDS)
+                and (resplit_aces or not self.hand.is_split_aces))
 
     def hit(self, deck: Deck):
         self.hand.add_card(deck.deal_card())
@@ -104,119 +309,131 @@ class Player:
         self.hit(deck)
         return True
 
-    def split(self, deck: Deck):
-        if len(self.hand.cards) != 2 or self.hand.cards[0].value != self.hand.cards[1].value:
+    def split(self, deck: Deck, max_hands: Optional[int] = None, resplit_aces: bool = False):
+        # Moves the second card to a new hand played right after this one.
+        # The new hand carries the same bet; the caller takes it from the balance.
+        if not self.can_split(max_hands, resplit_aces):
             print('Can only split initial two cards of same value')
             return False
+        hand = self.hand
         new_hand = Hand()
-        new_hand.add_card(self.hand.cards.pop())
+        new_hand.bet = hand.bet
+        new_hand.add_card(hand.pop_card())
         new_hand.add_card(deck.deal_card())
-        self.hand.add_card(deck.deal_card())
+        hand.add_card(deck.deal_card())
+        hand.from_split = new_hand.from_split = True
+        self.hands.insert(self.hand_index + 1, new_hand)
         return True
 
+def settle_hand(hand: Hand, dealer_value: int, dealer_blackjack: bool = False, rules=HOUSE):
+    # Returns (amount paid back to the player, outcome) for one hand
+    if hand.surrendered:
+        return hand.bet // 2, 'surrender'
+    value = hand.get_value()
+    if value > 21:
+        return 0, 'bust'
+    if dealer_blackjack and rules.dealer_blackjack_wins:
+        if hand.is_blackjack:
+            return hand.bet, 'push'
+        return 0, 'lose'
+    if hand.is_blackjack:
+        return int(hand.bet * rules.blackjack_return), 'blackjack'
+    if dealer_value > 21:
+        return hand.bet * 2, 'win'
+    if value > dealer_value:
+        return hand.bet * 2, 'win'
+    if value < dealer_value:
+        return 0, 'lose'
+    return hand.bet, 'push'
+
 class GameUI:
-    def __init__(self, terminal_width=80):
+    # Keeps a model of what each screen row shows; updates compute the new
+    # rows, and only rows that changed are rewritten. Each update's escape
+    # sequences go out in a single write and flush.
+    def __init__(self, terminal_width=80, out=None):
         self.width = terminal_width
+        self.out = out or sys.stdout
         self.dealer_hand = None
         self.players = []
         self.messages = []
         self.active_player_index = 0
-    
+        self._screen = {}  # row -> text currently shown
+        self._buffer = []
+
     def initialize(self, players):
         self.players = players
         for i, player in enumerate(players):
             player.position = 10 + i * 5
-    
+
+    def _line(self, row, text):
+        if self._screen.get(row) == text:
+            return
+        self._screen[row] = text
+        self._buffer.append(f"{TerminalUI.move_cursor(1, row)}{TerminalUI.CLEAR_LINE}{text}")
+
+    def _flush(self):
+        if self._buffer:
+            self.out.write("".join(self._buffer))
+            self.out.flush()
+            self._buffer.clear()
+
+    def _bottom(self):
+        return max([p.position for p in self.players], default=6) + 5
+
+    def _player_lines(self, index):
+        player = self.players[index]
+        marker = " ◀" if index == self.active_player_index else ""
+        balance = f"Balance: ${player.balance}"
+        self._line(player.position, f"Player: {player.name}{marker}".ljust(self.width - 15) + balance)
+        self._line(player.position + 1, "Cards: " + " | ".join(" ".join(str(card) for card in hand.cards) for hand in player.hands))
+        self._line(player.position + 2, "Value: " + " | ".join(str(hand.get_value()) for hand in player.hands))
+        self._line(player.position + 3, "-" * self.width)
+
     def draw_frame(self):
-        TerminalUI.clear_screen()
-        print("=" * self.width)
-        print("BLACKJACK".center(self.width))
-        print("=" * self.width)
-        print("Dealer:".ljust(self.width))
-        print(" " * self.width)
-        print("-" * self.width)
-        for player in self.players:
-            line_pos = player.position
-            TerminalUI.move_cursor(0, line_pos)
-            print(f"Player: {player.name}")
-            TerminalUI.move_cursor(self.width - 15, line_pos)
-            print(f"Balance: ${player.balance}")
-            TerminalUI.move_cursor(0, line_pos + 1)
-            print("Cards: ".ljust(self.width))
-            TerminalUI.move_cursor(0, line_pos + 2)
-            print("Value: ".ljust(self.width))
-            TerminalUI.move_cursor(0, line_pos + 3)
-            print("-" * self.width)
-        TerminalUI.move_cursor(0, max([p.position for p in self.players]) + 5)
-        print("=" * self.width)
-        for _ in range(3):
-            print(" " * self.width)
-    
+        self._screen.clear()
+        self._buffer.append(TerminalUI.CLEAR_SCREEN)
+        self._line(1, "=" * self.width)
+        self._line(2, "BLACKJACK".center(self.width))
+        self._line(3, "=" * self.width)
+        self._line(4, "Dealer:")
+        self._line(6, "-" * self.width)
+        for i in range(len(self.players)):
+            self._player_lines(i)
+        self._line(self._bottom(), "=" * self.width)
+        self._flush()
+
     def update_dealer_hand(self, hand, hide_first_card=False):
         self.dealer_hand = hand
-        # Clear previous dealer cards line
-        TerminalUI.move_cursor(0, 4)
-        TerminalUI.clear_line()
-        TerminalUI.move_cursor(8, 4)
         if hide_first_card and len(hand.cards) > 0:
             cards_display = ["🂠"] + [str(card) for card in hand.cards[1:]]
-            print(" ".join(cards_display))
-            # Clear previous value line
-            TerminalUI.move_cursor(0, 5)
-            TerminalUI.clear_line()
-            TerminalUI.move_cursor(0, 5)
-            print("Value: ?")
+            value = "?"
         else:
-            print(" ".join([str(card) for card in hand.cards]))
-            TerminalUI.move_cursor(0, 5)
-            TerminalUI.clear_line()
-            TerminalUI.move_cursor(0, 5)
-            print(f"Value: {hand.get_value()}")
-    
+            cards_display = [str(card) for card in hand.cards]
+            value = hand.get_value()
+        self._line(4, "Dealer: " + " ".join(cards_display))
+        self._line(5, f"Value: {value}")
+        self._flush()
+
     def update_player_hand(self, player_index):
-        player = self.players[player_index]
-        line_pos = player.position
-        # Clear previous cards line
-        TerminalUI.move_cursor(0, line_pos + 1)
-        TerminalUI.clear_line()
-        TerminalUI.move_cursor(8, line_pos + 1)
-        print(" ".join([str(card) for card in player.hand.cards]))
-        # Clear previous value line
-        TerminalUI.move_cursor(0, line_pos + 2)
-        TerminalUI.clear_line()
-        TerminalUI.move_cursor(8, line_pos + 2)
-        print(str(player.hand.get_value()))
-        # Update balance with clear then padded print
-        TerminalUI.move_cursor(0, line_pos)
-        TerminalUI.clear_line()
-        TerminalUI.move_cursor(self.width - 15, line_pos)
-        balance_str = f"Balance: ${player.balance}"
-        print(f"{balance_str:<15}")
-    
+        self._player_lines(player_index)
+        self._flush()
+
     def set_active_player(self, player_index):
         self.active_player_index = player_index
-        for i, player in enumerate(self.players):
-            TerminalUI.move_cursor(0, player.position)
-            if i == player_index:
-                print(f"Player: {player.name} ◀")
-            else:
-                print(f"Player: {player.name}  ")
-    
+        for i in range(len(self.players)):
+            self._player_lines(i)
+        self._flush()
+
     def show_message(self, message):
         self.messages.append(message)
         if len(self.messages) > 3:
             self.messages.pop(0)
-        msg_start_line = max([p.position for p in self.players]) + 6
+        msg_start_line = self._bottom() + 1
         for i, msg in enumerate(self.messages):
-            TerminalUI.move_cursor(0, msg_start_line + i)
-            TerminalUI.clear_line()
-            print(msg)
-    
+            self._line(msg_start_line + i, msg)
+        self._flush()
+
     def prompt_for_action(self, available_actions):
-        msg_start_line = max([p.position for p in self.players]) + 10
-        TerminalUI.move_cursor(0, msg_start_line)
-        TerminalUI.clear_line()
-        
         if len(available_actions) == 1:
             # If only one action string is passed, use it verbatim as the prompt
             prompt = available_actions[0]
@@ -224,137 +441,201 @@ class GameUI:
             # Multiple actions - format as before
             action_display = '/'.join(available_actions)
             prompt = f"Choose action ({action_display}): "
-        
-        print(prompt, end='', flush=True)
+        # The typed answer lands on this row, so it no longer matches the model
+        row = self._bottom() + 5
+        self._screen.pop(row, None)
+        self._buffer.append(f"{TerminalUI.move_cursor(1, row)}{TerminalUI.CLEAR_LINE}{prompt}")
+        self._flush()
         return input().lower()
-        
-# Rich-based UI for enhanced terminal rendering
-if Console:
-    class RichGameUI:
-        def __init__(self):
-            self.console = Console()
-            self.players = []
-            self.dealer_hand = None
-            self.hide_dealer = False
-            self.messages = []
-            self.active_player_index = 0
-
-        def initialize(self, players):
-            self.players = players
-
-        def draw_frame(self):
-                # 1) Clear & header
-                self.console.clear()
-                total_width = self.console.size.width
-                self.console.rule("[bold yellow]BLACKJACK[/bold yellow]")
-
-                # 2) Dealer panel spans full width
-                cards = []
-                value = "?"
-                if self.dealer_hand:
-                    if self.hide_dealer and len(self.dealer_hand.cards) > 0:
-                        cards = ["🂠"] + [str(c) for c in self.dealer_hand.cards[1:]]
-                    else:
-                        cards = [str(c) for c in self.dealer_hand.cards]
-                        value = str(self.dealer_hand.get_value())
-
-                dealer_body = "\n".join([
-                    " ".join(cards),
-                    f"Value: {value}"
-                ])
-                dealer_panel = Panel(
-                    Text(dealer_body, justify="center"),
-                    title="[bold]Dealer[/bold]",
-                    border_style="blue",
-                    width=total_width
-                )
-
-                # 3) Fixed‐width player panels
-                players = self.players
-                n = len(players)
-                gap = 1               # spaces between panels
-                min_w = 20            # never go below this
-                # carve the remaining width up evenly:
-                panel_w = max(min_w, (total_width - gap * (n - 1)) // n)
-
-                player_panels = []
-                for idx, p in enumerate(players):
-                    card_str = " ".join(str(c) for c in p.hand.cards)
-                    val_str  = str(p.hand.get_value())
-                    body = "\n".join([f"Cards: {card_str}", f"Value: {val_str}"])
-                    border = "green" if idx == self.active_player_index else "magenta"
-                    title  = f"> {p.name} <" if idx == self.active_player_index else p.name
-                    subtitle = f"Balance: ${p.balance}"
-
-                    player_panels.append(Panel(
-                        Text(body),
-                        title=title,
-                        subtitle=subtitle,
-                        border_style=border,
-                        width=panel_w
-                    ))
-
-                # 4) Render everything
-                from rich.columns import Columns
-                self.console.print(dealer_panel)
-                self.console.print()  # blank line
-                self.console.print(Columns(
-                    player_panels,
-                    padding=(0, gap),
-                    expand=False
-                ))
-
-                # 5) Messages (same as before)
-                if self.messages:
-                    self.console.print("\n[bold]Messages:[/bold]")
-                    for msg in self.messages:
-                        self.console.print(f"- {msg}")
-
-        def update_dealer_hand(self, hand, hide_first_card=False):
-            self.dealer_hand = hand
-            self.hide_dealer = hide_first_card
-            self.draw_frame()
-
-        def update_player_hand(self, player_index):
-            self.draw_frame()
-
-        def set_active_player(self, player_index):
-            self.active_player_index = player_index
-            self.draw_frame()
-
-        def show_message(self, message):
-            self.messages.append(message)
-            if len(self.messages) > 5:
-                self.messages.pop(0)
-            self.draw_frame()
-
-        def prompt_for_action(self, available_actions):
-            if len(available_actions) == 1:
-                prompt = available_actions[0]
-            else:
-                prompt = f"Choose action ({'/'.join(available_actions)}): "
-            return self.console.input(prompt).lower()
+
+    def close(self):
+        pass
+
+# Headless UI: same interface as GameUI, but renders nothing
+class NullGameUI:
+    def __init__(self):
+        self.players = []
+        self.dealer_hand = None
+        self.active_player_index = 0
+
+    def initialize(self, players):
+        self.players = players
+
+    def draw_frame(self):
+        pass
+
+    def update_dealer_hand(self, hand, hide_first_card=False):
+        self.dealer_hand = hand
+
+    def update_player_hand(self, player_index):
+        pass
+
+    def set_active_player(self, player_index):
+        self.active_player_index = player_index
+
+    def show_message(self, message):
+        pass
+
+    def prompt_for_action(self, available_actions):
+        raise RuntimeError("NullGameUI cannot prompt for input")
+
+    def close(self):
+        pass
+
+# Headless UI that records every call as an (event, payload) tuple
+class RecordingGameUI(NullGameUI):
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def draw_frame(self):
+        self.events.append(('draw_frame', None))
+
+    def update_dealer_hand(self, hand, hide_first_card=False):
+        super().update_dealer_hand(hand, hide_first_card)
+        self.events.append(('update_dealer_hand', (list(hand.cards), hide_first_card)))
+
+    def update_player_hand(self, player_index):
+        self.events.append(('update_player_hand', player_index))
+
+    def set_active_player(self, player_index):
+        super().set_active_player(player_index)
+        self.events.append(('set_active_player', player_index))
+
+    def show_message(self, message):
+        self.events.append(('show_message', message))
+
+def _rich_ui():
+    from rich_ui import RichGameUI
+    return RichGameUI()
+
+
+def _ansi_ui():
+    try:
+        return GameUI(os.get_terminal_size().columns)
+    except OSError:
+        return GameUI()
+
+
+# UI backends by name. Factories import their dependencies when called and
+# raise ImportError when those are missing, so nothing here loads Rich.
+UI_BACKENDS = {
+    'rich': _rich_ui,
+    'ansi': _ansi_ui,
+    'null': NullGameUI,
+    'recording': RecordingGameUI,
+}
+# Tried in order when no backend is named
+INTERACTIVE_BACKENDS = ['rich', 'ansi']
+
+
+def register_ui(name: str, factory):
+    UI_BACKENDS[name] = factory
+
+
+def create_ui(name: Optional[str] = None):
+    if name is not None:
+        return UI_BACKENDS[name]()
+    for candidate in INTERACTIVE_BACKENDS:
+        try:
+            return UI_BACKENDS[candidate]()
+        except ImportError:
+            continue
+    raise RuntimeError('No interactive UI backend available')
+
+
+# Requests yielded by Game.steps to its driver
+class Prompt(NamedTuple):
+    actions: List[str]
+    kind: str = 'action'  # 'bet', 'insurance', 'action' or 'continue'; see agents.py
+    seat: int = 0
+
+
+class Pause(NamedTuple):
+    seconds: float
+    reason: str = ''  # 'bot' or 'dealer'; see clock.Clock
+
+
+class SeatResult(NamedTuple):
+    seat: int
+    name: str
+    wagered: int  # every hand's final bet plus insurance
+    net: int
+    balance: int
+
+
+class RoundResult(NamedTuple):
+    number: int
+    seats: List[SeatResult]  # the players seated for this round
+    busted: List[int]        # seats that ran out of money and left
+
+
+# Round event sink used when no log is attached; see events.EventLog
+class NullEventLog:
+    def open_table(self, seat_names, rules=None):
+        pass
+
+    def round_start(self, number):
+        pass
+
+    def shuffle(self):
+        pass
+
+    def bet(self, seat, amount):
+        pass
+
+    def deal(self, seat, hand, card):
+        pass
+
+    def action(self, seat, hand, action):
+        pass
+
+    def settle(self, seat, hand, bet, payout):
+        pass
+
+    def round_end(self):
+        pass
 
 class Game:
-    def __init__(self, num_decks: int, num_bots: int, interactive: bool = True, human_actions: Optional[List[str]] = None):
+    def __init__(self, num_decks: int, num_bots: int, interactive: bool = True, human_actions: Optional[List[str]] = None, ui=None, rng=None, starting_balance: int = 100, strategy=None, log=None, clock=None, metrics=None,
+                 betting=None, counting=None, rules=None, agent=None, shuffler=None,
+                 penetration: float = 0.75, continuous: bool = False):
         self.interactive = interactive
         self.human_actions = deque(human_actions) if human_actions else deque()
-        self.deck = Deck(num_decks)
+        # Shared by the deck and bot decisions so a seeded rng replays exactly
+        self.rng = rng if rng is not None else random
+        self.deck = Deck(num_decks, rng=self.rng, penetration=penetration, continuous=continuous,
+                         counting=counting, shuffler=shuffler)
+        # Bot bet sizing (counting.FlatBet, BettingRamp or their names); flat $10 by default
+        self.betting = get_betting(betting)
+        # Table rules (rules.Rules or a RULESETS name), compiled to lookup tables
+        self.rules = compile_rules(rules)
+        # Bot policy: a StrategyTable (or its bundled name); defaults to the legacy bot
+        if strategy is None or isinstance(strategy, str):
+            strategy = load_strategy(strategy or 'legacy')
+        self.strategy = strategy
         self.players = []
-        # Choose UI: use Rich if available, else fallback to original
-        if Console:
-            self.ui = RichGameUI()
+        self.rounds_played = 0
+        # Paces bot and dealer pauses in interactive play
+        self.clock = clock if clock is not None else Clock()
+        # Choose UI: an explicit UI (or backend name) wins; non-interactive
+        # runs headless; otherwise the first loadable interactive backend
+        if isinstance(ui, str):
+            self.ui = create_ui(ui)
+        elif ui is not None:
+            self.ui = ui
+        elif not self.interactive:
+            self.ui = NullGameUI()
         else:
-            try:
-                terminal_size = os.get_terminal_size()
-                self.ui = GameUI(terminal_size.columns)
-            except:
-                self.ui = GameUI()
+            self.ui = create_ui()
         if self.interactive:
             for i in range(num_bots + 1):
                 if i == 0:
                     # Human player -- name prompt or from predefined actions
-                    if Console:
+                    if isinstance(self.ui, NullGameUI):
+                        # Headless UIs (tests, server sessions) never touch the terminal
+                        name = self.human_actions.popleft() if self.human_actions else 'Player'
+                    elif hasattr(self.ui, 'console'):
                         self.ui.console.clear()
                         self.ui.console.print("[bold yellow]Welcome to Blackjack![/bold yellow]")
                         if self.human_actions:
@@ -368,155 +649,323 @@ class Game:
                             name = self.human_actions.popleft()
                         else:
                             name = input("Enter your name: ")
-                    self.players.append(Player(name, 100))
+                    self.players.append(Player(name, starting_balance))
                 else:
-                    self.players.append(Player(f'Bot {i}', 100))
+                    self.players.append(Player(f'Bot {i}', starting_balance))
         else:
             # Non-interactive mode: only bots
             for i in range(1, num_bots + 1):
-                self.players.append(Player(f'Bot {i}', 100))
+                self.players.append(Player(f'Bot {i}', starting_balance))
         self.ui.initialize(self.players)
-
-    def _prompt(self, available_actions):
-        if self.human_actions:
-            return self.human_actions.popleft().lower()
-        if not self.interactive:
-            raise RuntimeError("No human actions available")
-        return self.ui.prompt_for_action(available_actions)
+        # Structured round events (deal, action, dealer draw, settlement)
+        self.log = log if log is not None else NullEventLog()
+        self.log.open_table([player.name for player in self.players], self.rules.rules._asdict())
+        # Per-phase timers and counters; NullMetrics leaves the UI unwrapped
+        self.metrics = metrics if metrics is not None else NullMetrics()
+        self.ui = self.metrics.wrap_ui(self.ui)
+        # Answers the human seat's prompts (agents.py); by default the
+        # remaining human_actions, then the UI when interactive
+        if agent is None:
+            agent = ScriptedAgent(self.human_actions, HumanAgent() if self.interactive else None)
+        self.agent = agent
+        self.dealer_hand = Hand()
+
+    def _prompt(self, prompt):
+        return self.agent.act(prompt, self)
+
+    def results(self, max_rounds: Optional[int] = None):
+        # Blocking driver for steps() that yields each RoundResult: prompts
+        # go to the scripted actions or the UI, pauses go to the clock
+        steps = self.steps(max_rounds)
+        answer = None
+        while True:
+            try:
+                request = steps.send(answer)
+            except StopIteration:
+                return
+            answer = None
+            if isinstance(request, Prompt):
+                answer = self._prompt(request)
+            elif isinstance(request, Pause):
+                self.clock.pause(request)
+            else:
+                yield request
 
     def play(self, max_rounds: Optional[int] = None):
-        try:
-            rounds_played = 0
-            while True:
-                # stop after max_rounds in non-interactive or when specified
-                if max_rounds is not None and rounds_played >= max_rounds:
-                    return
-                rounds_played += 1
-                self.ui.draw_frame()
-                dealer_hand = Hand()
-                for i, player in enumerate(self.players):
-                    player.hand = Hand()
-                    self.ui.set_active_player(i)
-                    if not player.name.startswith('Bot'):
-                        self.ui.show_message(f"{player.name}'s turn to place a bet")
-                        bet_msg = f"Enter your bet (Balance ${player.balance}, min $5, max $100): "
-                        while True:
-                            try:
-                                bet = int(self._prompt([bet_msg]))
-                                if 5 <= bet <= 100 and bet <= player.balance:
-                                    break
-                                self.ui.show_message("Invalid bet amount. Try again.")
-                            except ValueError:
-                                self.ui.show_message("Please enter a valid number.")
-                    else:
-                        self.ui.show_message(f"{player.name} is placing a bet...")
-                        if self.interactive:
-                            time.sleep(1)
-                        bet = 10
-                    player.balance -= bet
-                    player.hand.bet = bet
-                    self.ui.update_player_hand(i)
-                dealer_hand.add_card(self.deck.deal_card())
+        try:
+            for _ in self.results(max_rounds):
+                pass
+        except KeyboardInterrupt:
+            self.ui.close()
+            TerminalUI.clear_screen()
+            print("Thanks for playing Blackjack!")
+        finally:
+            self.ui.close()
+
+    def steps(self, max_rounds: Optional[int] = None):
+        # The game loop as a generator. It yields Prompt(actions) when it needs
+        # the human's input (send the answer back) and Pause(seconds) where an
+        # interactive table waits for effect, so drivers other than play(),
+        # such as server.py's asyncio tables, decide how to wait.
+        rounds_played = 0
+        while True:
+            # stop after max_rounds in non-interactive or when specified
+            if max_rounds is not None and rounds_played >= max_rounds:
+                return
+            rounds_played += 1
+            self.rounds_played += 1
+            self.metrics.round_start()
+            self.ui.draw_frame()
+            self.log.round_start(self.rounds_played)
+            if self.deck.needs_shuffle():
+                self.deck.shuffle()
+                self.log.shuffle()
+                self.metrics.count('shuffles')
+                self.ui.show_message("Shuffling the shoe...")
+            self.deck.start_round()
+            self.dealer_hand = dealer_hand = Hand()
+            rules = self.rules
+            # Seat indexes stay fixed for the UI and the log when players leave
+            seated = [(i, player) for i, player in enumerate(self.players) if player.seated]
+            start_balances = [player.balance for _, player in seated]
+            self.metrics.lap('setup')
+            for i, player in seated:
+                player.hand = Hand()
+                player.rounds_played += 1
+                self.ui.set_active_player(i)
+                if not player.name.startswith('Bot'):
+                    self.ui.show_message(f"{player.name}'s turn to place a bet")
+                    bet_msg = f"Enter your bet (Balance ${player.balance}, min $5, max $100): "
+                    while True:
+                        try:
+                            bet = int((yield Prompt([bet_msg], 'bet', i)))
+                            if 5 <= bet <= 100 and bet <= player.balance:
+                                break
+                            self.ui.show_message("Invalid bet amount. Try again.")
+                        except ValueError:
+                            self.ui.show_message("Please enter a valid number.")
+                else:
+                    self.ui.show_message(f"{player.name} is placing a bet...")
+                    if self.interactive:
+                        yield Pause(1, 'bot')
+                    bet = self.betting.bet(player, self.deck)
+                player.balance -= bet
+                player.hand.bet = bet
+                self.log.bet(i, bet)
+                self.ui.update_player_hand(i)
+            self.metrics.lap('bets')
+            for _ in range(2):
                 dealer_hand.add_card(self.deck.deal_card())
-                self.ui.update_dealer_hand(dealer_hand, hide_first_card=True)
-                for i, player in enumerate(self.players):
-                    player.hit(self.deck)
+                self.log.deal(DEALER_SEAT, 0, dealer_hand.cards[-1])
+            self.ui.update_dealer_hand(dealer_hand, hide_first_card=True)
+            for i, player in seated:
+                for _ in range(2):
                     player.hit(self.deck)
-                    self.ui.update_player_hand(i)
-                for i, player in enumerate(self.players):
-                    self.ui.set_active_player(i)
-                    if player.hand.get_value() == 21:
-                        self.ui.show_message(f"{player.name} has Blackjack!")
+                    self.log.deal(i, 0, player.hand.cards[-1])
+                self.ui.update_player_hand(i)
+            self.metrics.lap('deal')
+            if rules.insurance and dealer_hand.cards[1].is_ace:
+                for i, player in seated:
+                    stake = player.hand.bet // 2
+                    if not stake or player.balance < stake:
                         continue
+                    self.ui.set_active_player(i)
+                    if not player.name.startswith('Bot'):
+                        answer = (yield Prompt([f"Insurance for ${stake}? (y/n): "], 'insurance', i))
+                        insure = answer.strip().lower().startswith('y')
+                    else:
+                        insure = self.betting.insure(player, self.deck, (dealer_hand.cards[0],))
+                    if insure:
+                        player.balance -= stake
+                        player.insurance = stake
+                        self.log.action(i, 0, 'insurance')
+                        self.metrics.count('actions', 'insurance')
+                        self.ui.show_message(f"{player.name} takes insurance for ${stake}.")
+                        self.ui.update_player_hand(i)
+            dealer_blackjack = dealer_hand.is_blackjack
+            # With a peek the round ends here: nobody acts against a dealer natural
+            peeked = rules.dealer_peek and dealer_blackjack
+            if peeked:
+                self.ui.update_dealer_hand(dealer_hand, hide_first_card=False)
+                self.ui.show_message("Dealer has Blackjack!")
+            can_double_at = rules.can_double
+            das = rules.double_after_split
+            max_hands, resplit_aces = rules.max_hands, rules.resplit_aces
+            hit_split_aces = rules.hit_split_aces
+            for i, player in seated:
+                if peeked:
+                    break
+                self.ui.set_active_player(i)
+                if player.hand.get_value() == 21:
+                    self.ui.show_message(f"{player.name} has Blackjack!")
+                    continue
+                # Split hands are appended after the current one and played in order
+                while player.hand_index < len(player.hands):
+                    # A refused split is taken off the table for the rest of the hand,
+                    # so the next decision falls back to the non-split action
+                    split_refused = False
+                    if len(player.hands) > 1:
+                        self.ui.show_message(f"{player.name} plays hand {player.hand_index + 1} of {len(player.hands)}")
+                        self.ui.update_player_hand(i)
                     while player.hand.get_value() < 21:
+                        hand = player.hand
+                        can_split = (not split_refused and player.can_split(max_hands, resplit_aces)
+                                     and player.balance >= hand.bet)
+                        # Split aces take one card; they may only be re-split, if the rules allow it
+                        only_split = hand.is_split_aces and not hit_split_aces
+                        if only_split and not can_split:
+                            break
                         self.ui.show_message(f"{player.name}'s turn")
+                        can_double = (not only_split and len(hand.cards) == 2 and player.balance >= hand.bet
+                                      and can_double_at[hand.get_value() + SOFT * hand.is_soft]
+                                      and (das or not hand.from_split))
+                        can_surrender = rules.surrender and len(player.hands) == 1 and len(hand.cards) == 2
                         if not player.name.startswith('Bot'):
-                            available_actions = ["hit", "stand"]
-                            if len(player.hand.cards) == 2:
-                                if player.balance >= player.hand.bet:
-                                    available_actions.append("double down")
-                                if player.hand.cards[0].value == player.hand.cards[1].value:
-                                    available_actions.append("split")
-                            action = self._prompt(available_actions)
-                        else:
-                            self.ui.show_message(f"{player.name} is thinking...")
-                            if self.interactive:
-                                time.sleep(random.randint(1, 5))
-                            if len(player.hand.cards) == 2 and player.hand.cards[0].value == player.hand.cards[1].value:
-                                action = 'split'
-                            elif len(player.hand.cards) == 2 and player.hand.get_value() == 11 and player.balance >= player.hand.bet:
-                                action = 'double down'
-                            elif player.hand.get_value() < 11:
-                                action = 'hit'
-                            elif player.hand.get_value() == 11:
-                                action = 'hit'
-                            elif 12 <= player.hand.get_value() <= 16:
-                                action = random.choices(['hit', 'stand'], [0.3, 0.7], k=1)[0]
-                            else:
+                            available_actions = ["stand"] if only_split else ["hit", "stand"]
+                            if can_double:
+                                available_actions.append("double down")
+                            if can_split:
+                                available_actions.append("split")
+                            if can_surrender:
+                                available_actions.append("surrender")
+                            available_actions.append("hint")
+                            action = (yield Prompt(available_actions, 'action', i))
+                            if action not in available_actions:
+                                self.ui.show_message(f"{action} is not available.")
+                                continue
+                        else:
+                            self.ui.show_message(f"{player.name} is thinking...")
+                            if self.interactive:
+                                yield Pause(self.rng.randint(1, 5), 'bot')
+                            action = self.strategy.decide(hand, dealer_hand.cards[1], can_double, can_split, self.rng,
+                                                          unseen=lambda: unseen_counts(self.deck, dealer_hand),
+                                                          can_surrender=can_surrender, rules=rules)
+                            if only_split and action != 'split':
                                 action = 'stand'
                             self.ui.show_message(f"{player.name} chooses to {action}.")
                         if action == 'hit':
                             player.hit(self.deck)
+                            self.log.action(i, player.hand_index, action)
+                            self.metrics.count('actions', action)
+                            self.log.deal(i, player.hand_index, player.hand.cards[-1])
                             self.ui.update_player_hand(i)
                             if player.hand.get_value() > 21:
                                 self.ui.show_message(f"{player.name} busts!")
                                 break
                         elif action == 'double down':
-                            if player.balance >= player.hand.bet:
-                                if player.double_down(self.deck):
-                                    player.balance -= player.hand.bet
-                                    player.hand.bet *= 2
-                                    self.ui.update_player_hand(i)
-                                    self.ui.show_message(f"{player.name} doubled down!")
-                                    break
-                            else:
+                            if player.balance < player.hand.bet:
                                 self.ui.show_message("Not enough balance to double down.")
+                            elif player.double_down(self.deck):
+                                player.balance -= player.hand.bet
+                                player.hand.bet *= 2
+                                self.log.action(i, player.hand_index, action)
+                                self.metrics.count('actions', action)
+                                self.log.deal(i, player.hand_index, player.hand.cards[-1])
+                                self.ui.update_player_hand(i)
+                                self.ui.show_message(f"{player.name} doubled down!")
+                                break
                         elif action == 'split':
-                            if player.split(self.deck):
+                            if player.balance < player.hand.bet:
+                                split_refused = True
+                                self.ui.show_message("Not enough balance to split.")
+                            elif player.split(self.deck, max_hands, resplit_aces):
+                                player.balance -= player.hand.bet
+                                h = player.hand_index
+                                self.log.action(i, h, action)
+                                self.metrics.count('actions', action)
+                                self.log.deal(i, h + 1, player.hands[h + 1].cards[-1])
+                                self.log.deal(i, h, player.hand.cards[-1])
                                 self.ui.show_message(f"{player.name} split their hand!")
                                 self.ui.update_player_hand(i)
                             else:
+                                split_refused = True
                                 self.ui.show_message("Cannot split these cards.")
                         elif action == 'stand':
+                            self.log.action(i, player.hand_index, action)
+                            self.metrics.count('actions', action)
                             self.ui.show_message(f"{player.name} stands.")
                             break
-                self.ui.show_message("Dealer's turn...")
-                self.ui.update_dealer_hand(dealer_hand, hide_first_card=False)
-                if self.interactive:
-                    time.sleep(1)
-                while dealer_hand.get_value() < 17:
-                    dealer_hand.add_card(self.deck.deal_card())
-                    self.ui.update_dealer_hand(dealer_hand)
-                    if self.interactive:
-                        time.sleep(1)
-                dealer_value = dealer_hand.get_value()
-                dealer_bust = dealer_value > 21
-                for i, player in enumerate(self.players):
-                    player_value = player.hand.get_value()
-                    if player_value > 21:
-                        self.ui.show_message(f"{player.name} busts and loses ${player.hand.bet}.")
+                        elif action == 'surrender':
+                            hand.surrendered = True
+                            self.log.action(i, player.hand_index, action)
+                            self.metrics.count('actions', action)
+                            self.ui.show_message(f"{player.name} surrenders half the bet.")
+                            break
+                        elif action == 'hint':
+                            evs = action_evs(player.hand, dealer_hand.cards[1].points,
+                                             unseen_counts(self.deck, dealer_hand), can_double, can_split,
+                                             rules=rules)
+                            self.ui.show_message(format_hint(evs))
+                    player.hand_index += 1
+                player.hand_index = 0
+            self.metrics.lap('player_turns')
+            self.ui.show_message("Dealer's turn...")
+            self.ui.update_dealer_hand(dealer_hand, hide_first_card=False)
+            if self.interactive:
+                yield Pause(1, 'dealer')
+            dealer_hits = rules.dealer_hits
+            while dealer_hits[dealer_hand.get_value() + SOFT * dealer_hand.is_soft]:
+                dealer_hand.add_card(self.deck.deal_card())
+                self.log.deal(DEALER_SEAT, 0, dealer_hand.cards[-1])
+                self.ui.update_dealer_hand(dealer_hand)
+                if self.interactive:
+                    yield Pause(1, 'dealer')
+            self.metrics.lap('dealer_turn')
+            dealer_value = dealer_hand.get_value()
+            dealer_bust = dealer_value > 21
+            for i, player in seated:
+                for h, hand in enumerate(player.hands):
+                    # Name split hands in messages so each settlement reads on its own
+                    who = f"{player.name} (hand {h + 1})" if len(player.hands) > 1 else player.name
+                    payout, outcome = settle_hand(hand, dealer_value, dealer_blackjack, rules)
+                    player.balance += payout
+                    player.outcomes[outcome] += 1
+                    self.log.settle(i, h, hand.bet, payout)
+                    self.metrics.count('hands', outcome)
+                    if outcome == 'bust':
+                        self.ui.show_message(f"{who} busts and loses ${hand.bet}.")
+                    elif outcome == 'surrender':
+                        self.ui.show_message(f"{who} surrendered and gets ${payout} back.")
+                    elif outcome == 'blackjack':
+                        self.ui.show_message(f"{who} wins ${payout - hand.bet} with Blackjack!")
                     elif dealer_bust:
-                        player.balance += player.hand.bet * 2
-                        self.ui.show_message(f"{player.name} wins ${player.hand.bet}! Dealer busted.")
-                    elif player_value == 21 and len(player.hand.cards) == 2:
-                        player.balance += int(player.hand.bet * 2.5)
-                        self.ui.show_message(f"{player.name} wins ${int(player.hand.bet * 1.5)} with Blackjack!")
-                    elif player_value > dealer_value:
-                        player.balance += player.hand.bet * 2
-                        self.ui.show_message(f"{player.name} wins ${player.hand.bet}!")
-                    elif player_value < dealer_value:
-                        self.ui.show_message(f"{player.name} loses ${player.hand.bet}.")
+                        self.ui.show_message(f"{who} wins ${hand.bet}! Dealer busted.")
+                    elif outcome == 'win':
+                        self.ui.show_message(f"{who} wins ${hand.bet}!")
+                    elif outcome == 'lose':
+                        self.ui.show_message(f"{who} loses ${hand.bet}.")
                     else:
-                        player.balance += player.hand.bet
-                        self.ui.show_message(f"{player.name} pushes. Bet returned.")
-                    self.ui.update_player_hand(i)
-                    if player.balance <= 0:
-                        self.ui.show_message(f"{player.name} has run out of money! Game over.")
-                        return
-                self.ui.show_message("Press Enter to play another round or Ctrl+C to exit.")
-                if self.interactive:
-                    # wait for human to continue; in tests, skip
-                    self._prompt([""])
-        except KeyboardInterrupt:
-            TerminalUI.clear_screen()
-            print("Thanks for playing Blackjack!")
\ No newline at end of file
+                        self.ui.show_message(f"{who} pushes. Bet returned.")
+                if player.insurance:
+                    # Insurance pays 2:1 when the dealer has a natural
+                    payout = player.insurance * 3 if dealer_blackjack else 0
+                    player.balance += payout
+                    self.log.settle(i, INSURANCE_HAND, player.insurance, payout)
+                    if payout:
+                        self.ui.show_message(f"{player.name}'s insurance pays ${payout - player.insurance}.")
+                    else:
+                        self.ui.show_message(f"{player.name} loses the ${player.insurance} insurance bet.")
+                self.ui.update_player_hand(i)
+            busted = []
+            for i, player in seated:
+                if player.balance <= 0:
+                    player.seated = False
+                    busted.append(i)
+                    self.ui.show_message(f"{player.name} has run out of money and leaves the table.")
+            self.log.round_end()
+            self.metrics.lap('settlement')
+            self.metrics.round_end()
+            yield RoundResult(self.rounds_played, [
+                SeatResult(i, player.name, sum(hand.bet for hand in player.hands) + player.insurance,
+                           player.balance - start, player.balance)
+                for (i, player), start in zip(seated, start_balances)
+            ], busted)
+            # The table plays on without busted bots; it closes when the human
+            # (or, headless, the last bot) is out
+            if (self.interactive and not self.players[0].seated) or len(busted) == len(seated):
+                self.ui.show_message("Game over.")
+                return
+            self.ui.show_message("Press Enter to play another round or Ctrl+C to exit.")
+            if self.interactive:
+                # wait for human to continue; in tests, skip
+                yield Prompt([""], 'continue')
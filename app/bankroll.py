@@ -0,0 +1,223 @@
+# bankroll.py
+"""Streaming bankroll analysis over per-round results.
+
+BankrollAnalyzer consumes the RoundResults that Game.results() yields and
+keeps single-pass statistics: Welford mean/variance of the per-round net,
+and per seat the peak, current drawdown, worst drawdown and ruin. A
+seat's track is folded into the aggregates and dropped once it busts or
+its table finishes (consume() finishes the table it was given), so memory
+grows with the seats still playing, never with the number of rounds.
+
+    analyzer = BankrollAnalyzer()
+    game = Game(6, 3, interactive=False, starting_balance=1000, betting='ramp')
+    analyzer.consume(game.results(max_rounds=100_000))
+    analyzer.summary()
+
+Drawdowns are measured from each seat's running peak in units of its
+starting bankroll; an episode ends when the seat makes a new peak (or the
+run ends). Risk of ruin is reported twice: empirically, as the fraction of
+seats that went broke, and from the diffusion approximation
+exp(-2 * mean * bankroll / variance). N0 = variance / mean^2 is the number
+of rounds after which the expected win equals one standard deviation.
+"""
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+from app import Game
+from metrics import Histogram
+from parallel import table_rng
+
+# Upper bounds of the drawdown histogram buckets, as fractions of the
+# starting bankroll; seats that won first can fall more than 1.0 from peak
+DRAWDOWN_BUCKETS = tuple(i / 20 for i in range(1, 21)) + (1.25, 1.5, 2.0, 3.0, 5.0, 10.0)
+
+
+class RunningStats:
+    # Welford's online mean and variance
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'RunningStats'):
+        # Chan et al.'s pairwise combination, for stats gathered in parallel
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class SeatTrack:
+    # One seat's bankroll path, reduced to what the drawdown stats need:
+    # trough is the lowest balance since the last peak
+    __slots__ = ('bankroll', 'peak', 'trough', 'max_drawdown', 'rounds', 'ruined_at')
+
+    def __init__(self, bankroll: int):
+        self.bankroll = bankroll
+        self.peak = self.trough = bankroll
+        self.max_drawdown = 0
+        self.rounds = 0
+        self.ruined_at: Optional[int] = None
+
+
+class BankrollAnalyzer:
+    def __init__(self, buckets: Tuple[float, ...] = DRAWDOWN_BUCKETS):
+        self.buckets = buckets
+        self.net = RunningStats()           # per seat-round net result
+        self.wagered = 0
+        self.total_net = 0
+        self.episodes = Histogram(buckets)  # depth of each closed drawdown episode
+        self.ruin_rounds = RunningStats()   # rounds a seat lasted before going broke
+        self.max_drawdowns = Histogram(buckets)  # worst drawdown of each folded seat
+        self.seats_seen = 0
+        self.bankrolls = 0                  # sum of every seat's starting bankroll
+        self.seats: Dict[Tuple[int, int], SeatTrack] = {}  # seats still playing
+
+    def update(self, result, table: int = 0):
+        seats = self.seats
+        for seat in result.seats:
+            track = seats.get((table, seat.seat))
+            if track is None:
+                track = seats[table, seat.seat] = SeatTrack(seat.balance - seat.net)
+                self.seats_seen += 1
+                self.bankrolls += track.bankroll
+            self.net.add(seat.net)
+            self.wagered += seat.wagered
+            self.total_net += seat.net
+            track.rounds += 1
+            balance = seat.balance
+            if balance > track.peak:
+                if track.trough < track.peak:
+                    self.episodes.observe((track.peak - track.trough) / track.bankroll)
+                track.peak = track.trough = balance
+            elif balance < track.trough:
+                track.trough = balance
+                if track.peak - balance > track.max_drawdown:
+                    track.max_drawdown = track.peak - balance
+        for seat in result.busted:
+            track = seats.pop((table, seat))
+            track.ruined_at = track.rounds
+            self.ruin_rounds.add(track.rounds)
+            self.episodes.observe((track.peak - track.trough) / track.bankroll)
+            self._fold(track, self.episodes, self.max_drawdowns)
+
+    def finish(self, table: int = 0):
+        # The table's run is over: fold its remaining seats
+        for key in [key for key in self.seats if key[0] == table]:
+            self._fold(self.seats.pop(key), self.episodes, self.max_drawdowns)
+
+    def consume(self, results: Iterable, table: int = 0) -> 'BankrollAnalyzer':
+        for result in results:
+            self.update(result, table)
+        self.finish(table)
+        return self
+
+    @staticmethod
+    def _fold(track: SeatTrack, episodes: Histogram, max_drawdowns: Histogram):
+        max_drawdowns.observe(track.max_drawdown / track.bankroll)
+        # An episode still open at the end counts at its current depth; a
+        # ruined seat's was recorded when it busted
+        if track.ruined_at is None and track.trough < track.peak:
+            episodes.observe((track.peak - track.trough) / track.bankroll)
+
+    def risk_of_ruin(self) -> float:
+        # Share of the seats followed that went broke
+        if not self.seats_seen:
+            return 0.0
+        return self.ruin_rounds.count / self.seats_seen
+
+    def analytic_risk_of_ruin(self, bankroll: Optional[float] = None) -> float:
+        # Brownian approximation for an unlimited session; bankroll defaults
+        # to the mean starting bankroll of the seats followed
+        if bankroll is None:
+            bankroll = self.bankrolls / max(self.seats_seen, 1)
+        mean, variance = self.net.mean, self.net.variance
+        if mean <= 0:
+            return 1.0
+        if variance == 0:
+            return 0.0
+        return min(1.0, math.exp(-2 * mean * bankroll / variance))
+
+    def n0(self) -> float:
+        mean = self.net.mean
+        return self.net.variance / (mean * mean) if mean else math.inf
+
+    def summary(self) -> Dict:
+        # Seats still playing count as if their run ended here
+        max_drawdowns, episodes = _copy(self.max_drawdowns), _copy(self.episodes)
+        for track in self.seats.values():
+            self._fold(track, episodes, max_drawdowns)
+        return {
+            'seats': self.seats_seen,
+            'rounds': self.net.count,
+            'mean_net': self.net.mean,
+            'stdev_net': self.net.stdev,
+            'ev_per_wager': self.total_net / self.wagered if self.wagered else 0.0,
+            'n0': self.n0(),
+            'risk_of_ruin': self.risk_of_ruin(),
+            'risk_of_ruin_analytic': self.analytic_risk_of_ruin(),
+            'rounds_to_ruin': self.ruin_rounds.mean if self.ruin_rounds.count else None,
+            'max_drawdown': _distribution(max_drawdowns),
+            'drawdown_episodes': _distribution(episodes),
+        }
+
+
+def _copy(histogram: Histogram) -> Histogram:
+    copy = Histogram(histogram.buckets)
+    copy.counts = list(histogram.counts)
+    copy.sum, copy.count = histogram.sum, histogram.count
+    return copy
+
+
+def _distribution(histogram: Histogram) -> Dict:
+    return {
+        'count': histogram.count,
+        'mean': histogram.sum / histogram.count if histogram.count else 0.0,
+        'p50': histogram.quantile(0.5),
+        'p90': histogram.quantile(0.9),
+        'p99': histogram.quantile(0.99),
+    }
+
+
+def simulate(tables: int, rounds: int, num_bots: int = 3, num_decks: int = 6, seed: int = 0,
+             starting_balance: int = 1000, **game_kwargs) -> BankrollAnalyzer:
+    """Stream tables of bots through one analyzer; extra kwargs go to Game."""
+    analyzer = BankrollAnalyzer()
+    for table in range(tables):
+        game = Game(num_decks, num_bots, interactive=False, rng=table_rng(seed, table),
+                    starting_balance=starting_balance, **game_kwargs)
+        analyzer.consume(game.results(max_rounds=rounds), table)
+    return analyzer
+
+
+if __name__ == '__main__':
+    import json
+    import sys
+    tables = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    print(json.dumps(simulate(tables, rounds, betting='ramp', counting='hilo').summary(), indent=2))
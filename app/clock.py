@@ -0,0 +1,48 @@
+# clock.py
+"""Pacing for interactive tables.
+
+Game.steps yields Pause(seconds, reason) where an interactive table waits
+for effect: 'bot' for bot bets and decisions, 'dealer' for dealer draws.
+A Clock turns each pause into a delay: the nominal seconds scaled by the
+speed preset, or nothing for bot pauses when skip_to_my_turn is set.
+play() sleeps for the delay; server.py awaits it instead.
+
+    Game(6, 5, clock=Clock('fast', skip_to_my_turn=True)).play()
+"""
+import time
+from typing import List, Union
+
+SPEEDS = {'instant': 0.0, 'fast': 0.25, 'realistic': 1.0}
+
+
+class Clock:
+    def __init__(self, speed: Union[str, float] = 'realistic', skip_to_my_turn: bool = False):
+        # speed is a preset name or a plain scale factor for the nominal seconds
+        if isinstance(speed, str):
+            if speed not in SPEEDS:
+                raise ValueError(f'Unknown speed {speed!r}; expected one of {", ".join(SPEEDS)}')
+            speed = SPEEDS[speed]
+        self.scale = float(speed)
+        self.skip_to_my_turn = skip_to_my_turn
+
+    def delay(self, pause) -> float:
+        if self.skip_to_my_turn and pause.reason == 'bot':
+            return 0.0
+        return pause.seconds * self.scale
+
+    def pause(self, pause):
+        seconds = self.delay(pause)
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    # Advances a counter instead of sleeping, so interactive tests run instantly
+    def __init__(self, speed: Union[str, float] = 'realistic', skip_to_my_turn: bool = False):
+        super().__init__(speed, skip_to_my_turn)
+        self.now = 0.0
+        self.pauses: List = []
+
+    def pause(self, pause):
+        self.pauses.append(pause)
+        self.now += self.delay(pause)
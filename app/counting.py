@@ -0,0 +1,106 @@
+# counting.py
+"""Card-counting systems and count-driven bet sizing.
+
+Deck keeps the running count for one system lazily: deal_card only
+advances the deal index, and a count query first tallies the tags of the
+cards dealt since the last query, so each card is counted once. shuffle
+resets it. Tags are listed per rank in VALUES order (2 3 4 5 6 7 8 9 10
+J Q K A).
+
+The count covers every card dealt from the shoe, including the dealer's
+hole card once it is out. Bet sizing reads it between rounds, when that
+card has been turned over; the insurance decision comes while it is
+still face down, so it passes the hole card as hidden and
+Deck.true_count leaves it out.
+
+    deck = Deck(6, counting='hilo')
+    ...
+    deck.running_count, deck.true_count()
+"""
+import math
+from typing import Dict, NamedTuple, Sequence, Tuple, Union
+
+
+class CountingSystem(NamedTuple):
+    name: str
+    tags: Tuple[int, ...]  # per rank index, 2..A
+    # Unbalanced systems (KO) start from an initial running count instead of zero
+    initial_per_deck: int = 0
+    initial_offset: int = 0
+
+    def initial_count(self, num_decks: int) -> int:
+        return self.initial_offset + self.initial_per_deck * num_decks
+
+
+#                          2  3  4  5  6  7  8  9  T  J  Q  K  A
+HI_LO = CountingSystem('hilo', (1, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, -1))
+KO = CountingSystem('ko', (1, 1, 1, 1, 1, 1, 0, 0, -1, -1, -1, -1, -1), -4, 4)
+HI_OPT_I = CountingSystem('hiopt1', (0, 1, 1, 1, 1, 0, 0, 0, -1, -1, -1, -1, 0))
+OMEGA_II = CountingSystem('omega2', (1, 1, 2, 2, 2, 1, 0, -1, -2, -2, -2, -2, 0))
+ZEN = CountingSystem('zen', (1, 1, 2, 2, 2, 1, 0, 0, -2, -2, -2, -2, -1))
+
+SYSTEMS: Dict[str, CountingSystem] = {system.name: system for system in (HI_LO, KO, HI_OPT_I, OMEGA_II, ZEN)}
+
+
+def get_system(system: Union[str, CountingSystem, None]) -> CountingSystem:
+    if system is None:
+        return HI_LO
+    if isinstance(system, str):
+        if system not in SYSTEMS:
+            raise ValueError(f'Unknown counting system {system!r}; expected one of {", ".join(SYSTEMS)}')
+        return SYSTEMS[system]
+    if len(system.tags) != 13:
+        raise ValueError(f'{system.name}: needs 13 tags, got {len(system.tags)}')
+    return system
+
+
+# Bot bet sizing: anything with bet(player, deck) -> int and
+# insure(player, deck, hidden) -> bool (take insurance when the rules offer
+# it; hidden are the dealt cards the player can't see)
+
+class FlatBet:
+    def __init__(self, amount: int = 10):
+        self.amount = amount
+
+    def bet(self, player, deck) -> int:
+        return self.amount
+
+    def insure(self, player, deck, hidden=()) -> bool:
+        return False
+
+
+class BettingRamp:
+    # Bets unit * units for the floored true count. steps are (true count,
+    # units) pairs in increasing order; counts below the first step bet one
+    # unit and counts past the last keep its units. Compiled to a list, so
+    # each bet is an index lookup.
+    def __init__(self, unit: int = 10, steps: Sequence[Tuple[int, int]] = ((2, 2), (3, 4), (4, 6), (5, 8))):
+        self.unit = unit
+        self.low = steps[0][0] - 1
+        self.high = steps[-1][0]
+        self.units = [1] * (self.high - self.low + 1)
+        for count, units in steps:
+            for index in range(count - self.low, len(self.units)):
+                self.units[index] = units
+
+    def units_for(self, true_count: float) -> int:
+        index = min(max(math.floor(true_count), self.low), self.high) - self.low
+        return self.units[index]
+
+    def bet(self, player, deck) -> int:
+        return min(self.unit * self.units_for(deck.true_count()), player.balance)
+
+    def insure(self, player, deck, hidden=()) -> bool:
+        # The Hi-Lo insurance index: worth it from a true count of +3
+        return deck.true_count(hidden) >= 3
+
+
+BETTING = {'flat': FlatBet, 'ramp': BettingRamp}
+
+
+def get_betting(betting) -> object:
+    if betting is None:
+        return FlatBet()
+    if isinstance(betting, str):
+        return BETTING[betting]()
+    return betting
@@ -0,0 +1,234 @@
+# events.py
+"""Append-only binary round log and replayer.
+
+File layout:
+    b'BJEV' | u8 version | u32 header length | JSON header (seat names, rules)
+    then one frame per round: u32 frame length | 12-byte events...
+
+Every event is packed as <BBBBii: kind, seat, hand, arg, a, b. Cards are
+stored as Card.code and the dealer uses seat DEALER_SEAT; insurance bets
+settle on hand INSURANCE_HAND. Rounds are built
+in memory and appended as whole frames through a large write buffer; the
+reader drops a torn final frame, so a crash only loses the rounds in flight.
+Reopening a log appends to it, after cutting off any torn frame.
+
+    with EventLog('session.bjev') as log:
+        Game(6, 3, interactive=False, log=log).play(max_rounds=1000)
+    for record in replay('session.bjev'):
+        assert record.audit()
+"""
+import json
+import os
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app import CARDS, DEALER_SEAT, INSURANCE_HAND, Hand, settle_hand
+from rules import HOUSE, CompiledRules, Rules, compile_rules
+
+MAGIC = b'BJEV'
+VERSION = 1
+
+EVENT = struct.Struct('<BBBBii')
+FRAME = struct.Struct('<I')
+
+ROUND, SHUFFLE, BET, DEAL, ACTION, SETTLE = range(1, 7)
+ACTIONS = ['hit', 'stand', 'double down', 'split', 'surrender', 'insurance']
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+
+class EventLog:
+    # Appends to an existing log: a torn final frame is cut off first, and
+    # the table opened on it must have the same seats and rules
+    def __init__(self, path: str, buffer_size: int = 1 << 20):
+        self.path = path
+        self._existing = None
+        if os.path.exists(path) and os.path.getsize(path):
+            self._existing, end = _scan_log(path)
+            os.truncate(path, end)
+        self._file = open(path, 'ab', buffering=buffer_size)
+        self._frame = bytearray()
+        self._header_written = False
+
+    def open_table(self, seat_names: List[str], rules: Optional[Dict] = None):
+        if self._header_written:
+            return
+        header = {'seats': seat_names, 'rules': rules}
+        if self._existing is not None:
+            # Compare through JSON so tuples in the rules match the stored lists
+            if json.loads(json.dumps(header)) != self._existing:
+                raise ValueError(f'{self.path} was written for a different table '
+                                 f'(seats {self._existing.get("seats")}, rules {self._existing.get("rules")})')
+        else:
+            data = json.dumps(header).encode()
+            self._file.write(MAGIC + bytes([VERSION]) + FRAME.pack(len(data)) + data)
+        self._header_written = True
+
+    def _event(self, kind, seat=0, hand=0, arg=0, a=0, b=0):
+        self._frame += EVENT.pack(kind, seat, hand, arg, a, b)
+
+    def round_start(self, number):
+        self._frame.clear()
+        self._event(ROUND, a=number)
+
+    def shuffle(self):
+        self._event(SHUFFLE)
+
+    def bet(self, seat, amount):
+        self._event(BET, seat, a=amount)
+
+    def deal(self, seat, hand, card):
+        self._event(DEAL, seat, hand, card.code)
+
+    def action(self, seat, hand, action):
+        self._event(ACTION, seat, hand, ACTION_CODES[action])
+
+    def settle(self, seat, hand, bet, payout):
+        self._event(SETTLE, seat, hand, a=bet, b=payout)
+
+    def round_end(self):
+        self._file.write(FRAME.pack(len(self._frame)))
+        self._file.write(self._frame)
+        self._frame.clear()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read_header(f, path: str) -> Dict:
+    if f.read(4) != MAGIC:
+        raise ValueError(f'{path} is not a round log')
+    version = f.read(1)[0]
+    if version != VERSION:
+        raise ValueError(f'Unsupported round log version {version}')
+    (size,) = FRAME.unpack(f.read(FRAME.size))
+    return json.loads(f.read(size))
+
+
+def _scan_log(path: str) -> Tuple[Dict, int]:
+    # The header and the offset just past the last complete frame
+    with open(path, 'rb') as f:
+        header = _read_header(f, path)
+        end = f.tell()
+        while True:
+            prefix = f.read(FRAME.size)
+            if len(prefix) < FRAME.size:
+                return header, end
+            (size,) = FRAME.unpack(prefix)
+            if len(f.read(size)) < size:
+                return header, end
+            end = f.tell()
+
+
+def read_log(path: str) -> Tuple[Dict, Iterator[List[tuple]]]:
+    """Return the header and a generator of rounds, each a list of event tuples."""
+    f = open(path, 'rb')
+    try:
+        header = _read_header(f, path)
+    except ValueError:
+        f.close()
+        raise
+
+    def rounds():
+        with f:
+            while True:
+                prefix = f.read(FRAME.size)
+                if len(prefix) < FRAME.size:
+                    return
+                (size,) = FRAME.unpack(prefix)
+                data = f.read(size)
+                if len(data) < size:
+                    return
+                yield list(EVENT.iter_unpack(data))
+
+    return header, rounds()
+
+
+@dataclass
+class SeatRecord:
+    name: str
+    hands: List[Hand] = field(default_factory=lambda: [Hand()])
+    actions: List[Tuple[int, str]] = field(default_factory=list)
+    payouts: List[int] = field(default_factory=list)
+    settled_bets: List[int] = field(default_factory=list)
+    insurance: int = 0
+    insurance_payout: int = 0
+
+    @property
+    def net(self) -> int:
+        return (sum(self.payouts) + self.insurance_payout
+                - sum(hand.bet for hand in self.hands) - self.insurance)
+
+
+@dataclass
+class RoundRecord:
+    number: int
+    shuffled: bool = False
+    dealer: Hand = field(default_factory=Hand)
+    seats: Dict[int, SeatRecord] = field(default_factory=dict)
+    rules: CompiledRules = HOUSE
+
+    def audit(self) -> bool:
+        # Recompute every payout from the rebuilt hands
+        dealer_value = self.dealer.get_value()
+        dealer_blackjack = self.dealer.is_blackjack
+        for seat in self.seats.values():
+            expected = [settle_hand(hand, dealer_value, dealer_blackjack, self.rules)[0] for hand in seat.hands]
+            if expected != seat.payouts or seat.settled_bets != [hand.bet for hand in seat.hands]:
+                return False
+            if seat.insurance_payout != (seat.insurance * 3 if dealer_blackjack else 0):
+                return False
+        return True
+
+
+def replay_round(events: List[tuple], seat_names: List[str], rules: CompiledRules = HOUSE) -> RoundRecord:
+    record = None
+    for kind, seat, hand, arg, a, b in events:
+        if kind == ROUND:
+            record = RoundRecord(a, rules=rules)
+        elif kind == SHUFFLE:
+            record.shuffled = True
+        elif kind == BET:
+            record.seats[seat] = SeatRecord(seat_names[seat])
+            record.seats[seat].hands[0].bet = a
+        elif kind == DEAL:
+            target = record.dealer if seat == DEALER_SEAT else record.seats[seat].hands[hand]
+            target.add_card(CARDS[arg])
+        elif kind == ACTION:
+            player = record.seats[seat]
+            action = ACTIONS[arg]
+            player.actions.append((hand, action))
+            current = player.hands[hand]
+            if action == 'double down':
+                current.bet *= 2
+            elif action == 'surrender':
+                current.surrendered = True
+            elif action == 'insurance':
+                player.insurance = current.bet // 2
+            elif action == 'split':
+                # Same move as Player.split; the following DEALs refill both hands
+                new_hand = Hand()
+                new_hand.bet = current.bet
+                new_hand.add_card(current.pop_card())
+                current.from_split = new_hand.from_split = True
+                player.hands.insert(hand + 1, new_hand)
+        elif kind == SETTLE and hand == INSURANCE_HAND:
+            record.seats[seat].insurance_payout = b
+        elif kind == SETTLE:
+            record.seats[seat].settled_bets.append(a)
+            record.seats[seat].payouts.append(b)
+    return record
+
+
+def replay(path: str) -> Iterator[RoundRecord]:
+    header, rounds = read_log(path)
+    # Logs written before rules were recorded used the house rules
+    rules = compile_rules(Rules(**header['rules'])) if header.get('rules') else HOUSE
+    for events in rounds:
+        yield replay_round(events, header['seats'], rules)
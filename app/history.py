@@ -0,0 +1,217 @@
+# history.py
+"""Columnar on-disk store of per-hand results, read through NumPy memmaps.
+
+A store is a directory holding one raw little-endian file per column plus
+schema.json with the row count. Rows are hands (split hands are separate
+rows). Readers map the files with np.memmap, so slicing is zero-copy and
+aggregations stream through the data in chunks instead of loading it.
+
+    import_log('session.bjev', 'history/')
+    store = HistoryStore('history/')
+    store.summary('up')           # win rate, EV and bust rate per dealer up-card
+    store.summary('first_action')
+"""
+import json
+import os
+from typing import Dict, Iterable
+
+import numpy as np
+
+from events import ACTION_CODES, replay
+
+MAX_CARDS = 12
+MAX_ACTIONS = 12
+PAD = 255
+
+# name -> (dtype, per-row width); width 1 columns are stored flat
+COLUMNS = {
+    'up': ('u1', 1),            # dealer up-card points, ace = 11
+    'dealer_total': ('u1', 1),
+    'start_total': ('u1', 1),   # total of the hand's first two cards
+    'total': ('u1', 1),         # final total
+    'ncards': ('u1', 1),
+    'cards': ('u1', MAX_CARDS),  # Card.code, PAD-filled
+    'first_action': ('u1', 1),  # events.ACTIONS code, PAD if none
+    'actions': ('u1', MAX_ACTIONS),
+    'split': ('u1', 1),
+    'bet': ('<i4', 1),
+    'payout': ('<i4', 1),
+}
+
+# Buckets that can be grouped on, with the number of bins they need
+BUCKETS = {'up': 12, 'start_total': 32, 'total': 32, 'first_action': 256, 'dealer_total': 32, 'ncards': 32}
+
+
+class HistoryWriter:
+    def __init__(self, directory: str, flush_rows: int = 65536):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.flush_rows = flush_rows
+        self.rows = _read_schema(directory).get('rows', 0)
+        self._pending = {name: [] for name in COLUMNS}
+        self._files = {}
+        for name, (dtype, width) in COLUMNS.items():
+            path = os.path.join(directory, f'{name}.bin')
+            # Drop bytes a crashed flush wrote past the last committed row
+            if os.path.exists(path):
+                os.truncate(path, min(os.path.getsize(path), self.rows * np.dtype(dtype).itemsize * width))
+            self._files[name] = open(path, 'ab')
+
+    def add_hand(self, up: int, dealer_total: int, cards: list, actions: list, split: bool,
+                 bet: int, payout: int):
+        total = _hand_value(cards)
+        row = self._pending
+        row['up'].append(up)
+        row['dealer_total'].append(dealer_total)
+        row['start_total'].append(_hand_value(cards[:2]))
+        row['total'].append(total)
+        row['ncards'].append(len(cards))
+        row['cards'].append([c.code for c in cards[:MAX_CARDS]] + [PAD] * (MAX_CARDS - min(len(cards), MAX_CARDS)))
+        codes = [ACTION_CODES[a] for a in actions[:MAX_ACTIONS]]
+        row['first_action'].append(codes[0] if codes else PAD)
+        row['actions'].append(codes + [PAD] * (MAX_ACTIONS - len(codes)))
+        row['split'].append(split)
+        row['bet'].append(bet)
+        row['payout'].append(payout)
+        if len(row['up']) >= self.flush_rows:
+            self.flush()
+
+    def add_round(self, record):
+        # record is an events.RoundRecord
+        dealer = record.dealer
+        up = 11 if dealer.cards[1].is_ace else dealer.cards[1].points
+        dealer_total = dealer.get_value()
+        for seat in record.seats.values():
+            for h, hand in enumerate(seat.hands):
+                if h >= len(seat.payouts):
+                    continue  # never settled
+                actions = [action for index, action in seat.actions if index == h and action != 'insurance']
+                self.add_hand(up, dealer_total, hand.cards, actions, hand.from_split,
+                              hand.bet, seat.payouts[h])
+
+    def flush(self):
+        count = len(self._pending['up'])
+        if not count:
+            return
+        for name, (dtype, _) in COLUMNS.items():
+            self._files[name].write(np.asarray(self._pending[name], dtype=dtype).tobytes())
+            self._pending[name].clear()
+            self._files[name].flush()
+        self.rows += count
+        # Schema last, so readers never see rows whose bytes aren't written;
+        # written then renamed, so a crash leaves the old schema intact
+        path = os.path.join(self.directory, 'schema.json')
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'rows': self.rows, 'columns': {k: list(v) for k, v in COLUMNS.items()}}, f)
+        os.replace(tmp, path)
+
+    def close(self):
+        self.flush()
+        for f in self._files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _hand_value(cards) -> int:
+    hard = sum(c.points for c in cards)
+    if any(c.is_ace for c in cards) and hard <= 11:
+        return hard + 10
+    return hard
+
+
+def _read_schema(directory: str) -> Dict:
+    path = os.path.join(directory, 'schema.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def import_log(log_path: str, directory: str) -> int:
+    """Append every round of an events.EventLog file to a store; returns rows written."""
+    with HistoryWriter(directory) as writer:
+        start = writer.rows
+        for record in replay(log_path):
+            writer.add_round(record)
+        writer.flush()
+        return writer.rows - start
+
+
+class HistoryStore:
+    def __init__(self, directory: str, chunk_rows: int = 1 << 22):
+        schema = _read_schema(directory)
+        if not schema:
+            raise FileNotFoundError(f'No history store in {directory}')
+        self.rows = schema['rows']
+        self.chunk_rows = chunk_rows
+        self.columns = {}
+        for name, (dtype, width) in schema['columns'].items():
+            shape = (self.rows,) if width == 1 else (self.rows, width)
+            path = os.path.join(directory, f'{name}.bin')
+            if self.rows == 0:
+                self.columns[name] = np.zeros(shape, dtype=dtype)
+            else:
+                self.columns[name] = np.memmap(path, dtype=dtype, mode='r', shape=shape)
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def _chunks(self) -> Iterable[slice]:
+        for start in range(0, self.rows, self.chunk_rows):
+            yield slice(start, min(start + self.chunk_rows, self.rows))
+
+    def summary(self, bucket: str, where=None) -> Dict[int, Dict[str, float]]:
+        """Per-bucket hand count, win rate, EV per unit bet and bust rate.
+
+        where, if given, is a function of a chunk accessor returning a boolean mask,
+        e.g. lambda c: c('split') == 1.
+        """
+        bins = BUCKETS[bucket]
+        count = np.zeros(bins)
+        wins = np.zeros(bins)
+        busts = np.zeros(bins)
+        net = np.zeros(bins)
+        staked = np.zeros(bins)
+        for part in self._chunks():
+            def column(name, part=part):
+                return self.columns[name][part]
+            keys = column(bucket).astype(np.intp)
+            bet = column('bet').astype(np.float64)
+            payout = column('payout').astype(np.float64)
+            if where is not None:
+                mask = where(column)
+                keys, bet, payout = keys[mask], bet[mask], payout[mask]
+                total = column('total')[mask]
+            else:
+                total = column('total')
+            count += np.bincount(keys, minlength=bins)
+            wins += np.bincount(keys, weights=payout > bet, minlength=bins)
+            busts += np.bincount(keys, weights=total > 21, minlength=bins)
+            net += np.bincount(keys, weights=payout - bet, minlength=bins)
+            staked += np.bincount(keys, weights=bet, minlength=bins)
+        return {
+            int(key): {
+                'hands': int(count[key]),
+                'win_rate': wins[key] / count[key],
+                'ev': net[key] / staked[key] if staked[key] else 0.0,
+                'bust_rate': busts[key] / count[key],
+            }
+            for key in np.flatnonzero(count)
+        }
+
+    def ev(self) -> float:
+        net = staked = 0.0
+        for part in self._chunks():
+            bet = self.columns['bet'][part].astype(np.float64)
+            net += (self.columns['payout'][part] - bet).sum()
+            staked += bet.sum()
+        return net / staked if staked else 0.0
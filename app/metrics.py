@@ -0,0 +1,194 @@
+# metrics.py
+"""Per-phase timers, counters and round-latency histograms for Game.
+
+Game calls its metrics object at phase boundaries; each lap(phase) charges
+the time since the previous boundary to that phase. The default
+NullMetrics does nothing and leaves the UI unwrapped, so an uninstrumented
+game pays a handful of no-op calls per round.
+
+    metrics = Metrics()
+    Game(6, 3, interactive=False, metrics=metrics).play(max_rounds=10_000)
+    metrics.write_prometheus('blackjack.prom')
+    metrics.write_json('blackjack.json')
+
+Phases: setup (frame, shuffle), bets, deal, player_turns, dealer_turn,
+settlement. UI calls are timed per method as well; that time is also part
+of whichever phase made the call. Phases that wait on a player (prompts,
+pauses) include the wait.
+"""
+import json
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+PHASES = ('setup', 'bets', 'deal', 'player_turns', 'dealer_turn', 'settlement')
+
+# Upper bounds, in seconds, of the round latency histogram buckets
+ROUND_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PREFIX = 'blackjack'
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = ROUND_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        # Upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class InstrumentedUI:
+    # Proxies a UI, timing and counting every method call
+    def __init__(self, ui, metrics: 'Metrics'):
+        self._ui = ui
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        attr = getattr(self._ui, name)
+        if not callable(attr):
+            return attr
+        metrics = self._metrics
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                metrics.ui_seconds[name] += time.perf_counter() - start
+                metrics.ui_calls[name] += 1
+        # Cache the wrapper so __getattr__ only runs once per method
+        self.__dict__[name] = timed
+        return timed
+
+
+class Metrics:
+    def __init__(self, buckets: Tuple[float, ...] = ROUND_BUCKETS, time_ui: bool = True):
+        # time_ui=False keeps the phase timers but skips the per-call UI proxy,
+        # which dominates the cost on a headless table
+        self.time_ui = time_ui
+        self.phase_seconds: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.counters: Counter = Counter()  # (name, label) -> count
+        self.ui_calls: Counter = Counter()
+        self.ui_seconds: Counter = Counter()
+        self.round_latency = Histogram(buckets)
+        self._round_start = 0.0
+        self._last = 0.0
+
+    def wrap_ui(self, ui):
+        return InstrumentedUI(ui, self) if self.time_ui else ui
+
+    def round_start(self):
+        self._round_start = self._last = time.perf_counter()
+
+    def lap(self, phase: str):
+        now = time.perf_counter()
+        self.phase_seconds[phase] += now - self._last
+        self._last = now
+
+    def count(self, name: str, label: Optional[str] = None, amount: int = 1):
+        self.counters[name, label] += amount
+
+    def round_end(self):
+        self.counters['rounds', None] += 1
+        self.round_latency.observe(time.perf_counter() - self._round_start)
+
+    def summary(self) -> Dict:
+        counters: Dict = {}
+        for (name, label), value in sorted(self.counters.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+            if label is None:
+                counters[name] = value
+            else:
+                counters.setdefault(name, {})[label] = value
+        latency = self.round_latency
+        return {
+            'phase_seconds': dict(self.phase_seconds),
+            'counters': counters,
+            'ui_calls': dict(self.ui_calls),
+            'ui_seconds': dict(self.ui_seconds),
+            'round_seconds': {
+                'count': latency.count,
+                'sum': latency.sum,
+                'mean': latency.sum / latency.count if latency.count else 0.0,
+                'p50': latency.quantile(0.5),
+                'p99': latency.quantile(0.99),
+                'buckets': dict(zip([str(b) for b in latency.buckets] + ['+Inf'], latency.counts)),
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+
+        family('phase_seconds_total', 'counter', 'Time spent in each round phase.')
+        for phase, seconds in self.phase_seconds.items():
+            lines.append(f'{PREFIX}_phase_seconds_total{{phase="{phase}"}} {seconds!r}')
+        names = sorted({name for name, _ in self.counters})
+        for name in names:
+            family(f'{name}_total', 'counter', f'Count of {name.replace("_", " ")}.')
+            for (counter, label), value in sorted(self.counters.items(), key=lambda item: item[0][1] or ''):
+                if counter != name:
+                    continue
+                labels = f'{{kind="{label}"}}' if label is not None else ''
+                lines.append(f'{PREFIX}_{name}_total{labels} {value}')
+        family('ui_calls_total', 'counter', 'UI method calls.')
+        for method, value in sorted(self.ui_calls.items()):
+            lines.append(f'{PREFIX}_ui_calls_total{{method="{method}"}} {value}')
+        family('ui_seconds_total', 'counter', 'Time spent in UI methods.')
+        for method, value in sorted(self.ui_seconds.items()):
+            lines.append(f'{PREFIX}_ui_seconds_total{{method="{method}"}} {value!r}')
+        family('round_seconds', 'histogram', 'Wall time per round.')
+        latency = self.round_latency
+        cumulative = 0
+        for bound, count in zip(list(latency.buckets) + ['+Inf'], latency.counts):
+            cumulative += count
+            lines.append(f'{PREFIX}_round_seconds_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{PREFIX}_round_seconds_sum {latency.sum!r}')
+        lines.append(f'{PREFIX}_round_seconds_count {latency.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        with open(path, 'w') as f:
+            f.write(self.to_prometheus())
+
+    def write_json(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+class NullMetrics:
+    def wrap_ui(self, ui):
+        return ui
+
+    def round_start(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def count(self, name, label=None, amount=1):
+        pass
+
+    def round_end(self):
+        pass
@@ -0,0 +1,332 @@
+# montecarlo.py
+"""Vectorized Monte Carlo strategy evaluator.
+
+Plays millions of single-seat hands at once on integer-encoded shoes, with
+the same dealing order, dealer-stands-on-17 rule, split rules and payouts
+as Game.play. Rounds where the seat splits are replayed row by row, since
+their hands multiply; everything else stays vectorized. Requires NumPy.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from strategy import HARD, SOFT, PAIR, TOTALS, COLUMNS, available_strategies, load_strategy
+
+# Rank indexes follow Deck.values: '2'..'10', 'J', 'Q', 'K', 'A'
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+ACE = 12
+# Hard points per rank (ace counted as 1, promoted to 11 when it fits)
+HARD_POINTS = np.array([2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 1], dtype=np.int16)
+
+HIT, STAND, DOUBLE, SPLIT = 0, 1, 2, 3
+
+# Cards reserved per round; far more than even a four-way split consumes
+SLOT_SIZE = 48
+MAX_HANDS = 4  # matches Player.MAX_HANDS
+
+
+def legacy_strategy(value, soft, pair, ncards, dealer_up, rng):
+    # Mirrors the bot branch of Game.play
+    two = ncards == 2
+    action = np.full(value.shape, STAND, dtype=np.int8)
+    action[value <= 11] = HIT
+    mixed = (value >= 12) & (value <= 16)
+    action[mixed & (rng.random(value.shape) < 0.3)] = HIT
+    action[two & (value == 11)] = DOUBLE
+    action[two & pair] = SPLIT
+    return action
+
+
+def mimic_dealer_strategy(value, soft, pair, ncards, dealer_up, rng):
+    return np.where(value < 17, HIT, STAND).astype(np.int8)
+
+
+def table_strategy(table) -> Callable:
+    """Vectorize a strategy.StrategyTable into a batch strategy function."""
+    # No surrender under the house rules simulated here, so R plays as its fallback
+    codes = {'H': HIT, 'S': STAND, 'D': DOUBLE, 'X': DOUBLE, 'P': SPLIT, 'M': HIT, 'R': HIT}
+    cells = np.array([codes[c] if c else STAND for c in table.cells], dtype=np.int8)
+    # Cells where a failed double means stand rather than hit, and mixed cells
+    stand_fallback = np.array([c == 'X' for c in table.cells])
+    mixed = np.array([c == 'M' for c in table.cells])
+    has_pair_row = np.array([c is not None for c in table.cells])
+
+    def strategy(value, soft, pair, ncards, dealer_up, rng):
+        column = dealer_up - 2
+        index = (np.where(soft, SOFT, HARD) * TOTALS + value) * COLUMNS + column
+        # A pair of aces totals soft 12; every other pair is twice its points
+        pair_points = np.where(soft & (value == 12), 11, value // 2)
+        pair_index = (PAIR * TOTALS + pair_points) * COLUMNS + column
+        index = np.where(pair & has_pair_row[pair_index], pair_index, index)
+        action = cells[index]
+        action[(action == DOUBLE) & (ncards != 2) & stand_fallback[index]] = STAND
+        mix = mixed[index]
+        action[mix & (rng.random(value.shape) >= table.mix)] = STAND
+        return action
+
+    strategy.__name__ = table.name
+    return strategy
+
+
+STRATEGIES: Dict[str, Callable] = {
+    'legacy': legacy_strategy,
+    'mimic_dealer': mimic_dealer_strategy,
+}
+
+
+@dataclass
+class SimulationResult:
+    strategy: str
+    hands: int
+    ev: float
+    variance: float
+    std_error: float
+    ci_low: float
+    ci_high: float
+
+    def __repr__(self):
+        return (f'{self.strategy}: EV {self.ev:+.4f} ± {self.std_error:.4f} '
+                f'[{self.ci_low:+.4f}, {self.ci_high:+.4f}] over {self.hands} hands')
+
+
+def deal_slots(rng, num_hands: int, num_decks: int) -> np.ndarray:
+    # Shuffle whole shoes and cut each into fixed slots of SLOT_SIZE cards,
+    # so every row is a without-replacement draw from a real shoe
+    shoe = np.tile(np.arange(13, dtype=np.int8), 4 * num_decks)
+    per_shoe = len(shoe) // SLOT_SIZE
+    if per_shoe == 0:
+        raise ValueError(f'Shoe of {len(shoe)} cards is smaller than a slot of {SLOT_SIZE}')
+    num_shoes = -(-num_hands // per_shoe)
+    shoes = rng.permuted(np.broadcast_to(shoe, (num_shoes, len(shoe))), axis=1)
+    slots = shoes[:, :per_shoe * SLOT_SIZE].reshape(-1, SLOT_SIZE)
+    return slots[:num_hands]
+
+
+def _totals(hard, aces):
+    soft = (aces > 0) & (hard + 10 <= 21)
+    return np.where(soft, hard + 10, hard), soft
+
+
+def _dealer_values(cards, points, is_ace, ptr):
+    # Dealer draws from where the seat stopped, standing on all 17s
+    hard = points[:, 0] + points[:, 1]
+    aces = is_ace[:, 0].astype(np.int16) + is_ace[:, 1]
+    value, _ = _totals(hard, aces)
+    ptr = ptr.copy()
+    drawing = value < 17
+    while drawing.any():
+        idx = np.flatnonzero(drawing)
+        card = cards[idx, ptr[idx]]
+        hard[idx] += HARD_POINTS[card]
+        aces[idx] += card == ACE
+        ptr[idx] += 1
+        value, _ = _totals(hard, aces)
+        drawing = value < 17
+    return value
+
+
+def play_batch(cards: np.ndarray, strategy: Callable, rng) -> np.ndarray:
+    """Play one round per row of `cards` and return net results in units of the initial bet."""
+    n = cards.shape[0]
+    points = HARD_POINTS[cards]
+    is_ace = cards == ACE
+
+    # Game.play deals the dealer two cards first; the second one is face up
+    dealer_up = points[:, 1].copy()
+    dealer_up[is_ace[:, 1]] = 11
+    pair_cards = cards[:, 2] == cards[:, 3]
+    hard = points[:, 2] + points[:, 3]
+    aces = is_ace[:, 2].astype(np.int16) + is_ace[:, 3]
+    ncards = np.full(n, 2, dtype=np.int16)
+    bet = np.ones(n, dtype=np.int16)
+    ptr = np.full(n, 4, dtype=np.int16)
+    split = np.zeros(n, dtype=bool)
+
+    value, _ = _totals(hard, aces)
+    active = value < 21
+    while True:
+        idx = np.flatnonzero(active)
+        if idx.size == 0:
+            break
+        value, soft = _totals(hard[idx], aces[idx])
+        pair = (ncards[idx] == 2) & pair_cards[idx]
+        action = strategy(value, soft, pair, ncards[idx], dealer_up[idx], rng)
+        # Invalid splits and doubles fall back to a hit
+        action = np.where((action == SPLIT) & ~pair, HIT, action)
+        action = np.where((action == DOUBLE) & (ncards[idx] != 2), HIT, action)
+
+        active[idx[action == STAND]] = False
+
+        # Splits can only happen on the first decision; those rounds are
+        # finished by _play_splits
+        split_idx = idx[action == SPLIT]
+        split[split_idx] = True
+        active[split_idx] = False
+
+        draw = idx[(action == HIT) | (action == DOUBLE)]
+        card = cards[draw, ptr[draw]]
+        hard[draw] += HARD_POINTS[card]
+        aces[draw] += card == ACE
+        ncards[draw] += 1
+        ptr[draw] += 1
+
+        double = idx[action == DOUBLE]
+        bet[double] = 2
+        active[double] = False
+
+        value, _ = _totals(hard, aces)
+        active &= value < 21
+
+    player_value, _ = _totals(hard, aces)
+    blackjack = (player_value == 21) & (ncards == 2)
+    dealer_value = _dealer_values(cards, points, is_ace, ptr)
+
+    # Settlement order matches Game.play
+    net = np.zeros(n, dtype=np.float64)
+    player_bust = player_value > 21
+    natural = ~player_bust & blackjack
+    dealer_bust = ~player_bust & ~natural & (dealer_value > 21)
+    rest = ~player_bust & ~dealer_bust & ~natural
+    net[player_bust] = -bet[player_bust]
+    net[dealer_bust] = bet[dealer_bust]
+    net[natural] = 1.5 * bet[natural]
+    net[rest] = np.sign(player_value[rest] - dealer_value[rest]) * bet[rest]
+
+    if split.any():
+        net[split] = _play_splits(cards[split], strategy, rng)
+    return net
+
+
+def _play_splits(cards: np.ndarray, strategy: Callable, rng) -> np.ndarray:
+    # Rounds whose first decision was a split. Each row holds up to MAX_HANDS
+    # hands played in order with one card pointer per row, exactly like
+    # Player.split: the moved card's new hand is dealt first, then the kept
+    # hand, and the new hand is inserted right after the current one.
+    n = cards.shape[0]
+    points = HARD_POINTS[cards]
+    is_ace = cards == ACE
+    dealer_up = points[:, 1].copy()
+    dealer_up[is_ace[:, 1]] = 11
+
+    shape = (n, MAX_HANDS)
+    first = np.zeros(shape, dtype=np.int8)
+    second = np.zeros(shape, dtype=np.int8)
+    hard = np.zeros(shape, dtype=np.int16)
+    aces = np.zeros(shape, dtype=np.int16)
+    ncards = np.zeros(shape, dtype=np.int16)
+    bet = np.zeros(shape, dtype=np.int16)
+    first[:, 0] = cards[:, 2]
+    second[:, 0] = cards[:, 3]
+    hard[:, 0] = points[:, 2] + points[:, 3]
+    aces[:, 0] = is_ace[:, 2].astype(np.int16) + is_ace[:, 3]
+    ncards[:, 0] = 2
+    bet[:, 0] = 1
+    num_hands = np.ones(n, dtype=np.int16)
+    current = np.zeros(n, dtype=np.int16)
+    ptr = np.full(n, 4, dtype=np.int16)
+    forced = np.ones(n, dtype=bool)  # the split already chosen in play_batch
+
+    while True:
+        idx = np.flatnonzero(current < num_hands)
+        if idx.size == 0:
+            break
+        h = current[idx]
+        value, soft = _totals(hard[idx, h], aces[idx, h])
+        split_aces = (num_hands[idx] > 1) & (first[idx, h] == ACE)
+        done = (value >= 21) | split_aces
+        current[idx[done]] += 1
+        idx, h, value, soft = idx[~done], h[~done], value[~done], soft[~done]
+        if idx.size == 0:
+            continue
+
+        two = ncards[idx, h] == 2
+        pair = two & (first[idx, h] == second[idx, h]) & (num_hands[idx] < MAX_HANDS)
+        action = strategy(value, soft, pair, ncards[idx, h], dealer_up[idx], rng)
+        action = np.where(forced[idx], SPLIT, action)
+        forced[idx] = False
+        action = np.where((action == SPLIT) & ~pair, HIT, action)
+        action = np.where((action == DOUBLE) & ~two, HIT, action)
+
+        current[idx[action == STAND]] += 1
+
+        s = action == SPLIT
+        sidx, sh = idx[s], h[s]
+        if sidx.size:
+            # Shift later hands right to make room at sh + 1
+            for k in range(MAX_HANDS - 1, 0, -1):
+                move = k > sh + 1
+                src = sidx[move]
+                for arr in (first, second, hard, aces, ncards, bet):
+                    arr[src, k] = arr[src, k - 1]
+            moved = second[sidx, sh]
+            new_card = cards[sidx, ptr[sidx]]
+            kept_card = cards[sidx, ptr[sidx] + 1]
+            nh = sh + 1
+            first[sidx, nh] = moved
+            second[sidx, nh] = new_card
+            hard[sidx, nh] = HARD_POINTS[moved] + HARD_POINTS[new_card]
+            aces[sidx, nh] = (moved == ACE).astype(np.int16) + (new_card == ACE)
+            ncards[sidx, nh] = 2
+            bet[sidx, nh] = 1
+            kept = first[sidx, sh]
+            second[sidx, sh] = kept_card
+            hard[sidx, sh] = HARD_POINTS[kept] + HARD_POINTS[kept_card]
+            aces[sidx, sh] = (kept == ACE).astype(np.int16) + (kept_card == ACE)
+            ptr[sidx] += 2
+            num_hands[sidx] += 1
+
+        d = (action == HIT) | (action == DOUBLE)
+        didx, dh = idx[d], h[d]
+        card = cards[didx, ptr[didx]]
+        hard[didx, dh] += HARD_POINTS[card]
+        aces[didx, dh] += card == ACE
+        ncards[didx, dh] += 1
+        ptr[didx] += 1
+
+        dbl = action == DOUBLE
+        bet[idx[dbl], h[dbl]] = 2
+        current[idx[dbl]] += 1
+
+    dealer_value = _dealer_values(cards, points, is_ace, ptr)[:, None]
+    value, _ = _totals(hard, aces)
+    # Split hands never count as Blackjack; unused hand slots have bet 0
+    result = np.where(value > 21, -1, np.where(dealer_value > 21, 1, np.sign(value - dealer_value)))
+    return (result * bet).sum(axis=1).astype(np.float64)
+
+
+def evaluate(strategy='legacy', num_hands: int = 1_000_000, num_decks: int = 6,
+             seed: Optional[int] = None, batch_size: int = 200_000,
+             z: float = 1.96) -> SimulationResult:
+    if isinstance(strategy, str):
+        # Built-in functions first, then bundled strategy tables by name
+        name = strategy
+        strategy = STRATEGIES.get(name) or table_strategy(load_strategy(name))
+    else:
+        name = getattr(strategy, '__name__', repr(strategy))
+    rng = np.random.default_rng(seed)
+    total = 0.0
+    total_sq = 0.0
+    done = 0
+    while done < num_hands:
+        size = min(batch_size, num_hands - done)
+        net = play_batch(deal_slots(rng, size, num_decks), strategy, rng)
+        total += net.sum()
+        total_sq += np.dot(net, net)
+        done += size
+    ev = total / done
+    variance = total_sq / done - ev * ev
+    std_error = (variance / done) ** 0.5
+    return SimulationResult(name, done, ev, variance, std_error,
+                            ev - z * std_error, ev + z * std_error)
+
+
+def evaluate_all(num_hands: int = 1_000_000, num_decks: int = 6,
+                 seed: Optional[int] = None) -> Dict[str, SimulationResult]:
+    names = list(STRATEGIES) + [n for n in available_strategies() if n not in STRATEGIES]
+    return {name: evaluate(name, num_hands, num_decks, seed) for name in names}
+
+
+if __name__ == '__main__':
+    for result in evaluate_all(seed=1).values():
+        print(result)
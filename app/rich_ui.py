@@ -0,0 +1,208 @@
+# rich_ui.py
+"""Rich-based UI for enhanced terminal rendering.
+
+Imported only when the 'rich' UI backend is selected (see app.create_ui),
+so headless runs never load Rich.
+"""
+import threading
+import time
+
+from rich.columns import Columns
+from rich.cells import cell_len
+from rich.console import Console, Group
+from rich.control import Control
+from rich.live import Live
+from rich.panel import Panel
+from rich.rule import Rule
+from rich.segment import ControlType
+from rich.text import Text
+
+
+class RichGameUI:
+    # Renders through one Rich Live display instead of clearing the console.
+    # Updates mark the frame stale; it is rebuilt and redrawn at most
+    # refresh_per_second times (bursts coalesce into one frame) and never
+    # while nothing changed. Panels are cached per player and rebuilt only
+    # when that player's visible state changes.
+    def __init__(self, console=None, refresh_per_second: float = 20):
+        self.console = console or Console()
+        self.players = []
+        self.dealer_hand = None
+        self.hide_dealer = False
+        self.messages = []
+        self.active_player_index = 0
+        self.frames_rendered = 0
+        self._dirty = False
+        self._renderable = None
+        self._lock = threading.Lock()
+        self._panel_cache = {}  # player index -> (state key, Panel)
+        self._dealer_cache = (None, None)
+        self.refresh_interval = 1.0 / refresh_per_second
+        self._last_refresh = 0.0
+        self._stopping = threading.Event()
+        self._refresher = None
+        self._live = Live(console=self.console, auto_refresh=False, get_renderable=self._frame)
+
+    def initialize(self, players):
+        self.players = players
+        self._panel_cache.clear()
+
+    def _dealer_panel(self, total_width):
+        cards = []
+        value = "?"
+        if self.dealer_hand:
+            if self.hide_dealer and len(self.dealer_hand.cards) > 0:
+                cards = ["🂠"] + [str(c) for c in self.dealer_hand.cards[1:]]
+            else:
+                cards = [str(c) for c in self.dealer_hand.cards]
+                value = str(self.dealer_hand.get_value())
+        key = (tuple(cards), value, total_width)
+        if self._dealer_cache[0] != key:
+            dealer_body = "\n".join([
+                " ".join(cards),
+                f"Value: {value}"
+            ])
+            self._dealer_cache = (key, Panel(
+                Text(dealer_body, justify="center"),
+                title="[bold]Dealer[/bold]",
+                border_style="blue",
+                width=total_width
+            ))
+        return self._dealer_cache[1]
+
+    def _player_panel(self, idx, p, panel_w):
+        active = idx == self.active_player_index
+        hands = tuple(tuple(h.cards) for h in p.hands)
+        key = (p.name, hands, p.balance, active, panel_w)
+        cached = self._panel_cache.get(idx)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        card_str = " | ".join(" ".join(str(c) for c in h) for h in hands)
+        val_str  = " | ".join(str(h.get_value()) for h in p.hands)
+        body = "\n".join([f"Cards: {card_str}", f"Value: {val_str}"])
+        border = "green" if active else "magenta"
+        title  = f"> {p.name} <" if active else p.name
+        subtitle = f"Balance: ${p.balance}"
+        panel = Panel(
+            Text(body),
+            title=title,
+            subtitle=subtitle,
+            border_style=border,
+            width=panel_w
+        )
+        self._panel_cache[idx] = (key, panel)
+        return panel
+
+    def render(self):
+        total_width = self.console.size.width
+
+        # Fixed-width player panels
+        n = max(1, len(self.players))
+        gap = 1               # spaces between panels
+        min_w = 20            # never go below this
+        # carve the remaining width up evenly:
+        panel_w = max(min_w, (total_width - gap * (n - 1)) // n)
+        player_panels = [self._player_panel(idx, p, panel_w) for idx, p in enumerate(self.players)]
+
+        parts = [
+            Rule("[bold yellow]BLACKJACK[/bold yellow]"),
+            self._dealer_panel(total_width),
+            Text(),
+            Columns(player_panels, padding=(0, gap), expand=False),
+        ]
+        if self.messages:
+            parts.append(Text.from_markup("\n[bold]Messages:[/bold]"))
+            parts.extend(Text(f"- {msg}") for msg in self.messages)
+        return Group(*parts)
+
+    def _frame(self):
+        # Called by Live on every refresh; rebuilds only after an update
+        with self._lock:
+            if self._dirty:
+                self._dirty = False
+                self._renderable = self.render()
+                self.frames_rendered += 1
+            return self._renderable
+
+    def flush(self):
+        # Render any pending update now
+        with self._lock:
+            self._last_refresh = time.monotonic()
+        self._live.refresh()
+
+    def draw_frame(self):
+        # Marks the frame stale and redraws right away unless the last frame
+        # is younger than refresh_interval; then the refresh thread draws it
+        # at the end of the interval, so bursts coalesce into one frame
+        with self._lock:
+            self._dirty = True
+            due = time.monotonic() - self._last_refresh >= self.refresh_interval
+        if not self._live.is_started:
+            self._start()
+        elif due:
+            self.flush()
+
+    def _refresh_pending(self):
+        # Draws nothing while idle: only frames marked stale are refreshed
+        while not self._stopping.wait(self.refresh_interval):
+            if self._dirty:
+                self.flush()
+
+    def _start(self):
+        self._live.vertical_overflow = "ellipsis"  # stop() leaves it "visible"
+        with self._lock:
+            self._last_refresh = time.monotonic()
+        self._live.start(refresh=True)
+        self._stopping.clear()
+        self._refresher = threading.Thread(target=self._refresh_pending, daemon=True)
+        self._refresher.start()
+
+    def close(self):
+        self._stopping.set()
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
+        # Live draws the pending frame as it stops
+        self._live.stop()
+
+    def update_dealer_hand(self, hand, hide_first_card=False):
+        self.dealer_hand = hand
+        self.hide_dealer = hide_first_card
+        self.draw_frame()
+
+    def update_player_hand(self, player_index):
+        self.draw_frame()
+
+    def set_active_player(self, player_index):
+        self.active_player_index = player_index
+        self.draw_frame()
+
+    def show_message(self, message):
+        self.messages.append(message)
+        if len(self.messages) > 5:
+            self.messages.pop(0)
+        self.draw_frame()
+
+    def prompt_for_action(self, available_actions):
+        # Pause Live so input echoes normally, then redraw the table in place
+        shown = self._live.is_started
+        self.close()
+        if len(available_actions) == 1:
+            prompt = available_actions[0]
+        else:
+            prompt = f"Choose action ({'/'.join(available_actions)}): "
+        answer = ""
+        try:
+            answer = self.console.input(prompt)
+            return answer.lower()
+        finally:
+            if shown and self.console.is_terminal:
+                # Erase the prompt lines and step back onto the frame's last
+                # line; Live's first refresh moves up over the rest of it
+                lines = 1 + cell_len(prompt + answer) // max(self.console.size.width, 1)
+                self.console.control(Control(
+                    ControlType.CARRIAGE_RETURN,
+                    *((ControlType.CURSOR_UP, 1), (ControlType.ERASE_IN_LINE, 2)) * lines,
+                    (ControlType.CURSOR_UP, 1),
+                ))
+            self._start()
@@ -0,0 +1,100 @@
+# rules.py
+"""Table rule variants and their compiled lookup form.
+
+A Rules value describes a venue; compile_rules turns it into CompiledRules,
+whose flat tables Game reads in the hot loop:
+
+    dealer_hits[value + SOFT * is_soft]   -> dealer draws another card
+    can_double[value + SOFT * is_soft]    -> doubling allowed on this total
+
+The 'house' rules reproduce the original game exactly: the dealer stands
+on all 17s, blackjack pays 3:2, doubling on any two cards (after splits
+too), re-splitting to four hands except aces, no surrender, no insurance
+and no peek, with a dealer natural counted as an ordinary 21.
+
+    Game(6, 3, rules='vegas_h17')
+    Game(6, 3, rules=Rules('my_club', hit_soft_17=True, blackjack_pays=1.2))
+
+analysis.py takes a CompiledRules; montecarlo.py still models the house rules only.
+"""
+from typing import Dict, NamedTuple, Optional, Tuple, Union
+
+SOFT = 32  # offset of the soft half of the lookup tables
+
+
+class Rules(NamedTuple):
+    name: str = 'house'
+    hit_soft_17: bool = False
+    blackjack_pays: float = 1.5         # 1.2 for 6:5 tables
+    double_totals: Optional[Tuple[int, ...]] = None  # hard totals doubling is allowed on; None = any
+    double_after_split: bool = True
+    max_hands: int = 4
+    resplit_aces: bool = False
+    hit_split_aces: bool = False
+    surrender: bool = False             # late surrender: first two cards, before splitting
+    insurance: bool = False             # offered against an ace, pays 2:1
+    dealer_peek: bool = False           # dealer checks for blackjack under an ace or ten
+    # Dealer naturals beat every non-natural hand (naturals push). Defaults to
+    # dealer_peek; set it without peeking for European no-hole-card tables.
+    dealer_blackjack_wins: Optional[bool] = None
+
+
+class CompiledRules(NamedTuple):
+    rules: Rules
+    dealer_hits: Tuple[bool, ...]
+    can_double: Tuple[bool, ...]
+    blackjack_return: float  # multiple of the bet paid back on a natural
+    double_after_split: bool
+    max_hands: int
+    resplit_aces: bool
+    hit_split_aces: bool
+    surrender: bool
+    insurance: bool
+    dealer_peek: bool
+    dealer_blackjack_wins: bool
+
+
+def compile_rules(rules: Union[str, Rules, CompiledRules, None] = None) -> CompiledRules:
+    if isinstance(rules, CompiledRules):
+        return rules
+    if rules is None:
+        rules = RULESETS['house']
+    elif isinstance(rules, str):
+        if rules not in RULESETS:
+            raise ValueError(f'Unknown rule set {rules!r}; expected one of {", ".join(RULESETS)}')
+        rules = RULESETS[rules]
+    dealer_hits = [value < 17 for value in range(SOFT)]
+    dealer_hits += [value < 17 or (value == 17 and rules.hit_soft_17) for value in range(SOFT)]
+    if rules.double_totals is None:
+        can_double = [value < 21 for value in range(SOFT)] * 2
+    else:
+        allowed = set(rules.double_totals)
+        can_double = [value in allowed for value in range(SOFT)] + [False] * SOFT
+    wins = rules.dealer_blackjack_wins
+    return CompiledRules(
+        rules=rules,
+        dealer_hits=tuple(dealer_hits),
+        can_double=tuple(can_double),
+        blackjack_return=1 + rules.blackjack_pays,
+        double_after_split=rules.double_after_split,
+        max_hands=rules.max_hands,
+        resplit_aces=rules.resplit_aces,
+        hit_split_aces=rules.hit_split_aces,
+        surrender=rules.surrender,
+        insurance=rules.insurance,
+        dealer_peek=rules.dealer_peek,
+        dealer_blackjack_wins=rules.dealer_peek if wins is None else wins,
+    )
+
+
+RULESETS: Dict[str, Rules] = {rules.name: rules for rules in (
+    Rules('house'),
+    Rules('vegas_s17', surrender=True, insurance=True, dealer_peek=True),
+    Rules('vegas_h17', hit_soft_17=True, surrender=True, insurance=True, dealer_peek=True),
+    Rules('atlantic_city', surrender=True, insurance=True, dealer_peek=True),
+    Rules('downtown_6to5', hit_soft_17=True, blackjack_pays=1.2, insurance=True, dealer_peek=True),
+    Rules('european', double_totals=(9, 10, 11), double_after_split=False, max_hands=2,
+          insurance=True, dealer_blackjack_wins=True),
+)}
+
+HOUSE = compile_rules()
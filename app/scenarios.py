@@ -0,0 +1,221 @@
+# scenarios.py
+"""Batch scenario runner: sweep a config matrix across cores, with a cache.
+
+A config file (TOML, or YAML when PyYAML is installed) holds run settings
+and a [matrix] of Game parameters; every combination of the matrix values
+is one scenario:
+
+    seed = 1
+    rounds = 10000          # per table
+    tables = 4
+    starting_balance = 1000
+
+    [matrix]
+    num_decks = [1, 2, 6, 8]
+    num_bots = [1, 2, 3, 4, 5, 6, 7]
+    strategy = ["basic", "legacy"]
+    rules = ["house", "vegas_h17"]
+
+    python scenarios.py sweeps/default.toml --workers 8
+
+Any setting can sit in the matrix (or the top level) except seed. Scenarios
+run one per task on a process pool; each table inside a scenario uses
+parallel.table_rng(seed, table), so results don't depend on the worker
+count. Every result is stored under a content-addressed key, the SHA-256
+of the scenario, its seed and code_version() (a digest of the engine's
+source files and bundled strategies); a rerun only computes the cells
+whose key isn't in the cache yet. Results are written as each scenario
+finishes, so an interrupted sweep keeps its progress.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app import Game
+from bankroll import BankrollAnalyzer
+from parallel import table_rng
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = '.scenario_cache'
+
+
+class Scenario(NamedTuple):
+    num_decks: int = 6
+    num_bots: int = 3
+    strategy: str = 'legacy'
+    rules: str = 'house'
+    betting: str = 'flat'
+    counting: str = 'hilo'
+    rounds: int = 1000
+    tables: int = 1
+    starting_balance: int = 1000
+    penetration: float = 0.75
+    continuous: bool = False
+    seed: int = 0
+
+    @property
+    def label(self) -> str:
+        return (f'{self.num_decks}d {self.num_bots}b {self.strategy}/{self.rules}'
+                f'/{self.betting}/{self.counting}')
+
+
+def load_config(path: str) -> Dict:
+    if path.endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise RuntimeError(f'{path}: YAML configs need PyYAML (pip install pyyaml)') from None
+        with open(path, encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+    import tomllib
+    with open(path, 'rb') as f:
+        return tomllib.load(f)
+
+
+def expand(config: Dict) -> List[Scenario]:
+    # Cartesian product of the matrix, first key varying slowest
+    settings = {key: value for key, value in config.items() if key != 'matrix'}
+    matrix = config.get('matrix', {})
+    unknown = (set(settings) | set(matrix)) - set(Scenario._fields)
+    if unknown:
+        raise ValueError(f'Unknown scenario settings: {", ".join(sorted(unknown))}')
+    if 'seed' in matrix:
+        raise ValueError('seed is per sweep; put it at the top level')
+    axes = [[(key, value) for value in (values if isinstance(values, list) else [values])]
+            for key, values in matrix.items()]
+    return [Scenario(**{**settings, **dict(cell)}) for cell in itertools.product(*axes)]
+
+
+_version: Optional[str] = None
+
+
+def code_version() -> str:
+    # Digest of everything a scenario's result depends on; tests and
+    # benchmarks are left out so editing them keeps the cache
+    global _version
+    if _version is None:
+        digest = hashlib.sha256()
+        files = [name for name in os.listdir(HERE)
+                 if name.endswith('.py') and not name.startswith(('test_', 'bench_'))]
+        strategies = os.path.join(HERE, 'strategies')
+        files += [os.path.join('strategies', name) for name in os.listdir(strategies)]
+        for name in sorted(files):
+            with open(os.path.join(HERE, name), 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read() + b'\0')
+        _version = digest.hexdigest()
+    return _version
+
+
+def cache_key(scenario: Scenario, version: Optional[str] = None) -> str:
+    payload = json.dumps({'scenario': scenario._asdict(), 'code': version or code_version()}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    # One JSON file per key, fanned out over 256 directories
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f'{key}.json')
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, result: Dict):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a crash never leaves a half-written entry
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        os.replace(tmp, path)
+
+
+def run_scenario(scenario: Scenario) -> Dict:
+    analyzer = BankrollAnalyzer()
+    outcomes: Counter = Counter()
+    rounds = 0
+    for table in range(scenario.tables):
+        game = Game(scenario.num_decks, scenario.num_bots, interactive=False,
+                    rng=table_rng(scenario.seed, table), starting_balance=scenario.starting_balance,
+                    strategy=scenario.strategy, rules=scenario.rules,
+                    betting=scenario.betting, counting=scenario.counting,
+                    penetration=scenario.penetration, continuous=scenario.continuous)
+        analyzer.consume(game.results(max_rounds=scenario.rounds), table)
+        rounds += game.rounds_played
+        for player in game.players:
+            outcomes.update(player.outcomes)
+    result = analyzer.summary()
+    result['seat_rounds'] = result['rounds']
+    result['rounds'] = rounds
+    result['outcomes'] = dict(outcomes)
+    return result
+
+
+def run_sweep(scenarios: List[Scenario], workers: Optional[int] = None,
+              cache: Optional[ResultCache] = None) -> List[Tuple[Scenario, Dict, bool]]:
+    """Return (scenario, result, from_cache) for every scenario, in order."""
+    keys = [cache_key(scenario) for scenario in scenarios]
+    results: Dict[int, Dict] = {}
+    cached = set()
+    if cache is not None:
+        for index, key in enumerate(keys):
+            hit = cache.get(key)
+            if hit is not None:
+                results[index] = hit
+                cached.add(index)
+    pending = [index for index in range(len(scenarios)) if index not in results]
+
+    def finished(index, result):
+        results[index] = result
+        if cache is not None:
+            cache.put(keys[index], result)
+
+    workers = min(workers or os.cpu_count() or 1, max(len(pending), 1))
+    if workers == 1:
+        for index in pending:
+            finished(index, run_scenario(scenarios[index]))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(run_scenario, scenarios[index]): index for index in pending}
+            for future in as_completed(futures):
+                finished(futures[future], future.result())
+    return [(scenario, results[index], index in cached) for index, scenario in enumerate(scenarios)]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('config', help='TOML or YAML scenario matrix')
+    parser.add_argument('--workers', type=int, help='processes (default: one per core)')
+    parser.add_argument('--cache', default=CACHE_DIR, help='result cache directory')
+    parser.add_argument('--no-cache', action='store_true', help='recompute everything, store nothing')
+    parser.add_argument('--json', metavar='PATH', help='also write all results to this file')
+    args = parser.parse_args(argv)
+
+    scenarios = expand(load_config(args.config))
+    cache = None if args.no_cache else ResultCache(args.cache)
+    rows = run_sweep(scenarios, args.workers, cache)
+    for scenario, result, hit in rows:
+        print(f"{scenario.label:<40}{result['rounds']:>9} rounds  EV {result['ev_per_wager'] * 100:+6.2f}%"
+              f"  RoR {result['risk_of_ruin'] * 100:5.1f}%{'  (cached)' if hit else ''}")
+    hits = sum(hit for _, _, hit in rows)
+    print(f'{len(rows)} scenarios, {hits} from cache, {len(rows) - hits} computed')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([{'scenario': s._asdict(), 'result': r} for s, r, _ in rows], f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+# server.py
+"""Asyncio table server: many Game sessions in one process.
+
+Every TCP connection gets its own table with one remote human seat and
+the server's bots. The protocol is JSON lines. The client opens with
+{"name": "..."}; the server then sends
+
+    {"type": "message", "text": "..."}
+    {"type": "prompt", "kind": "action", "actions": [...], "balance": 90, "hands": [["10♠️", "7♦️"]], "dealer": ["🂠", "9♣️"]}
+    {"type": "end", "balance": 120, "rounds": 5}
+
+and every prompt is answered with {"action": "..."}. A line that isn't a
+JSON object, or is longer than the stream limit, gets
+{"type": "error", "text": "..."} back and closes the table. kind is 'bet',
+'insurance', 'action' or 'continue' (agents.py). A prompt with a single
+action is a free-form question (the bet, insurance, or "press Enter") and
+the answer is the text itself.
+
+Tables are driven through Game.steps: prompts await the client's next
+line and pauses become asyncio.sleep for the delay a clock.Clock gives
+them (`pace` is a speed preset or scale factor; 0 disables them), so a
+table waiting on its player is only a suspended coroutine.
+
+    python server.py serve 8765             # localhost only
+    python server.py serve 8765 0.0.0.0     # every interface
+    python server.py load 200 20 2000   # active tables, rounds, idle tables
+"""
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional, Union
+
+from agents import dealer_cards, decode_message, encode_message, prompt_message
+from app import Game, NullGameUI, Pause, Prompt
+from clock import Clock
+
+
+class SessionUI(NullGameUI):
+    # Collects the table's messages between prompts so they go out as one write
+    def __init__(self):
+        super().__init__()
+        self.pending: List[str] = []
+        self.hide_dealer = True
+
+    def update_dealer_hand(self, hand, hide_first_card=False):
+        self.dealer_hand = hand
+        self.hide_dealer = hide_first_card
+
+    def show_message(self, message):
+        self.pending.append(message)
+
+    def dealer_cards(self) -> List[str]:
+        return dealer_cards(self.dealer_hand, self.hide_dealer)
+
+    def drain(self) -> bytes:
+        lines = [encode_message({'type': 'message', 'text': text}) for text in self.pending]
+        self.pending.clear()
+        return b''.join(lines)
+
+
+async def _read_message(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[Dict]:
+    # The client's next message, or None once it left or broke the protocol;
+    # a broken line gets an error line back before the table closes
+    try:
+        line = await reader.readline()
+    except ValueError:  # longer than the reader's limit
+        writer.write(encode_message({'type': 'error', 'text': 'line too long'}))
+        return None
+    if not line:
+        return None
+    message = decode_message(line)
+    if message is None:
+        writer.write(encode_message({'type': 'error', 'text': 'expected a JSON object'}))
+    return message
+
+
+class TableServer:
+    def __init__(self, num_bots: int = 3, num_decks: int = 6, pace: Union[str, float] = 'realistic',
+                 max_rounds: Optional[int] = None, strategy=None):
+        self.num_bots = num_bots
+        self.num_decks = num_decks
+        self.clock = Clock(pace)
+        self.max_rounds = max_rounds
+        self.strategy = strategy
+        self.open_tables = 0
+        self.tables_served = 0
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port, backlog=4096)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.open_tables += 1
+        self.tables_served += 1
+        steps = None
+        try:
+            hello = await _read_message(reader, writer)
+            if hello is None:
+                return
+            ui = SessionUI()
+            game = Game(self.num_decks, self.num_bots, interactive=True,
+                        human_actions=[str(hello.get('name', 'Player'))],
+                        ui=ui, strategy=self.strategy)
+            human = game.players[0]
+            steps = game.steps(self.max_rounds)
+            answer = None
+            while True:
+                try:
+                    request = steps.send(answer)
+                except StopIteration:
+                    break
+                answer = None
+                if isinstance(request, Prompt):
+                    writer.write(ui.drain() + encode_message(prompt_message(request, human, ui.dealer_cards())))
+                    await writer.drain()
+                    message = await _read_message(reader, writer)
+                    if message is None:
+                        return  # player left the table or broke the protocol
+                    answer = str(message.get('action', ''))
+                elif isinstance(request, Pause):
+                    delay = self.clock.delay(request)
+                    if delay > 0:
+                        if ui.pending:
+                            writer.write(ui.drain())
+                        await asyncio.sleep(delay)
+            writer.write(ui.drain() + encode_message({'type': 'end', 'balance': human.balance,
+                                                      'rounds': game.rounds_played}))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if steps is not None:
+                steps.close()
+            self.open_tables -= 1
+            writer.close()
+
+
+async def _player(host: str, port: int, rounds: int, latencies: List[float], bet: int = 10):
+    # Bets `bet`, always stands, and leaves after `rounds` rounds. Latency is
+    # the time from sending an answer to the first reply line.
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode_message({'name': 'Load'}))
+    finished = 0
+    sent = None
+    try:
+        while True:
+            line = await reader.readline()
+            if sent is not None:
+                latencies.append(time.perf_counter() - sent)
+                sent = None
+            if not line:
+                return
+            message = json.loads(line)
+            if message['type'] == 'end':
+                return
+            if message['type'] != 'prompt':
+                continue
+            actions = message['actions']
+            if actions == ['']:
+                finished += 1
+                if finished >= rounds:
+                    return
+                answer = ''
+            elif len(actions) == 1:
+                answer = str(bet)
+            else:
+                answer = 'stand'
+            writer.write(encode_message({'action': answer}))
+            sent = time.perf_counter()
+    finally:
+        writer.close()
+
+
+async def _idle(host: str, port: int, opened: asyncio.Event, release: asyncio.Event):
+    # Sits at the first bet prompt until released
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode_message({'name': 'Idle'}))
+    await reader.readline()
+    opened.set()
+    await release.wait()
+    writer.close()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def load_test(host: str, port: int, tables: int = 100, rounds: int = 10,
+                    idle_tables: int = 0) -> Dict[str, float]:
+    """Run `tables` scripted players against a server, optionally with idle tables open.
+
+    Returns action latency percentiles in milliseconds and the action rate.
+    """
+    release = asyncio.Event()
+    idle = []
+    for _ in range(idle_tables):
+        opened = asyncio.Event()
+        idle.append(asyncio.create_task(_idle(host, port, opened, release)))
+        await opened.wait()
+    latencies: List[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_player(host, port, rounds, latencies) for _ in range(tables)))
+    elapsed = time.perf_counter() - start
+    release.set()
+    await asyncio.gather(*idle)
+    return {
+        'actions': len(latencies),
+        'actions_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': _percentile(latencies, 0.50) * 1000,
+        'p99_ms': _percentile(latencies, 0.99) * 1000,
+        'max_ms': max(latencies, default=0.0) * 1000,
+    }
+
+
+async def _serve(port: int, host: str = '127.0.0.1'):
+    server = await TableServer().start(host, port)
+    async with server:
+        await server.serve_forever()
+
+
+async def _load(tables: int, rounds: int, idle_tables: int):
+    table_server = TableServer(pace=0)
+    server = await table_server.start()
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        result = await load_test('127.0.0.1', port, tables, rounds, idle_tables)
+    print(f"{tables} tables x {rounds} rounds with {idle_tables} idle tables open")
+    for name, value in result.items():
+        print(f"{name}: {value:,.2f}")
+
+
+if __name__ == '__main__':
+    import sys
+    command = sys.argv[1] if len(sys.argv) > 1 else 'load'
+    if command == 'serve':
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+        asyncio.run(_serve(port, *sys.argv[3:4]))
+    else:
+        args = [int(arg) for arg in sys.argv[2:]]
+        asyncio.run(_load(*(args + [100, 10, 0][len(args):])))
@@ -0,0 +1,235 @@
+# shuffle.py
+"""Shuffle engine with pluggable generators and verifiable per-shoe seeds.
+
+A ShuffleEngine gives every shoe its own seed, HMAC-SHA256(master seed,
+shoe number), and permutes the shoe in place from the canonical card order
+(CARDS * num_decks) with a generator seeded from it:
+
+    pcg    NumPy's PCG64 shuffling a preallocated index array: fast, for simulation
+    drbg   NIST SP 800-90A HMAC_DRBG over SHA-256 feeding a Fisher-Yates
+           pass: a CSPRNG, for real-money play
+    mt     random.Random (Mersenne Twister), what Deck uses without an engine
+
+The ShoeRecord it returns carries a commitment, SHA-256 over the generator
+name, deck count, seed and (for a partial shoe) its cards, that can be
+published before the first card is dealt; revealing the seed afterwards lets anyone regenerate the shoe and
+check it against the cards dealt. Revealing one shoe's seed says nothing
+about the master seed or the other shoes. Without a master seed the engine
+draws a secret random one.
+
+    engine = ShuffleEngine('drbg')
+    game = Game(6, 3, shuffler=engine)
+    ...
+    record = game.deck.shoe_record       # publish record.commitment
+    verify(record, cards_dealt_from_it)  # after revealing record.seed
+
+'drbg' and 'mt' shoes regenerate on any Python; NumPy doesn't promise the
+same PCG64 shuffle across releases, so verify 'pcg' shoes with the NumPy
+version that dealt them.
+"""
+import hashlib
+import hmac
+import random
+import secrets
+import struct
+from itertools import chain
+from operator import attrgetter
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from app import CARDS, Card
+
+SeedLike = Union[int, str, bytes, None]
+
+
+def _seed_bytes(seed: SeedLike) -> bytes:
+    if seed is None:
+        return secrets.token_bytes(32)
+    if isinstance(seed, int):
+        return seed.to_bytes((max(seed.bit_length(), 1) + 7) // 8, 'big')
+    if isinstance(seed, str):
+        return seed.encode()
+    return bytes(seed)
+
+
+def _fisher_yates(items: list, words: Iterator[int]):
+    # In-place Fisher-Yates from uniform 32-bit words; rejection sampling
+    # keeps every index exactly uniform
+    for i in range(len(items) - 1, 0, -1):
+        bound = i + 1
+        limit = 4294967296 - 4294967296 % bound
+        word = next(words)
+        while word >= limit:
+            word = next(words)
+        j = word % bound
+        items[i], items[j] = items[j], items[i]
+
+
+class HmacDRBG(random.Random):
+    # HMAC_DRBG (SP 800-90A, SHA-256, no prediction resistance). As a
+    # random.Random subclass it also fits anywhere the game takes an rng.
+    # Output is generated in blocks and handed out in order, the same byte
+    # stream a caller requesting it piecemeal would see. Reseeding is left
+    # to the caller: ShuffleEngine instantiates one per shoe, far below the
+    # 2^48 request limit.
+    BLOCK = 1024
+
+    def seed(self, a: SeedLike = None, version: int = 2):
+        self._key = b'\x00' * 32
+        self._value = b'\x01' * 32
+        self._update(_seed_bytes(a))
+        self._buffer = b''
+        self._offset = 0
+        self.gauss_next = None
+
+    def _hmac(self, data: bytes) -> bytes:
+        return hmac.digest(self._key, data, 'sha256')
+
+    def _update(self, data: bytes = b''):
+        self._key = self._hmac(self._value + b'\x00' + data)
+        self._value = self._hmac(self._value)
+        if data:
+            self._key = self._hmac(self._value + b'\x01' + data)
+            self._value = self._hmac(self._value)
+
+    def generate(self, n: int) -> bytes:
+        out = bytearray()
+        while len(out) < n:
+            self._value = self._hmac(self._value)
+            out += self._value
+        self._update()
+        return bytes(out[:n])
+
+    def _take(self, n: int) -> bytes:
+        if self._offset + n > len(self._buffer):
+            self._buffer = self._buffer[self._offset:] + self.generate(max(self.BLOCK, n))
+            self._offset = 0
+        start = self._offset
+        self._offset += n
+        return self._buffer[start:self._offset]
+
+    def words(self) -> Iterator[int]:
+        # Uniform 32-bit words, big-endian, continuing the byte stream
+        words = struct.Struct(f'>{self.BLOCK // 4}I')
+        while True:
+            yield from words.unpack(self._take(self.BLOCK))
+
+    def getrandbits(self, k: int) -> int:
+        return int.from_bytes(self._take((k + 7) // 8), 'big') >> (-k % 8)
+
+    def random(self) -> float:
+        return (int.from_bytes(self._take(7), 'big') >> 3) / 9007199254740992
+
+    def getstate(self):
+        return self._key, self._value, self._buffer, self._offset, self.gauss_next
+
+    def setstate(self, state):
+        self._key, self._value, self._buffer, self._offset, self.gauss_next = state
+
+
+# Preallocated (identity, work) index arrays per shoe size
+_indexes: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _pcg_permute(shoe: List[Card], seed: bytes):
+    size = len(shoe)
+    if size not in _indexes:
+        _indexes[size] = (np.arange(size), np.empty(size, dtype=np.intp))
+    identity, index = _indexes[size]
+    index[:] = identity
+    np.random.Generator(np.random.PCG64(int.from_bytes(seed, 'big'))).shuffle(index)
+    canonical = shoe[:]
+    shoe[:] = map(canonical.__getitem__, index.tolist())
+
+
+def _drbg_permute(shoe: List[Card], seed: bytes):
+    # One generate call covers the pass; rejections continue the stream
+    drbg = HmacDRBG(seed)
+    count = len(shoe)
+    _fisher_yates(shoe, chain(struct.unpack(f'>{count}I', drbg.generate(4 * count)), drbg.words()))
+
+
+def _mt_permute(shoe: List[Card], seed: bytes):
+    random.Random(seed).shuffle(shoe)
+
+
+# name -> permute(shoe in canonical order, seed), in place
+GENERATORS: Dict[str, Callable[[List[Card], bytes], None]] = {
+    'pcg': _pcg_permute,
+    'drbg': _drbg_permute,
+    'mt': _mt_permute,
+}
+
+
+class ShoeRecord(NamedTuple):
+    number: int
+    generator: str
+    num_decks: int
+    seed: str        # hex; keep private until the shoe is finished
+    commitment: str  # hex SHA-256, safe to publish up front
+    # Card codes of a partial shoe (a discard tray reshuffled mid-round) in
+    # its canonical, sorted order; None for a full shoe
+    cards: Optional[Tuple[int, ...]] = None
+
+
+def commitment(generator: str, num_decks: int, seed: bytes, cards: Optional[Tuple[int, ...]] = None) -> str:
+    digest = hashlib.sha256(f'{generator}:{num_decks}:'.encode() + seed)
+    if cards is not None:
+        digest.update(b':' + bytes(cards))
+    return digest.hexdigest()
+
+
+class ShuffleEngine:
+    def __init__(self, generator: str = 'pcg', seed: SeedLike = None):
+        if generator not in GENERATORS:
+            raise ValueError(f'Unknown generator {generator!r}; expected one of {", ".join(GENERATORS)}')
+        self.generator = generator
+        # Without a seed the master key is secret and random, as real play needs
+        self._master = _seed_bytes(seed)
+        self.shoes = 0
+
+    def shoe_seed(self, number: int) -> bytes:
+        return hmac.new(self._master, b'shoe:%d' % number, hashlib.sha256).digest()
+
+    def shuffle(self, shoe: List[Card], num_decks: int) -> ShoeRecord:
+        # shoe must be in canonical order
+        number = self.shoes
+        self.shoes += 1
+        seed = self.shoe_seed(number)
+        GENERATORS[self.generator](shoe, seed)
+        return ShoeRecord(number, self.generator, num_decks, seed.hex(), commitment(self.generator, num_decks, seed))
+
+    def shuffle_partial(self, cards: List[Card], num_decks: int) -> ShoeRecord:
+        # Sorts cards into canonical order, then shuffles them as the next
+        # shoe; the record carries the cards so the shoe can be regenerated
+        cards.sort(key=attrgetter('code'))
+        codes = tuple(card.code for card in cards)
+        number = self.shoes
+        self.shoes += 1
+        seed = self.shoe_seed(number)
+        GENERATORS[self.generator](cards, seed)
+        return ShoeRecord(number, self.generator, num_decks, seed.hex(),
+                          commitment(self.generator, num_decks, seed, codes), codes)
+
+
+def regenerate(record: ShoeRecord) -> List[Card]:
+    if record.cards is None:
+        shoe = CARDS * record.num_decks
+    else:
+        shoe = [CARDS[code] for code in record.cards]
+    GENERATORS[record.generator](shoe, bytes.fromhex(record.seed))
+    return shoe
+
+
+def verify(record: ShoeRecord, dealt: Optional[List[Card]] = None) -> bool:
+    """Check the revealed seed against the commitment and, if given, that
+    dealt is how the shoe regenerated from it starts."""
+    seed = bytes.fromhex(record.seed)
+    if not hmac.compare_digest(commitment(record.generator, record.num_decks, seed, record.cards),
+                               record.commitment):
+        return False
+    if dealt is None:
+        return True
+    dealt = list(dealt)
+    return regenerate(record)[:len(dealt)] == dealt
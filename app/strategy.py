@@ -0,0 +1,146 @@
+# strategy.py
+"""Table-driven bot strategies.
+
+A strategy table maps (player total, soft flag, pair, dealer up-card) to an
+action letter. Tables are written in a compact text format, one row per
+total with one letter per dealer up-card (2 3 4 5 6 7 8 9 T A):
+
+    mix 0.3            # hit probability for M cells (optional)
+    [hard]
+    12-16: SSSSSHHHHH
+    [soft]
+    18:    SXXXXSSHHH
+    [pair]
+    A:     PPPPPPPPPP
+
+Letters: H hit, S stand, D double (else hit), X double (else stand),
+P split, R surrender (else hit), M hit with probability `mix` (else
+stand). Pair rows are keyed
+by card points (2-9, T, A); pairs without a row fall back to the hard or
+soft row. Tables compile to a flat list, so every lookup is O(1).
+"""
+import os
+from typing import Dict, List, Optional
+
+STRATEGY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'strategies')
+
+HARD, SOFT, PAIR = 0, 1, 2
+SECTIONS = {'hard': HARD, 'soft': SOFT, 'pair': PAIR}
+ACTIONS = 'HSDXPMR'
+# Dealer up-card points 2..11 map to columns 0..9
+COLUMNS = 10
+TOTALS = 22
+
+ACTION_NAMES = {'H': 'hit', 'S': 'stand', 'D': 'double down', 'P': 'split', 'R': 'surrender'}
+
+
+def _index(kind: int, total: int, up: int) -> int:
+    return (kind * TOTALS + total) * COLUMNS + up - 2
+
+
+def _points(label: str) -> int:
+    if label == 'A':
+        return 11
+    if label == 'T':
+        return 10
+    return int(label)
+
+
+class StrategyTable:
+    def __init__(self, name: str, mix: float = 0.3):
+        self.name = name
+        self.mix = mix
+        self.cells: List[Optional[str]] = [None] * (3 * TOTALS * COLUMNS)
+
+    def set_row(self, kind: int, total: int, letters: str):
+        if len(letters) != COLUMNS:
+            raise ValueError(f'{self.name}: row {total} needs {COLUMNS} actions, got {letters!r}')
+        for up, letter in enumerate(letters, start=2):
+            if letter not in ACTIONS:
+                raise ValueError(f'{self.name}: unknown action {letter!r}')
+            self.cells[_index(kind, total, up)] = letter
+
+    def lookup(self, total: int, soft: bool, pair: Optional[int], up: int) -> str:
+        # pair is the pair's card points, or None when the hand is not a splittable pair
+        if pair is not None:
+            letter = self.cells[_index(PAIR, pair, up)]
+            if letter is not None:
+                return letter
+        letter = self.cells[_index(SOFT if soft else HARD, total, up)]
+        return letter if letter is not None else 'S'
+
+    def decide(self, hand, dealer_card, can_double: bool, can_split: bool, rng, unseen=None,
+               can_surrender: bool = False, rules=None) -> str:
+        # unseen (a callable returning unseen card counts) and rules (the
+        # table's CompiledRules) are only used by composition-dependent
+        # strategies such as analysis.OptimalStrategy
+        cards = hand.cards
+        pair = None
+        if can_split:
+            pair = 11 if cards[0].is_ace else cards[0].points
+        up = 11 if dealer_card.is_ace else dealer_card.points
+        letter = self.lookup(hand.get_value(), hand.is_soft, pair, up)
+        if letter == 'M':
+            return rng.choices(['hit', 'stand'], [self.mix, 1 - self.mix], k=1)[0]
+        if letter == 'D':
+            return 'double down' if can_double else 'hit'
+        if letter == 'X':
+            return 'double down' if can_double else 'stand'
+        if letter == 'P' and not can_split:
+            return 'hit'
+        if letter == 'R' and not can_surrender:
+            return 'hit'
+        return ACTION_NAMES[letter]
+
+    def __repr__(self):
+        return f'StrategyTable({self.name!r})'
+
+
+def parse_strategy(text: str, name: str = 'strategy') -> StrategyTable:
+    table = StrategyTable(name)
+    kind = None
+    for lineno, raw in enumerate(text.splitlines(), start=1):
+        line = raw.split('#', 1)[0].strip()
+        if not line:
+            continue
+        if line.startswith('['):
+            section = line.strip('[]').strip()
+            if section not in SECTIONS:
+                raise ValueError(f'{name}:{lineno}: unknown section {section!r}')
+            kind = SECTIONS[section]
+        elif line.startswith('mix'):
+            table.mix = float(line.split()[1])
+        else:
+            if kind is None:
+                raise ValueError(f'{name}:{lineno}: row outside of a section')
+            label, _, letters = line.partition(':')
+            low, _, high = label.strip().partition('-')
+            first = _points(low)
+            last = _points(high) if high else first
+            for total in range(first, last + 1):
+                table.set_row(kind, total, letters.strip())
+    return table
+
+
+_loaded: Dict[str, StrategyTable] = {}
+
+
+def load_strategy(name_or_path: str) -> StrategyTable:
+    # Bundled tables are addressed by name ('basic', 'legacy'); anything
+    # else is treated as a file path. Loaded tables are cached. 'optimal'
+    # is the exact-EV bot from analysis.py rather than a table.
+    if name_or_path == 'optimal':
+        from analysis import OptimalStrategy
+        return OptimalStrategy()
+    if name_or_path not in _loaded:
+        path = name_or_path
+        if not os.path.exists(path):
+            path = os.path.join(STRATEGY_DIR, f'{name_or_path}.txt')
+        with open(path, encoding='utf-8') as f:
+            name = os.path.splitext(os.path.basename(path))[0]
+            _loaded[name_or_path] = parse_strategy(f.read(), name)
+    return _loaded[name_or_path]
+
+
+def available_strategies() -> List[str]:
+    return sorted(os.path.splitext(f)[0] for f in os.listdir(STRATEGY_DIR) if f.endswith('.txt'))
@@ -0,0 +1,115 @@
+# test_agents.py
+import io
+import json
+import socket
+import threading
+
+import pytest
+
+from agents import RemoteAgent, ScriptedAgent, StrategyAgent, decode_message, run_human_rounds
+from app import Card, Game, Hand, Prompt
+from clock import VirtualClock
+
+
+class CountingAgent:
+    # Records every prompt kind before handing it on
+    def __init__(self, agent):
+        self.agent = agent
+        self.kinds = []
+
+    def act(self, prompt, game):
+        self.kinds.append(prompt.kind)
+        return self.agent.act(prompt, game)
+
+
+def test_scripted_agent_by_kind_and_fallback():
+    agent = ScriptedAgent({'bet': ['20']}, fallback=ScriptedAgent(['STAND']))
+    assert agent.act(Prompt(['bet?'], 'bet'), None) == '20'
+    assert agent.act(Prompt(['bet?'], 'bet'), None) == 'stand'
+    with pytest.raises(RuntimeError):
+        agent.act(Prompt(['hit', 'stand']), None)
+
+
+def test_headless_game_without_actions_still_raises():
+    game = Game(1, 1, interactive=False)
+    with pytest.raises(RuntimeError):
+        game.agent.act(Prompt(['hit']), game)
+
+
+def test_harness_runs_every_prompt_kind_without_pauses():
+    agent = CountingAgent(StrategyAgent(bet=25))
+    clock = VirtualClock('realistic', skip_to_my_turn=True)
+    game, _ = run_human_rounds(500, agent=agent, num_bots=2, rules='vegas_s17', clock=clock)
+    assert game.rounds_played == 500
+    assert game.players[0].rounds_played == 500
+    assert agent.kinds.count('bet') == agent.kinds.count('continue') == 500
+    assert 'insurance' in agent.kinds and 'action' in agent.kinds
+    # Pauses went to the clock instead of sleeping, with the bots' skipped
+    assert {p.reason for p in clock.pauses} == {'bot', 'dealer'}
+    assert clock.now == sum(p.seconds for p in clock.pauses if p.reason == 'dealer')
+
+
+def test_optimal_agent_gets_the_unseen_cards():
+    game, _ = run_human_rounds(20, agent=StrategyAgent('optimal'), num_decks=1)
+    assert game.rounds_played == 20
+    assert sum(game.players[0].outcomes.values()) >= 20
+
+
+def test_default_scripted_harness_is_deterministic():
+    first, _ = run_human_rounds(300, seed=3)
+    second, _ = run_human_rounds(300, seed=3)
+    assert first.players[0].balance == second.players[0].balance
+    assert sum(first.players[0].outcomes.values()) >= 300
+
+
+def test_remote_agent_speaks_json_lines():
+    ours, theirs = socket.socketpair()
+    seen = []
+
+    def client():
+        with theirs.makefile('rb') as rfile, theirs.makefile('wb') as wfile:
+            for line in rfile:
+                message = json.loads(line)
+                seen.append(message['kind'])
+                answer = {'bet': '10', 'action': 'stand'}.get(message['kind'], '')
+                wfile.write(json.dumps({'action': answer}).encode() + b'\n')
+                wfile.flush()
+
+    thread = threading.Thread(target=client)
+    thread.start()
+    agent = RemoteAgent(ours.makefile('rb'), ours.makefile('wb'))
+    game = Game(1, 0, interactive=True, ui='null', agent=agent, clock=VirtualClock())
+    game.play(max_rounds=3)
+    ours.shutdown(socket.SHUT_RDWR)
+    ours.close()
+    thread.join()
+    assert seen.count('bet') == 3
+    assert seen[-1] == 'continue'
+
+
+def test_remote_agent_raises_when_the_client_leaves():
+    agent = RemoteAgent(io.BytesIO(b''), io.BytesIO())
+    game = Game(1, 1, interactive=False)
+    with pytest.raises(ConnectionError):
+        agent.act(Prompt(['10'], 'bet'), game)
+
+
+def test_remote_agent_sends_the_server_prompt_message():
+    # The same message a server.py table sends, dealer field included
+    game = Game(1, 1, interactive=False)
+    game.dealer_hand = Hand()
+    for value in ['K', '9']:
+        game.dealer_hand.add_card(Card('♣️', value))
+    for value in ['10', '7']:
+        game.players[0].hand.add_card(Card('♦️', value))
+    wfile = io.BytesIO()
+    agent = RemoteAgent(io.BytesIO(b'{"action": "STAND"}\n'), wfile)
+    assert agent.act(Prompt(['hit', 'stand'], 'action', 0), game) == 'stand'
+    assert decode_message(wfile.getvalue()) == {
+        'type': 'prompt', 'kind': 'action', 'actions': ['hit', 'stand'],
+        'balance': game.players[0].balance, 'hands': [[str(card) for card in game.players[0].hand.cards]],
+        'dealer': ['🂠', str(game.dealer_hand.cards[1])],
+    }
+    agent = RemoteAgent(io.BytesIO(b'[]\n'), io.BytesIO())
+    with pytest.raises(ConnectionError):
+        agent.act(Prompt(['hit', 'stand'], 'action', 0), game)
@@ -0,0 +1,170 @@
+# test_analysis.py
+from itertools import permutations
+
+import pytest
+
+from analysis import (BUST, BLACKJACK, action_evs, best_action, cache_stats, clear_cache,
+                      counts_from_cards, dealer_probabilities, dealer_probabilities_for)
+from app import Card, Deck, Game, Hand
+from clock import VirtualClock
+from rules import compile_rules
+
+SIX_DECKS = (24,) * 9 + (96,)
+
+
+def without(counts, *points):
+    counts = list(counts)
+    for p in points:
+        counts[p - 1] -= 1
+    return tuple(counts)
+
+
+def brute_force(up, cards):
+    # Enumerate every order of the remaining cards and play the dealer out
+    totals = [0.0] * 7
+    orders = list(permutations(cards))
+    for order in orders:
+        hand = Hand()
+        hand.add_card(Card("♠️", up))
+        for card in order:
+            if hand.get_value() >= 17:
+                break
+            hand.add_card(card)
+        value = hand.get_value()
+        if value > 21:
+            totals[BUST] += 1
+        elif value == 21 and len(hand.cards) == 2:
+            totals[BLACKJACK] += 1
+        else:
+            totals[value - 17] += 1
+    return [t / len(orders) for t in totals]
+
+
+def test_probabilities_sum_to_one():
+    for up in range(1, 11):
+        assert sum(dealer_probabilities(up, without(SIX_DECKS, up))) == pytest.approx(1.0)
+
+
+def test_dealer_six_busts_most():
+    bust = dealer_probabilities(6, without(SIX_DECKS, 6))[BUST]
+    assert bust == pytest.approx(0.4228, abs=1e-3)
+    assert dealer_probabilities(10, without(SIX_DECKS, 10))[BLACKJACK] == pytest.approx(24 / 311)
+
+
+def test_matches_brute_force_on_small_shoe():
+    cards = [Card("♥️", v) for v in ['A', '2', '5', '6', 'K', '9', '3']]
+    exact = dealer_probabilities(10, counts_from_cards(cards))
+    assert list(exact) == pytest.approx(brute_force('K', cards))
+
+
+def test_cache_reports_hits():
+    clear_cache()
+    counts = without(SIX_DECKS, 7)
+    dealer_probabilities(7, counts)
+    dealer_probabilities(7, counts)
+    stats = cache_stats()
+    assert stats['hits'] >= 1
+    assert 0 < stats['hit_rate'] <= 1
+    assert stats['size'] <= stats['maxsize']
+
+
+def test_probabilities_for_live_deck():
+    deck = Deck(2)
+    dealer = Hand()
+    dealer.add_card(deck.deal_card())
+    dealer.add_card(deck.deal_card())
+    probs = dealer_probabilities_for(deck, dealer)
+    assert sum(probs.values()) == pytest.approx(1.0)
+
+
+def make_hand(*values):
+    hand = Hand()
+    for value in values:
+        hand.add_card(Card("♠️", value))
+    return hand
+
+
+def evs_for(values, up):
+    hand = make_hand(*values)
+    counts = without(SIX_DECKS, *[card.points for card in hand.cards], up)
+    return action_evs(hand, up, counts)
+
+
+def test_action_evs_pick_textbook_plays():
+    assert best_action(evs_for(['10', '6'], 10)) == 'hit'
+    assert best_action(evs_for(['5', '6'], 6)) == 'double down'
+    assert best_action(evs_for(['A', 'A'], 6)) == 'split'
+    assert best_action(evs_for(['10', 'K'], 6)) == 'stand'
+    assert evs_for(['10', '6'], 10)['stand'] == pytest.approx(-0.5766, abs=1e-3)
+
+
+def test_fixed_dealer_approximation_is_close_to_exact():
+    hand = make_hand('10', '4')
+    counts = counts_from_cards([Card("♥️", v) for v in ['A', '2', '5', '6', 'K', '9', '3', '7', '8', 'Q'] * 2])
+    approx = action_evs(hand, 10, counts)
+    exact = action_evs(hand, 10, counts, exact=True)
+    for action in approx:
+        assert approx[action] == pytest.approx(exact[action], abs=0.05)
+
+
+def test_dealer_hits_soft_17_under_h17_rules():
+    s17 = dealer_probabilities(6, without(SIX_DECKS, 6))
+    h17 = dealer_probabilities(6, without(SIX_DECKS, 6), compile_rules('vegas_h17'))
+    assert sum(h17) == pytest.approx(1.0)
+    assert h17[BUST] > s17[BUST] + 0.01
+    assert h17[0] < s17[0]
+
+
+def test_action_evs_follow_the_table_rules():
+    def evs(values, up, rules):
+        hand = make_hand(*values)
+        counts = without(SIX_DECKS, *[card.points for card in hand.cards], up)
+        return action_evs(hand, up, counts, rules=compile_rules(rules))
+    # A peeking dealer has no natural once the player gets to act
+    assert evs(['10', '6'], 10, 'vegas_s17')['stand'] == pytest.approx(-0.541, abs=1e-3)
+    # Soft 18 against a 2 doubles only when the dealer hits soft 17
+    assert best_action(evs(['A', '7'], 2, 'house')) == 'stand'
+    assert best_action(evs(['A', '7'], 2, 'vegas_h17')) == 'double down'
+    # Without a peek, a dealer natural beats a drawn 21 where naturals win
+    assert evs(['10', '6'], 10, 'european')['hit'] < evs(['10', '6'], 10, 'house')['hit']
+
+
+def test_optimal_bot_is_given_the_table_rules():
+    import random
+    from analysis import OptimalStrategy
+    seen = set()
+
+    class Spy(OptimalStrategy):
+        def decide(self, *args, **kwargs):
+            seen.add(kwargs['rules'].rules.name)
+            return super().decide(*args, **kwargs)
+
+    Game(1, 2, interactive=False, strategy=Spy(), rules='vegas_h17', rng=random.Random(2)).play(max_rounds=5)
+    assert seen == {'vegas_h17'}
+
+
+def test_optimal_bot_plays_rounds():
+    import random
+    game = Game(1, 2, interactive=False, strategy='optimal', rng=random.Random(2))
+    game.play(max_rounds=5)
+    assert game.rounds_played == 5
+
+
+def test_human_hint_shows_action_evs(monkeypatch):
+    from app import RecordingGameUI
+    class DummyDeck:
+        def __init__(self, num_decks, **kwargs):
+            self.cards = [Card('♠️', '2')] * 40
+        def deal_card(self):
+            return Card('♠️', '2')
+        def needs_shuffle(self):
+            return False
+        def start_round(self):
+            pass
+    monkeypatch.setattr('app.Deck', DummyDeck)
+    ui = RecordingGameUI()
+    game = Game(1, 0, interactive=True, human_actions=['Tester', '5', 'hint', 'stand', ''], ui=ui,
+                clock=VirtualClock())
+    game.play(max_rounds=1)
+    hints = [msg for kind, msg in ui.events if kind == 'show_message' and msg.startswith('Hint:')]
+    assert hints and 'split' in hints[0]
@@ -1,6 +1,9 @@
 # test_app.py
+import random
+
 import pytest
 from app import Card, Deck, Hand, Player, Game
+from clock import VirtualClock
 
 
 @pytest.fixture
@@ -24,6 +27,26 @@ def test_card_creation():
     assert card.value == "10"
 
 
+def test_cards_are_interned_and_immutable():
+    import pickle
+    card = Card("♠️", "A")
+    assert Card("♠️", "A") is card
+    assert pickle.loads(pickle.dumps(card)) is card
+    assert (card.rank, card.points, card.is_ace) == (12, 1, True)
+    assert repr(card) == "♠️ A"
+    assert repr(Card("♥️", "10")) == "♥️ 10"
+    with pytest.raises(AttributeError):
+        card.value = "K"
+
+
+def test_hand_get_value_soft_aces(hand):
+    for value in ["A", "A", "9"]:
+        hand.add_card(Card("♣️", value))
+    assert hand.get_value() == 21
+    hand.add_card(Card("♣️", "5"))
+    assert hand.get_value() == 16
+
+
 def test_deck_creation(deck):
     assert len(deck.cards) == 52
 
@@ -34,6 +57,63 @@ def test_deal_card(deck):
     assert len(deck.cards) == 51
 
 
+def test_deck_cut_card_triggers_reshuffle():
+    deck = Deck(1, penetration=0.5)
+    assert not deck.needs_shuffle()
+    for _ in range(26):
+        deck.deal_card()
+    assert deck.needs_shuffle()
+    deck.shuffle()
+    assert len(deck.cards) == 52
+    assert deck.shuffles == 2
+    assert not deck.needs_shuffle()
+
+
+def test_deck_reshuffles_when_exhausted():
+    deck = Deck(1)
+    for _ in range(60):
+        deck.deal_card()
+    assert deck.cards_remaining() == 44
+
+
+def test_deck_reshuffles_only_discards_mid_round():
+    deck = Deck(1, rng=random.Random(2), counting='hilo')
+    for _ in range(48):
+        deck.deal_card()
+    deck.start_round()
+    in_play = [deck.deal_card() for _ in range(4)]
+    rest = [deck.deal_card() for _ in range(48)]
+    # The 48 discards make the new shoe; the 4 cards on the table stay dealt
+    assert not set(in_play) & set(rest)
+    assert deck.cards_remaining() == 0
+    assert deck.rank_counts == [0] * 13
+    assert deck.running_count == 0
+    # Every card is on the table now; none of them goes back into a shoe
+    with pytest.raises(RuntimeError):
+        deck.deal_card()
+    assert deck.dealt == rest
+
+
+def test_deck_continuous_mode_always_shuffles():
+    deck = Deck(1, continuous=True)
+    assert deck.needs_shuffle()
+
+
+def test_game_passes_shoe_options_to_the_deck():
+    game = Game(2, 1, interactive=False, continuous=True, penetration=0.5)
+    assert game.deck.cut_card == 52
+    game.play(max_rounds=10)
+    # Initial shuffle plus one before every round
+    assert game.deck.shuffles == 11
+
+
+def test_game_long_run_does_not_exhaust_shoe():
+    game = Game(1, 5, interactive=False, starting_balance=10 ** 6)
+    game.play(max_rounds=500)
+    assert game.rounds_played == 500
+    assert game.deck.shuffles > 1
+
+
 def test_hand_add_card(hand):
     card = Card("♥️", "10")
     hand.add_card(card)
@@ -48,6 +128,20 @@ def test_hand_get_value(hand):
     assert hand.get_value() == 15
 
 
+def test_hand_tracks_soft_and_blackjack(hand):
+    hand.add_card(Card("♣️", "A"))
+    hand.add_card(Card("♦️", "K"))
+    assert hand.is_blackjack and hand.is_soft
+    hand.add_card(Card("♦️", "5"))
+    assert hand.get_value() == 16
+    assert not hand.is_soft and not hand.is_blackjack
+    assert hand.pop_card() == Card("♦️", "5")
+    assert hand.get_value() == 21
+    hand.add_card(Card("♦️", "Q"))
+    hand.add_card(Card("♦️", "2"))
+    assert hand.is_bust
+
+
 def test_player_hit(player, deck):
     player.hit(deck)
     assert len(player.hand.cards) == 1
@@ -68,6 +162,24 @@ def test_player_split(player, deck):
     player.hand.add_card(card2)
     assert player.split(deck)
 
+def test_player_split_creates_second_hand(player, deck):
+    player.hand.bet = 10
+    player.hand.add_card(Card("♥️", "8"))
+    player.hand.add_card(Card("♦️", "8"))
+    assert player.split(deck)
+    assert len(player.hands) == 2
+    assert [h.cards[0].value for h in player.hands] == ["8", "8"]
+    assert all(len(h.cards) == 2 and h.bet == 10 and h.from_split for h in player.hands)
+
+
+def test_split_hand_twenty_one_is_not_blackjack(hand):
+    hand.add_card(Card("♥️", "A"))
+    hand.add_card(Card("♥️", "K"))
+    hand.from_split = True
+    assert hand.get_value() == 21 and not hand.is_blackjack
+    assert hand.is_split_aces
+
+
 # My own personal test (Jessie)
 def test_player_split_invalid(player, deck):
     card1 = Card("♠️", "10")
@@ -92,14 +204,319 @@ def test_game_play_human_interactive(monkeypatch):
     # Replace Deck so cards are predictable
     from app import Card
     class DummyDeck:
-        def __init__(self, num_decks):
+        def __init__(self, num_decks, **kwargs):
             self.cards = []
         def deal_card(self):
             return Card('♠️', '2')
+        def needs_shuffle(self):
+            return False
+        def start_round(self):
+            pass
     monkeypatch.setattr('app.Deck', DummyDeck)
     # Actions: name, bet, action, press Enter
     actions = ['Tester', '5', 'stand', '']
-    game = Game(1, 0, interactive=True, human_actions=actions)
+    game = Game(1, 0, interactive=True, human_actions=actions, clock=VirtualClock())
     game.play(max_rounds=1)
     # After one round, balance should remain non-negative
     assert game.players[0].balance >= 0
+
+def test_game_non_interactive_is_headless():
+    from app import NullGameUI
+    game = Game(1, 2, interactive=False)
+    assert isinstance(game.ui, NullGameUI)
+
+def test_game_recording_ui_captures_round():
+    from app import RecordingGameUI
+    ui = RecordingGameUI()
+    game = Game(1, 1, interactive=False, ui=ui)
+    game.play(max_rounds=1)
+    kinds = {kind for kind, _ in ui.events}
+    assert {'draw_frame', 'set_active_player', 'update_player_hand', 'update_dealer_hand', 'show_message'} <= kinds
+    assert ('show_message', "Dealer's turn...") in ui.events
+
+def test_seeded_games_are_reproducible():
+    import random
+    def run():
+        game = Game(2, 3, interactive=False, rng=random.Random(42), starting_balance=1000)
+        game.play(max_rounds=5)
+        return [(p.balance, dict(p.outcomes)) for p in game.players]
+    assert run() == run()
+
+
+class ScriptedDeck:
+    # Deals a fixed sequence of card values, in order
+    values = []
+
+    def __init__(self, num_decks, **kwargs):
+        self.cards = [Card('♠️', v) for v in self.values]
+
+    def deal_card(self):
+        return self.cards.pop(0)
+
+    def needs_shuffle(self):
+        return False
+
+    def start_round(self):
+        pass
+
+
+def scripted_game(monkeypatch, values, actions, **kwargs):
+    from app import RecordingGameUI
+    monkeypatch.setattr(ScriptedDeck, 'values', values)
+    monkeypatch.setattr('app.Deck', ScriptedDeck)
+    return Game(1, 0, interactive=True, human_actions=['Tester'] + actions, ui=RecordingGameUI(),
+                clock=VirtualClock(), **kwargs)
+
+
+def test_game_ends_when_the_human_runs_out_of_money(monkeypatch):
+    # Dealer 10+9 beats the human's 10+7, which was the whole bankroll
+    game = scripted_game(monkeypatch, ['10', '9', '10', '7'], ['10', 'stand', ''], starting_balance=10)
+    results = list(game.results(max_rounds=5))
+    assert game.rounds_played == 1
+    assert results[0].busted == [0]
+    assert results[0].seats[0].net == -10
+    assert ("show_message", "Game over.") in game.ui.events
+
+
+def test_game_split_hands_settle_independently(monkeypatch):
+    # Dealer 10+7; player 8+8 splits into 8+2 (stand) and 8+3 (double to 21)
+    game = scripted_game(monkeypatch, ['10', '7', '8', '8', '3', '2', '10'],
+                         ['10', 'split', 'stand', 'double down', ''])
+    game.play(max_rounds=1)
+    player = game.players[0]
+    assert [h.get_value() for h in player.hands] == [10, 21]
+    assert [h.bet for h in player.hands] == [10, 20]
+    assert player.balance == 100 - 10 - 10 - 10 + 40
+    assert player.outcomes == {'lose': 1, 'win': 1}
+
+
+def test_game_resplit_plays_hands_in_order(monkeypatch):
+    # 8+8 splits, the kept hand draws another 8 and re-splits
+    game = scripted_game(monkeypatch, ['10', '7', '8', '8', '3', '8', '2', '10'],
+                         ['10', 'split', 'split', 'stand', 'stand', 'stand', ''])
+    game.play(max_rounds=1)
+    player = game.players[0]
+    assert [h.get_value() for h in player.hands] == [18, 10, 11]
+    assert player.outcomes == {'win': 1, 'lose': 2}
+    assert player.balance == 100 - 30 + 20
+
+
+def bot_game(monkeypatch, values, **kwargs):
+    monkeypatch.setattr(ScriptedDeck, 'values', values)
+    monkeypatch.setattr('app.Deck', ScriptedDeck)
+    return Game(1, 1, interactive=False, strategy='basic', starting_balance=1000, **kwargs)
+
+
+def test_bot_splits_under_non_default_split_rules(monkeypatch):
+    from rules import Rules
+    # Re-split aces: A+A splits, the kept hand draws another ace and splits again
+    game = bot_game(monkeypatch, ['10', '7', 'A', 'A', '9', 'A', 'K', 'Q'],
+                    rules=Rules('resplit', resplit_aces=True))
+    game.play(max_rounds=1)
+    assert sorted(h.get_value() for h in game.players[0].hands) == [20, 21, 21]
+    # Six hands: past Player.MAX_HANDS
+    game = bot_game(monkeypatch, ['10', '7'] + ['8'] * 12 + ['10'] * 20, rules=Rules('six', max_hands=6))
+    game.play(max_rounds=1)
+    assert len(game.players[0].hands) == 6
+
+
+def test_refused_split_falls_back_to_the_non_split_action(monkeypatch):
+    monkeypatch.setattr(Player, 'split', lambda self, deck, *args: False)
+    game = bot_game(monkeypatch, ['10', '7', '8', '8', '2', '10', '10'])
+    game.play(max_rounds=1)
+    # 16 against a 7 hits instead of asking to split again
+    assert game.players[0].hand.cards[2].value == '2'
+
+
+def test_game_split_aces_get_one_card(monkeypatch):
+    # No actions are asked for after splitting aces; 21 after a split pays even money
+    game = scripted_game(monkeypatch, ['10', '7', 'A', 'A', '9', 'K'], ['10', 'split', ''])
+    game.play(max_rounds=1)
+    player = game.players[0]
+    assert [h.get_value() for h in player.hands] == [21, 20]
+    assert player.outcomes == {'win': 2}
+    assert player.balance == 100 - 20 + 40
+
+
+
+def test_dealer_hits_soft_17_only_under_h17(monkeypatch):
+    # Dealer A (hole) + 6 is soft 17; player stands on 19; next card is a 4
+    values = ['A', '6', '10', '9', '4']
+    house = scripted_game(monkeypatch, values, ['10', 'stand', ''])
+    house.play(max_rounds=1)
+    assert house.players[0].outcomes == {'win': 1}
+    h17 = scripted_game(monkeypatch, values, ['10', 'stand', ''], rules='vegas_h17')
+    h17.play(max_rounds=1)
+    assert h17.players[0].outcomes == {'lose': 1}
+
+
+def test_six_to_five_blackjack(monkeypatch):
+    game = scripted_game(monkeypatch, ['10', '7', 'A', 'K'], ['10', ''], rules='downtown_6to5')
+    game.play(max_rounds=1)
+    assert game.players[0].balance == 100 - 10 + 22
+
+
+def test_natural_is_paid_as_blackjack_when_the_dealer_busts(monkeypatch):
+    # Dealer 6+10 draws a 10; the player's A+K still pays 3:2
+    game = scripted_game(monkeypatch, ['6', '10', 'A', 'K', '10'], ['10', ''], rules='vegas_s17')
+    game.play(max_rounds=1)
+    assert game.dealer_hand.get_value() > 21
+    assert game.players[0].outcomes == {'blackjack': 1}
+    assert game.players[0].balance == 100 - 10 + 25
+    assert ('show_message', 'Tester wins $15 with Blackjack!') in game.ui.events
+
+
+def test_late_surrender_returns_half(monkeypatch):
+    game = scripted_game(monkeypatch, ['7', '10', '10', '6'], ['10', 'surrender', ''], rules='vegas_s17')
+    game.play(max_rounds=1)
+    assert game.players[0].outcomes == {'surrender': 1}
+    assert game.players[0].balance == 95
+
+
+def test_peek_ends_round_and_insurance_pays(monkeypatch):
+    # Dealer K (hole) + A up: insurance is offered, the peek finds the natural
+    # and the player is never asked to act
+    game = scripted_game(monkeypatch, ['K', 'A', '10', '9'], ['10', 'y', ''], rules='vegas_s17')
+    game.play(max_rounds=1)
+    player = game.players[0]
+    assert player.outcomes == {'lose': 1}
+    assert player.balance == 100 - 10 - 5 + 15
+    assert ('show_message', 'Dealer has Blackjack!') in game.ui.events
+
+
+def test_house_rules_pay_player_natural_against_dealer_natural(monkeypatch):
+    game = scripted_game(monkeypatch, ['K', 'A', 'A', 'K'], ['10', ''])
+    game.play(max_rounds=1)
+    assert game.players[0].balance == 100 - 10 + 25
+
+
+def test_double_restricted_to_listed_totals(monkeypatch):
+    # European rules: doubling only on hard 9-11, so 12 cannot double
+    game = scripted_game(monkeypatch, ['10', '8', '7', '5'], ['10', 'double down', 'stand', ''], rules='european')
+    game.play(max_rounds=1)
+    assert ('show_message', 'double down is not available.') in game.ui.events
+    assert game.players[0].hand.bet == 10
+
+def test_rich_ui_coalesces_updates_and_caches_panels():
+    import io
+    rich_console = pytest.importorskip('rich.console')
+    from rich_ui import RichGameUI
+    console = rich_console.Console(file=io.StringIO(), force_terminal=True, width=100)
+    ui = RichGameUI(console=console, refresh_per_second=0.01)
+    players = [Player("Alice", 100), Player("Bob", 100)]
+    ui.initialize(players)
+    ui.update_dealer_hand(Hand(), hide_first_card=True)
+    for message in ["a", "b", "c"]:
+        ui.show_message(message)
+    # The first update rendered; the rest wait for the refresh interval
+    assert ui.frames_rendered == 1
+    alice, bob = ui._panel_cache[0][1], ui._panel_cache[1][1]
+    players[1].hand.add_card(Card('♠️', 'K'))
+    ui.close()
+    assert ui.frames_rendered == 2
+    assert ui._panel_cache[0][1] is alice
+    assert ui._panel_cache[1][1] is not bob
+    assert "K" in console.file.getvalue()
+
+
+def test_rich_ui_draws_nothing_while_idle():
+    import io
+    import time
+    rich_console = pytest.importorskip('rich.console')
+    from rich_ui import RichGameUI
+    console = rich_console.Console(file=io.StringIO(), force_terminal=True, width=100)
+    ui = RichGameUI(console=console, refresh_per_second=20)
+    ui.initialize([Player("Alice", 100)])
+    for message in ["a", "b", "c"]:
+        ui.show_message(message)
+    time.sleep(0.15)
+    frames, written = ui.frames_rendered, len(console.file.getvalue())
+    assert frames == 2  # the first update, then the rest of the burst together
+    time.sleep(0.2)
+    assert (ui.frames_rendered, len(console.file.getvalue())) == (frames, written)
+    ui.close()
+
+
+def test_rich_ui_pauses_its_live_display_for_input(monkeypatch):
+    import io
+    rich_console = pytest.importorskip('rich.console')
+    from rich_ui import RichGameUI
+    console = rich_console.Console(file=io.StringIO(), force_terminal=True, width=100)
+    ui = RichGameUI(console=console)
+    ui.initialize([Player("Alice", 100)])
+    ui.update_dealer_hand(Hand())
+    live = ui._live
+    seen = []
+    monkeypatch.setattr(console, 'input', lambda prompt: seen.append(live.is_started) or 'HIT')
+    assert ui.prompt_for_action(['hit', 'stand']) == 'hit'
+    assert seen == [False]
+    assert ui._live is live and live.is_started
+    ui.close()
+    assert not live.is_started
+
+
+def test_ansi_ui_writes_one_buffer_per_update_and_only_changed_lines():
+    from app import GameUI
+
+    class Terminal:
+        def __init__(self):
+            self.writes = []
+        def write(self, data):
+            self.writes.append(data)
+        def flush(self):
+            pass
+
+    out = Terminal()
+    ui = GameUI(40, out=out)
+    players = [Player("Alice", 100), Player("Bob", 100)]
+    ui.initialize(players)
+    ui.draw_frame()
+    assert len(out.writes) == 1 and out.writes[0].startswith("\033[2J")
+    players[1].hand.add_card(Card('♠️', 'K'))
+    ui.update_player_hand(1)
+    # Only Bob's cards and value rows changed
+    assert len(out.writes) == 2 and out.writes[1].count("\033[2K") == 2
+    ui.update_player_hand(1)
+    assert len(out.writes) == 2
+
+
+def test_virtual_clock_paces_bots_and_dealer():
+    from app import RecordingGameUI
+    clock = VirtualClock('fast')
+    game = Game(1, 2, interactive=True, human_actions=['Tester', '10', 'stand', ''],
+                ui=RecordingGameUI(), clock=clock, rng=random.Random(4))
+    game.play(max_rounds=1)
+    reasons = {pause.reason for pause in clock.pauses}
+    assert reasons == {'bot', 'dealer'}
+    assert clock.now == sum(p.seconds for p in clock.pauses) * 0.25
+
+
+def test_skip_to_my_turn_drops_bot_pauses_only():
+    from app import Pause
+    from clock import Clock
+    clock = Clock('realistic', skip_to_my_turn=True)
+    assert clock.delay(Pause(3, 'bot')) == 0
+    assert clock.delay(Pause(1, 'dealer')) == 1
+    assert Clock('instant').delay(Pause(1, 'dealer')) == 0
+    with pytest.raises(ValueError):
+        Clock('ludicrous')
+
+
+def test_headless_game_never_imports_rich():
+    import subprocess
+    import sys
+    code = ("import sys, app; app.Game(1, 2, interactive=False).play(max_rounds=1); "
+            "print('rich' in sys.modules)")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == 'False'
+
+
+def test_create_ui_falls_back_to_ansi_without_rich(monkeypatch):
+    import app
+    def missing():
+        raise ImportError('rich')
+    monkeypatch.setitem(app.UI_BACKENDS, 'rich', missing)
+    assert isinstance(app.create_ui(), app.GameUI)
+    assert isinstance(app.create_ui('null'), app.NullGameUI)
+    game = Game(1, 1, interactive=False, ui='recording')
+    assert isinstance(game.ui, app.RecordingGameUI)
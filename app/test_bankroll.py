@@ -0,0 +1,106 @@
+# test_bankroll.py
+import math
+import random
+import statistics
+
+from app import Game, RoundResult, SeatResult
+from bankroll import BankrollAnalyzer, RunningStats, simulate
+
+
+def test_running_stats_match_statistics_and_merge():
+    rng = random.Random(3)
+    values = [rng.gauss(-0.5, 20) for _ in range(1000)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert math.isclose(stats.mean, statistics.fmean(values))
+    assert math.isclose(stats.variance, statistics.variance(values))
+    left, right = RunningStats(), RunningStats()
+    for value in values[:300]:
+        left.add(value)
+    for value in values[300:]:
+        right.add(value)
+    left.merge(right)
+    assert math.isclose(left.mean, stats.mean)
+    assert math.isclose(left.variance, stats.variance)
+    assert (left.min, left.max) == (min(values), max(values))
+
+
+def path(balances, bankroll=100, busted_at=None):
+    # RoundResults for a single seat walking through the given balances
+    previous = bankroll
+    for number, balance in enumerate(balances, 1):
+        busted = [0] if number == busted_at else []
+        yield RoundResult(number, [SeatResult(0, 'Bot 1', 10, balance - previous, balance)], busted)
+        previous = balance
+
+
+def test_drawdowns_and_episodes():
+    analyzer = BankrollAnalyzer()
+    for result in path([90, 70, 80, 110, 100, 120, 60]):
+        analyzer.update(result)
+    track = analyzer.seats[0, 0]
+    assert (track.peak, track.trough, track.max_drawdown) == (120, 60, 60)
+    summary = analyzer.summary()
+    # Closed episodes of 30 and 10, plus the open one of 60
+    assert summary['drawdown_episodes']['count'] == 3
+    assert math.isclose(summary['drawdown_episodes']['mean'], (0.3 + 0.1 + 0.6) / 3)
+    assert summary['max_drawdown']['count'] == 1
+    assert summary['risk_of_ruin'] == 0.0
+    assert summary['ev_per_wager'] == (60 - 100) / 70
+    # Finishing the table folds the seat without changing the summary
+    analyzer.finish()
+    assert not analyzer.seats
+    assert analyzer.summary() == summary
+
+
+def test_finished_and_busted_seats_are_dropped():
+    analyzer = BankrollAnalyzer()
+    for table in range(50):
+        analyzer.consume(path([50, 0], busted_at=2) if table % 2 else path([110, 90]), table)
+        assert not analyzer.seats
+    summary = analyzer.summary()
+    assert summary['seats'] == 50
+    assert summary['risk_of_ruin'] == 0.5
+    assert summary['max_drawdown']['count'] == 50
+
+
+def test_ruin_is_recorded_when_a_seat_busts():
+    analyzer = BankrollAnalyzer()
+    analyzer.consume(path([50, 0], busted_at=2), table=0)
+    analyzer.consume(path([110, 120]), table=1)
+    summary = analyzer.summary()
+    assert summary['risk_of_ruin'] == 0.5
+    assert summary['rounds_to_ruin'] == 2
+    assert summary['drawdown_episodes']['count'] == 1
+
+
+def test_analytic_risk_of_ruin_and_n0():
+    analyzer = BankrollAnalyzer().consume(path([101, 100, 102, 101, 103]))
+    mean, variance = analyzer.net.mean, analyzer.net.variance
+    assert math.isclose(analyzer.n0(), variance / mean ** 2)
+    assert math.isclose(analyzer.analytic_risk_of_ruin(), math.exp(-2 * mean * 100 / variance))
+    losing = BankrollAnalyzer().consume(path([90, 80]))
+    assert losing.analytic_risk_of_ruin() == 1.0
+
+
+def test_busted_bots_leave_and_the_table_plays_on():
+    game = Game(6, 3, interactive=False, rng=random.Random(2), starting_balance=30)
+    seen = []
+    for result in game.results(max_rounds=500):
+        seen.append(len(result.seats))
+        for seat in result.busted:
+            assert not game.players[seat].seated
+    assert seen[0] == 3
+    assert seen == sorted(seen, reverse=True)
+    assert min(seen) < 3
+    # Players who left stopped counting rounds; the rest played every one
+    for player in game.players:
+        assert player.rounds_played <= game.rounds_played
+        assert player.seated == (player.rounds_played == game.rounds_played and player.balance > 0)
+
+
+def test_simulate_is_deterministic():
+    first = simulate(2, 200, seed=4).summary()
+    assert first == simulate(2, 200, seed=4).summary()
+    assert first['seats'] == 6
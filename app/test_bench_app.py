@@ -0,0 +1,29 @@
+# test_bench_app.py
+import json
+
+from bench_app import SUITE, compare, load_baseline, main, run_suite, save_baseline
+
+
+def test_compare_flags_only_slowdowns_past_threshold():
+    baseline = {'a': 1.0, 'b': 1.0, 'c': 1.0}
+    current = {'a': 1.1, 'b': 1.5, 'c': 0.5, 'new': 2.0}
+    assert compare(baseline, current, threshold=0.25) == {'b': (1.0, 1.5, 1.5)}
+
+
+def test_suite_covers_hot_paths():
+    for name in ['deck_construct_6', 'deck_shuffle_6', 'deal_card', 'hand_get_value',
+                 'round_1_bots', 'round_4_bots', 'round_7_bots', 'draw_frame_ansi']:
+        assert name in SUITE
+
+
+def test_baseline_round_trip_and_compare_command(tmp_path):
+    results = run_suite('hand_get_value', repeat=1, target=0.01)
+    assert set(results) == {'hand_get_value'} and results['hand_get_value'] > 0
+    path = str(tmp_path / 'baseline.json')
+    save_baseline(results, path)
+    assert load_baseline(path) == results
+    with open(path) as f:
+        assert 'python' in json.load(f)['meta']
+    # A baseline far faster than anything achievable must fail the comparison
+    save_baseline({'hand_get_value': 1e-12}, path)
+    assert main(['compare', path, '-k', 'hand_get_value']) == 1
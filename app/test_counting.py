@@ -0,0 +1,100 @@
+# test_counting.py
+import random
+
+import pytest
+
+from analysis import counts_from_cards, unseen_counts
+from app import VALUES, Deck, Game, Hand, Player
+from counting import HI_LO, KO, SYSTEMS, BettingRamp, CountingSystem, FlatBet, get_system
+
+
+def recount(deck, system):
+    dealt = deck._shoe[:deck._pos]
+    return system.initial_count(deck.num_decks) + sum(system.tags[card.rank] for card in dealt)
+
+
+@pytest.mark.parametrize('name', sorted(SYSTEMS))
+def test_running_count_matches_recount(name):
+    deck = Deck(6, rng=random.Random(3), counting=name)
+    for _ in range(150):
+        deck.deal_card()
+        assert deck.running_count == recount(deck, SYSTEMS[name])
+    ranks = [0] * len(VALUES)
+    for card in deck.cards:
+        ranks[card.rank] += 1
+    assert deck.rank_counts == ranks
+    assert deck.remaining_points() == counts_from_cards(deck.cards)
+
+
+def test_shuffle_resets_histogram_and_count():
+    deck = Deck(2, rng=random.Random(1), counting='ko')
+    for _ in range(40):
+        deck.deal_card()
+    deck.shuffle()
+    assert deck.rank_counts == [8] * 13
+    assert deck.running_count == KO.initial_count(2) == -4
+
+
+def test_true_count_divides_by_decks_remaining():
+    deck = Deck(2, rng=random.Random(1))
+    deck._running_count = 6
+    deck._pos = deck._counted = 52  # one of two decks dealt
+    assert deck.true_count() == 6
+    deck._pos = deck._counted = 90  # under a deck left: divide by one
+    assert deck.true_count() == 6
+    deck._pos = deck._counted = 0
+    assert deck.true_count() == 3
+
+
+def test_insurance_count_leaves_out_the_hole_card():
+    deck = Deck(1, rng=random.Random(5))
+    hole, up = deck.deal_card(), deck.deal_card()
+    while HI_LO.tags[hole.rank] != 1:
+        deck.shuffle()
+        hole, up = deck.deal_card(), deck.deal_card()
+    assert deck.true_count((hole,)) == deck.running_count - 1
+    # A visible count of +2 is under the insurance index; the hidden low card
+    # would push it to +3
+    deck._running_count = 3
+    ramp = BettingRamp()
+    assert ramp.insure(None, deck) and not ramp.insure(None, deck, (hole,))
+
+
+def test_unseen_counts_uses_the_histogram():
+    deck = Deck(1, rng=random.Random(2))
+    dealer = Hand()
+    dealer.add_card(deck.deal_card())
+    dealer.add_card(deck.deal_card())
+    expected = list(counts_from_cards(deck.cards))
+    expected[dealer.cards[0].points - 1] += 1
+    assert unseen_counts(deck, dealer) == tuple(expected)
+
+
+def test_get_system_validates():
+    assert get_system(None) is HI_LO
+    with pytest.raises(ValueError):
+        get_system('wonging')
+    with pytest.raises(ValueError):
+        get_system(CountingSystem('short', (1, -1)))
+
+
+def test_betting_ramp_steps():
+    ramp = BettingRamp(unit=10)
+    assert [ramp.units_for(tc) for tc in (-3, 0, 1.9, 2, 3.5, 4, 5, 12)] == [1, 1, 1, 2, 4, 6, 8, 8]
+
+    class Shoe:
+        def true_count(self):
+            return 4.2
+    assert ramp.bet(Player('Bot 1', 1000), Shoe()) == 60
+    assert ramp.bet(Player('Bot 1', 25), Shoe()) == 25
+    assert FlatBet(10).bet(Player('Bot 1', 5), Shoe()) == 10
+
+
+def test_bots_bet_by_the_count():
+    game = Game(6, 3, interactive=False, rng=random.Random(7), betting='ramp', starting_balance=10 ** 6)
+    bets = set()
+    for _ in range(300):
+        game.play(max_rounds=1)
+        bets.update(hand.bet for player in game.players for hand in player.hands if not hand.from_split)
+    # A flat $10 bettor never has more than $20 (a double) on a hand
+    assert 10 in bets and max(bets) > 20
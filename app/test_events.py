@@ -0,0 +1,116 @@
+# test_events.py
+import random
+
+import pytest
+
+from collections import Counter
+
+from app import Game
+from events import EventLog, read_log, replay
+
+
+def test_log_replays_every_round(tmp_path):
+    path = tmp_path / 'session.bjev'
+    with EventLog(str(path)) as log:
+        game = Game(2, 3, interactive=False, rng=random.Random(4),
+                    starting_balance=10 ** 6, strategy='basic', log=log)
+        game.play(max_rounds=200)
+
+    records = list(replay(str(path)))
+    assert [r.number for r in records] == list(range(1, 201))
+    assert all(r.audit() for r in records)
+    assert any(r.shuffled for r in records)
+    for i, player in enumerate(game.players):
+        assert sum(r.seats[i].net for r in records) == player.balance - 10 ** 6
+    assert any(len(seat.hands) > 1 for r in records for seat in r.seats.values())
+
+
+def test_dry_shoe_never_redeals_cards_on_the_table(tmp_path):
+    # One deck dealt to the last card: mid-round reshuffles take only the discards
+    path = tmp_path / 'dry.bjev'
+    with EventLog(str(path)) as log:
+        game = Game(1, 6, interactive=False, rng=random.Random(3), starting_balance=10 ** 6,
+                    log=log, penetration=1.0)
+        game.play(max_rounds=300)
+    for record in replay(str(path)):
+        cards = record.dealer.cards + [c for seat in record.seats.values() for h in seat.hands for c in h.cards]
+        assert max(Counter(cards).values()) == 1
+        assert record.audit()
+
+
+def test_log_records_rules_surrender_and_insurance(tmp_path):
+    from strategy import parse_strategy
+    surrenderer = parse_strategy("[hard]\n4-11: DDDDDDDDDD\n12-16: RRRRRRRRRR\n17-21: SSSSSSSSSS", 'surrenderer')
+    path = tmp_path / 'vegas.bjev'
+    with EventLog(str(path)) as log:
+        game = Game(2, 3, interactive=False, rng=random.Random(6), starting_balance=10 ** 6,
+                    strategy=surrenderer, betting='ramp', rules='vegas_h17', log=log)
+        game.play(max_rounds=300)
+    header, _ = read_log(str(path))
+    assert header['rules']['hit_soft_17'] is True
+    records = list(replay(str(path)))
+    assert all(r.audit() for r in records)
+    seats = [seat for r in records for seat in r.seats.values()]
+    assert any(hand.surrendered for seat in seats for hand in seat.hands)
+    assert any(seat.insurance for seat in seats)
+    for i, player in enumerate(game.players):
+        assert sum(r.seats[i].net for r in records) == player.balance - 10 ** 6
+
+def test_replay_rebuilds_hands_exactly(tmp_path):
+    from app import RecordingGameUI
+    path = tmp_path / 'one.bjev'
+    ui = RecordingGameUI()
+    with EventLog(str(path)) as log:
+        game = Game(1, 1, interactive=False, rng=random.Random(9), ui=ui, log=log)
+        game.play(max_rounds=1)
+    record = next(replay(str(path)))
+    assert record.dealer.cards == ui.dealer_hand.cards
+    assert [h.cards for h in record.seats[0].hands] == [h.cards for h in game.players[0].hands]
+
+
+def test_tampered_payout_fails_audit(tmp_path):
+    path = tmp_path / 'bad.bjev'
+    with EventLog(str(path)) as log:
+        Game(1, 1, interactive=False, rng=random.Random(1), log=log).play(max_rounds=1)
+    record = next(replay(str(path)))
+    record.seats[0].payouts[0] += 5
+    assert not record.audit()
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / 'junk.bin'
+    path.write_bytes(b'nope')
+    with pytest.raises(ValueError):
+        read_log(str(path))
+
+
+def test_torn_final_frame_is_ignored(tmp_path):
+    path = tmp_path / 'torn.bjev'
+    with EventLog(str(path)) as log:
+        Game(1, 1, interactive=False, rng=random.Random(2), log=log).play(max_rounds=3)
+    data = path.read_bytes()
+    path.write_bytes(data[:-5])
+    assert len(list(replay(str(path)))) == 2
+
+
+def test_reopened_log_appends_after_a_torn_frame(tmp_path):
+    path = tmp_path / 'resume.bjev'
+    with EventLog(str(path)) as log:
+        Game(1, 1, interactive=False, rng=random.Random(2), log=log).play(max_rounds=3)
+    path.write_bytes(path.read_bytes()[:-5])
+    with EventLog(str(path)) as log:
+        Game(1, 1, interactive=False, rng=random.Random(5), log=log).play(max_rounds=4)
+    records = list(replay(str(path)))
+    assert [r.number for r in records] == [1, 2, 1, 2, 3, 4]
+    assert all(r.audit() for r in records)
+
+
+def test_reopened_log_must_match_the_table(tmp_path):
+    path = tmp_path / 'other.bjev'
+    with EventLog(str(path)) as log:
+        Game(1, 1, interactive=False, rng=random.Random(2), log=log).play(max_rounds=1)
+    size = path.stat().st_size
+    with pytest.raises(ValueError):
+        with EventLog(str(path)) as log:
+            Game(1, 2, interactive=False, rng=random.Random(2), log=log)
+    assert path.stat().st_size == size
@@ -0,0 +1,98 @@
+# test_history.py
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from app import Game
+from events import EventLog
+from history import HistoryStore, HistoryWriter, import_log
+
+
+@pytest.fixture
+def store_dir(tmp_path):
+    log_path = str(tmp_path / 'session.bjev')
+    with EventLog(log_path) as log:
+        game = Game(4, 3, interactive=False, rng=random.Random(8), starting_balance=10 ** 6,
+                    strategy='basic', log=log)
+        game.play(max_rounds=300)
+    directory = str(tmp_path / 'history')
+    rows = import_log(log_path, directory)
+    assert rows >= 900
+    return directory, game
+
+
+def test_store_is_memory_mapped(store_dir):
+    directory, _ = store_dir
+    store = HistoryStore(directory)
+    assert isinstance(store['payout'], np.memmap)
+    assert store['cards'].shape == (len(store), 12)
+    assert (store['ncards'] >= 2).all()
+
+
+def test_net_matches_game_balances(store_dir):
+    directory, game = store_dir
+    store = HistoryStore(directory)
+    net = int((store['payout'].astype(np.int64) - store['bet']).sum())
+    assert net == sum(p.balance - 10 ** 6 for p in game.players)
+
+
+def test_summary_by_bucket(store_dir):
+    directory, _ = store_dir
+    store = HistoryStore(directory, chunk_rows=128)
+    by_up = store.summary('up')
+    assert set(by_up) <= set(range(2, 12))
+    assert sum(b['hands'] for b in by_up.values()) == len(store)
+    assert all(0 <= b['bust_rate'] <= 1 and 0 <= b['win_rate'] <= 1 for b in by_up.values())
+    by_total = store.summary('total')
+    assert all(b['bust_rate'] == 1.0 for t, b in by_total.items() if t > 21)
+    splits = store.summary('up', where=lambda c: c('split') == 1)
+    assert sum(b['hands'] for b in splits.values()) == int(store['split'].sum())
+
+
+def test_writer_appends(tmp_path, store_dir):
+    directory, _ = store_dir
+    before = len(HistoryStore(directory))
+    from app import Card
+    with HistoryWriter(directory) as writer:
+        writer.add_hand(10, 20, [Card('♠️', 'K'), Card('♠️', '9')], ['stand'], False, 10, 0)
+    store = HistoryStore(directory)
+    assert len(store) == before + 1
+    assert store['first_action'][-1] == 1
+    assert store['total'][-1] == 19
+
+
+def test_writer_drops_bytes_of_an_unfinished_flush(store_dir):
+    directory, _ = store_dir
+    before = len(HistoryStore(directory))
+    from app import Card
+    # A crash mid-flush: some columns got bytes, schema.json never moved
+    with open(f'{directory}/up.bin', 'ab') as f:
+        f.write(b'\x07' * 3)
+    with open(f'{directory}/bet.bin', 'ab') as f:
+        f.write(b'\x01' * 6)
+    with HistoryWriter(directory) as writer:
+        writer.add_hand(11, 18, [Card('♠️', '5'), Card('♠️', 'K')], ['hit'], False, 25, 0)
+    store = HistoryStore(directory)
+    assert len(store) == before + 1
+    assert store['up'][-1] == 11
+    assert store['bet'][-1] == 25
+    assert store['bet'].shape == (before + 1,)
+
+
+def test_schema_is_replaced_atomically(store_dir, monkeypatch):
+    directory, _ = store_dir
+    before = len(HistoryStore(directory))
+    from app import Card
+
+    def crash(*args):
+        raise OSError('disk full')
+    # A flush that dies before the rename keeps the last schema readable
+    monkeypatch.setattr('history.os.replace', crash)
+    writer = HistoryWriter(directory)
+    writer.add_hand(10, 20, [Card('♠️', 'K'), Card('♠️', '9')], ['stand'], False, 10, 0)
+    with pytest.raises(OSError):
+        writer.flush()
+    writer.close()
+    assert len(HistoryStore(directory)) == before
@@ -0,0 +1,67 @@
+# test_metrics.py
+import json
+import random
+
+from app import Game, NullGameUI
+from metrics import PHASES, Histogram, Metrics
+
+
+def played(rounds=50, **kwargs):
+    metrics = Metrics()
+    game = Game(6, 3, interactive=False, rng=random.Random(5), metrics=metrics,
+                starting_balance=10 ** 6, **kwargs)
+    game.play(max_rounds=rounds)
+    return game, metrics
+
+
+def test_phases_counters_and_round_histogram():
+    game, metrics = played()
+    assert all(metrics.phase_seconds[phase] > 0 for phase in PHASES)
+    assert metrics.counters['rounds', None] == 50
+    assert metrics.round_latency.count == 50
+    hands = sum(v for (name, _), v in metrics.counters.items() if name == 'hands')
+    assert hands == sum(sum(p.outcomes.values()) for p in game.players)
+    assert metrics.counters['actions', 'stand'] > 0
+
+
+def test_ui_calls_are_counted_through_the_proxy():
+    game, metrics = played(rounds=3)
+    assert metrics.ui_calls['draw_frame'] == 3
+    assert metrics.ui_calls['show_message'] > 0
+    assert metrics.ui_seconds['draw_frame'] >= 0
+
+
+def test_disabled_metrics_leave_ui_unwrapped():
+    game = Game(1, 1, interactive=False)
+    assert type(game.ui) is NullGameUI
+
+
+def test_prometheus_and_json_exports(tmp_path):
+    _, metrics = played(rounds=10)
+    text = metrics.to_prometheus()
+    assert 'blackjack_phase_seconds_total{phase="deal"}' in text
+    assert 'blackjack_rounds_total 10' in text
+    assert 'blackjack_round_seconds_bucket{le="+Inf"} 10' in text
+    assert 'blackjack_round_seconds_count 10' in text
+    path = tmp_path / 'metrics.json'
+    metrics.write_json(str(path))
+    summary = json.loads(path.read_text())
+    assert summary['counters']['rounds'] == 10
+    assert summary['round_seconds']['count'] == 10
+
+
+def test_histogram_quantile_uses_bucket_bounds():
+    histogram = Histogram((1.0, 2.0, 4.0))
+    for value in [0.5, 1.5, 1.5, 3.0, 10.0]:
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.quantile(0.5) == 2.0
+    assert histogram.quantile(1.0) == float('inf')
+
+
+def test_ui_timing_can_be_turned_off():
+    metrics = Metrics(time_ui=False)
+    game = Game(1, 1, interactive=False, metrics=metrics)
+    game.play(max_rounds=2)
+    assert type(game.ui) is NullGameUI
+    assert metrics.round_latency.count == 2 and not metrics.ui_calls
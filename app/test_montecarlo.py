@@ -0,0 +1,54 @@
+# test_montecarlo.py
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from app import Game
+from montecarlo import evaluate, play_batch, STAND
+
+
+def test_evaluate_is_reproducible():
+    a = evaluate('legacy', num_hands=20_000, seed=7)
+    b = evaluate('legacy', num_hands=20_000, seed=7)
+    assert a.ev == b.ev
+    assert a.ci_low < a.ev < a.ci_high
+
+
+def test_play_batch_settlement():
+    # Dealer 10+7 stands on 17; player 10+9 stands and wins, A+K is a blackjack,
+    # and still pays 3:2 when the dealer's 6+10 draws a 10 and busts
+    cards = np.array([
+        [8, 5, 8, 7] + [0] * 44,
+        [8, 5, 12, 11] + [0] * 44,
+        [4, 8, 12, 11, 8] + [0] * 43,
+    ], dtype=np.int8)
+    stand = lambda value, *_: np.full(value.shape, STAND, dtype=np.int8)
+    net = play_batch(cards, stand, np.random.default_rng(0))
+    assert net.tolist() == [1.0, 1.5, 1.5]
+
+
+def test_legacy_ev_matches_object_engine():
+    random.seed(11)
+    nets = []
+    for _ in range(300):
+        game = Game(6, 1, interactive=False)
+        player = game.players[0]
+        player.balance = 10 ** 6
+        for _ in range(10):
+            before = player.balance
+            game.play(max_rounds=1)
+            nets.append((player.balance - before) / 10)
+    object_ev = sum(nets) / len(nets)
+    object_se = (np.var(nets) / len(nets)) ** 0.5
+
+    result = evaluate('legacy', num_hands=200_000, num_decks=6, seed=11)
+    tolerance = 4 * (object_se ** 2 + result.std_error ** 2) ** 0.5
+    assert abs(result.ev - object_ev) < tolerance
+
+
+def test_basic_strategy_table_beats_legacy():
+    legacy = evaluate('legacy', num_hands=100_000, seed=5)
+    basic = evaluate('basic', num_hands=100_000, seed=5)
+    assert basic.ev > legacy.ev + 0.03
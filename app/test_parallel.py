@@ -0,0 +1,31 @@
+# test_parallel.py
+from parallel import run_parallel, shard
+
+
+def test_shard_covers_all_tables():
+    shards = shard(10, 3)
+    assert [t for s in shards for t in s] == list(range(10))
+    assert shard(2, 4) == [range(0, 1), range(1, 2)]
+
+
+def test_results_identical_across_worker_counts():
+    serial = run_parallel(6, rounds_per_table=5, num_bots=2, seed=3, workers=1)
+    pooled = run_parallel(6, rounds_per_table=5, num_bots=2, seed=3, workers=2)
+    assert serial == pooled
+    assert serial.tables == 6
+    assert serial.rounds == 30
+    # Outcomes are tallied per hand, so splits can add to the round count
+    assert sum(serial.seats['Bot 1'].outcomes.values()) >= 30
+
+
+def test_different_seeds_differ():
+    a = run_parallel(4, rounds_per_table=5, seed=1, workers=1)
+    b = run_parallel(4, rounds_per_table=5, seed=2, workers=1)
+    assert a != b
+
+
+def test_shoe_options_reach_the_tables():
+    plain = run_parallel(2, rounds_per_table=20, seed=1, workers=1)
+    csm = run_parallel(2, rounds_per_table=20, seed=1, workers=1, continuous=True)
+    assert csm != plain
+    assert csm == run_parallel(2, rounds_per_table=20, seed=1, workers=2, continuous=True)
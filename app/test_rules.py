@@ -0,0 +1,34 @@
+# test_rules.py
+import pytest
+
+from app import SOFT
+from rules import HOUSE, RULESETS, Rules, compile_rules
+
+
+def test_house_dealer_stands_on_all_17s():
+    assert HOUSE.dealer_hits[16] and not HOUSE.dealer_hits[17]
+    assert HOUSE.dealer_hits[16 + SOFT] and not HOUSE.dealer_hits[17 + SOFT]
+    assert HOUSE.blackjack_return == 2.5
+    assert not HOUSE.dealer_blackjack_wins
+
+
+def test_h17_hits_soft_17_only():
+    rules = compile_rules('vegas_h17')
+    assert rules.dealer_hits[17 + SOFT] and not rules.dealer_hits[17]
+    assert not rules.dealer_hits[18 + SOFT]
+
+
+def test_double_totals_compile_to_hard_only():
+    rules = compile_rules(Rules('nine_to_eleven', double_totals=(9, 10, 11)))
+    assert [rules.can_double[v] for v in (8, 9, 11, 12)] == [False, True, True, False]
+    assert not any(rules.can_double[SOFT:])
+
+
+def test_compile_accepts_names_rules_and_compiled():
+    compiled = compile_rules('downtown_6to5')
+    assert compile_rules(compiled) is compiled
+    assert compiled.blackjack_return == pytest.approx(2.2)
+    assert compiled.dealer_blackjack_wins
+    assert compile_rules(RULESETS['european']).dealer_blackjack_wins
+    with pytest.raises(ValueError):
+        compile_rules('reno')
@@ -0,0 +1,60 @@
+# test_scenarios.py
+import pytest
+
+import scenarios
+from scenarios import ResultCache, Scenario, cache_key, expand, load_config, run_sweep
+
+
+def test_expand_matrix_in_order(tmp_path):
+    path = tmp_path / 'sweep.toml'
+    path.write_text('seed = 7\nrounds = 5\n[matrix]\nnum_decks = [1, 6]\nnum_bots = [1, 2, 3]\n'
+                    'strategy = "basic"\n')
+    cells = expand(load_config(str(path)))
+    assert [(s.num_decks, s.num_bots) for s in cells] == [(1, 1), (1, 2), (1, 3), (6, 1), (6, 2), (6, 3)]
+    assert {(s.seed, s.rounds, s.strategy) for s in cells} == {(7, 5, 'basic')}
+
+
+def test_yaml_config(tmp_path):
+    pytest.importorskip('yaml')
+    path = tmp_path / 'sweep.yaml'
+    path.write_text('rounds: 5\ncontinuous: true\nmatrix:\n  rules: [house, european]\n  penetration: 0.5\n')
+    cells = expand(load_config(str(path)))
+    assert [s.rules for s in cells] == ['house', 'european']
+    assert {(s.continuous, s.penetration) for s in cells} == {(True, 0.5)}
+
+
+def test_unknown_settings_are_rejected():
+    with pytest.raises(ValueError, match='decks'):
+        expand({'matrix': {'decks': [1]}})
+    with pytest.raises(ValueError, match='seed'):
+        expand({'matrix': {'seed': [1, 2]}})
+
+
+def test_cache_key_covers_scenario_seed_and_code():
+    base = Scenario(rounds=5)
+    assert cache_key(base) == cache_key(Scenario(rounds=5))
+    assert cache_key(base) != cache_key(base._replace(seed=1))
+    assert cache_key(base) != cache_key(base._replace(num_bots=4))
+    assert cache_key(base, 'v1') != cache_key(base, 'v2')
+
+
+def test_rerun_is_served_from_cache(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path))
+    cells = expand({'rounds': 5, 'matrix': {'num_decks': [1, 2]}})
+    first = run_sweep(cells, workers=1, cache=cache)
+    assert [hit for _, _, hit in first] == [False, False]
+    assert first[0][1]['rounds'] == 5
+    computed = []
+    monkeypatch.setattr(scenarios, 'run_scenario', lambda s: computed.append(s) or {'rounds': 0})
+    more = expand({'rounds': 5, 'matrix': {'num_decks': [1, 2, 8]}})
+    second = run_sweep(more, workers=1, cache=cache)
+    assert [hit for _, _, hit in second] == [True, True, False]
+    assert [r for _, r, _ in second[:2]] == [r for _, r, _ in first]
+    assert computed == [more[2]]
+
+
+def test_pool_matches_serial():
+    cells = expand({'rounds': 5, 'tables': 2, 'matrix': {'num_bots': [1, 2]}})
+    serial = [result for _, result, _ in run_sweep(cells, workers=1)]
+    pooled = [result for _, result, _ in run_sweep(cells, workers=2)]
+    assert serial == pooled
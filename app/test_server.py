@@ -0,0 +1,97 @@
+# test_server.py
+import asyncio
+import json
+import time
+
+from server import TableServer, load_test
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def started(table_server):
+    server = await table_server.start()
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_session_plays_rounds_over_json_lines():
+    async def session():
+        server, port = await started(TableServer(num_bots=2, pace=0, max_rounds=2))
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'{"name": "Remote"}\n')
+            prompts, end = [], None
+            while end is None:
+                message = json.loads(await reader.readline())
+                if message['type'] == 'prompt':
+                    prompts.append(message)
+                    answer = '10' if prompts[-1]['actions'][0].startswith('Enter your bet') else 'stand'
+                    writer.write(json.dumps({'action': answer}).encode() + b'\n')
+                elif message['type'] == 'end':
+                    end = message
+            writer.close()
+        return prompts, end
+
+    prompts, end = run(session())
+    assert prompts[0]['balance'] == 100 and prompts[0]['hands'] == [[]]
+    assert end['rounds'] == 2
+
+
+def test_bot_pauses_do_not_block_other_tables():
+    async def scenario():
+        # Every round has at least two 1s pauses (bot bet, dealer reveal),
+        # scaled to 50ms: 20 tables x 2 rounds back to back would take 4s
+        server, port = await started(TableServer(num_bots=1, pace=0.05))
+        async with server:
+            start = time.perf_counter()
+            result = await load_test('127.0.0.1', port, tables=20, rounds=2, idle_tables=20)
+            return result, time.perf_counter() - start
+
+    result, elapsed = run(scenario())
+    assert result['actions'] >= 20 * 2 * 2
+    assert elapsed < 3
+
+
+def test_disconnect_closes_table():
+    async def scenario():
+        table_server = TableServer(num_bots=1, pace=0)
+        server, port = await started(table_server)
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'{"name": "Gone"}\n')
+            await reader.readline()
+            writer.close()
+            for _ in range(100):
+                if table_server.open_tables == 0:
+                    break
+                await asyncio.sleep(0.01)
+        return table_server
+
+    table_server = run(scenario())
+    assert table_server.open_tables == 0 and table_server.tables_served == 1
+
+
+def test_bad_lines_get_an_error_and_close_the_table():
+    async def scenario(hello, answer):
+        table_server = TableServer(num_bots=1, pace=0)
+        server, port = await started(table_server)
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(hello)
+            if answer is not None:
+                while json.loads(await reader.readline())['type'] != 'prompt':
+                    pass
+                writer.write(answer)
+            error = json.loads(await reader.readline())
+            assert await reader.read() == b''
+            writer.close()
+        return table_server, error
+
+    for hello, answer in [(b'[]\n', None), (b'5\n', None), (b'{"name": "A"}\n', b'[1]\n'),
+                          (b'{"name": "A"}\n', b'"hit"\n'), (b'{"name"\n', None),
+                          (b'{"name": "' + b'x' * 100_000 + b'"}\n', None),
+                          (b'{"name": "A"}\n', b'{"action": "' + b'x' * 100_000 + b'"}\n')]:
+        table_server, error = run(scenario(hello, answer))
+        assert error['type'] == 'error'
+        assert table_server.open_tables == 0
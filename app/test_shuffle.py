@@ -0,0 +1,99 @@
+# test_shuffle.py
+import random
+from collections import Counter
+
+import pytest
+
+from app import CARDS, Deck, Game
+from shuffle import GENERATORS, HmacDRBG, ShuffleEngine, _fisher_yates, regenerate, verify
+
+
+@pytest.mark.parametrize('generator', GENERATORS)
+def test_engines_permute_the_canonical_shoe_reproducibly(generator):
+    engine = ShuffleEngine(generator, seed=7)
+    first, second = CARDS * 2, CARDS * 2
+    record = engine.shuffle(first, 2)
+    assert sorted(first, key=CARDS.index) == sorted(CARDS * 2, key=CARDS.index)
+    assert first != CARDS * 2
+    assert regenerate(record) == first
+    # The next shoe gets the next seed; the same master seed replays both
+    assert engine.shuffle(second, 2).number == 1 and second != first
+    again = CARDS * 2
+    ShuffleEngine(generator, seed=7).shuffle(again, 2)
+    assert again == first
+
+
+def test_commitment_binds_the_seed_and_the_cards():
+    record = ShuffleEngine('drbg').shuffle(CARDS * 1, 1)
+    shoe = regenerate(record)
+    assert verify(record) and verify(record, shoe[:20])
+    assert not verify(record, shoe[1:21])
+    tampered = record._replace(seed=ShuffleEngine('drbg').shoe_seed(0).hex())
+    assert not verify(tampered)
+    assert not verify(record._replace(num_decks=2))
+
+
+def test_unseeded_engines_draw_a_secret_master_seed():
+    a, b = ShuffleEngine('pcg'), ShuffleEngine('pcg')
+    assert a.shoe_seed(0) != b.shoe_seed(0)
+    with pytest.raises(ValueError):
+        ShuffleEngine('lcg')
+
+
+def test_hmac_drbg_stream_and_random_api():
+    drbg = HmacDRBG(b'seed')
+    assert HmacDRBG(b'seed').generate(64) == drbg.generate(64)
+    assert HmacDRBG(b'other').generate(64) != HmacDRBG(b'seed').generate(64)
+    rng = HmacDRBG(1)
+    rolls = [rng.randint(1, 6) for _ in range(600)]
+    assert set(rolls) == {1, 2, 3, 4, 5, 6}
+    assert all(0 <= rng.random() < 1 for _ in range(100))
+
+
+def test_fisher_yates_is_uniform():
+    words = HmacDRBG(3).words()
+    counts = Counter()
+    for _ in range(6000):
+        items = [0, 1, 2]
+        _fisher_yates(items, words)
+        counts[tuple(items)] += 1
+    assert len(counts) == 6
+    assert all(800 < count < 1200 for count in counts.values())
+
+
+def test_deck_records_and_verifies_every_shoe():
+    deck = Deck(2, shuffler=ShuffleEngine('pcg', seed=11), penetration=0.5)
+    first = deck.shoe_record
+    dealt = [deck.deal_card() for _ in range(30)]
+    assert deck.dealt == dealt and verify(first, dealt)
+    deck.shuffle()
+    assert deck.shoe_record.number == first.number + 1
+    assert deck.rank_counts == [8] * 13
+
+
+def test_mid_round_reshuffle_is_recorded_and_verifies():
+    deck = Deck(1, shuffler=ShuffleEngine('drbg', seed=3), penetration=1.0)
+    first = deck.shoe_record
+    deck.start_round()
+    for _ in range(40):
+        deck.deal_card()
+    deck.start_round()
+    in_play = [deck.deal_card() for _ in range(12)]
+    drawn = [deck.deal_card() for _ in range(10)]
+    record = deck.shoe_record
+    assert record.number == first.number + 1
+    assert len(record.cards) == 40 and not set(in_play) & set(drawn)
+    assert deck.dealt == drawn and verify(record, drawn)
+    assert regenerate(record)[:10] == drawn
+    # The commitment covers which cards the tray held
+    assert not verify(record._replace(cards=record.cards[1:]))
+
+
+def test_game_with_shuffler_is_reproducible():
+    def play(seed):
+        game = Game(6, 3, interactive=False, rng=random.Random(1), shuffler=ShuffleEngine('drbg', seed=seed))
+        game.play(max_rounds=200)
+        return [p.balance for p in game.players], game.deck
+    balances, deck = play(5)
+    assert play(5)[0] == balances
+    assert verify(deck.shoe_record, deck.dealt)
@@ -0,0 +1,70 @@
+# test_strategy.py
+import random
+
+import pytest
+
+from app import Card, Game, Hand
+from strategy import load_strategy, parse_strategy
+
+
+def make_hand(*values):
+    hand = Hand()
+    for value in values:
+        hand.add_card(Card("♠️", value))
+    return hand
+
+
+def test_basic_strategy_cells():
+    basic = load_strategy('basic')
+    assert basic.lookup(16, False, None, 10) == 'H'
+    assert basic.lookup(12, False, None, 4) == 'S'
+    assert basic.lookup(18, True, None, 6) == 'X'
+    assert basic.lookup(16, False, 8, 11) == 'P'
+    assert basic.lookup(20, False, 10, 6) == 'S'
+
+
+def test_decide_falls_back_when_action_unavailable():
+    basic = load_strategy('basic')
+    dealer = Card("♥️", "6")
+    assert basic.decide(make_hand('5', '6'), dealer, True, False, random) == 'double down'
+    assert basic.decide(make_hand('5', '6'), dealer, False, False, random) == 'hit'
+    assert basic.decide(make_hand('A', '7'), dealer, False, False, random) == 'stand'
+    assert basic.decide(make_hand('8', '8'), dealer, True, True, random) == 'split'
+
+
+def test_legacy_table_matches_original_bot_rules():
+    legacy = load_strategy('legacy')
+    dealer = Card("♥️", "9")
+    values = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'A']
+    for a in values:
+        for b in values:
+            hand = make_hand(a, b)
+            value = hand.get_value()
+            if value == 21:
+                continue
+            action = legacy.decide(hand, dealer, True, a == b, random.Random(0))
+            if a == b:
+                assert action == 'split'
+            elif value == 11:
+                assert action == 'double down'
+            elif value < 11:
+                assert action == 'hit'
+            elif value <= 16:
+                assert action in ('hit', 'stand')
+            else:
+                assert action == 'stand'
+
+
+def test_parse_rejects_bad_rows():
+    with pytest.raises(ValueError):
+        parse_strategy("[hard]\n12: HHS\n")
+    with pytest.raises(ValueError):
+        parse_strategy("12: HHHHHHHHHH\n")
+    with pytest.raises(ValueError):
+        parse_strategy("[hard]\n12: HHHHHHHHHQ\n")
+
+
+def test_game_accepts_strategy_by_name():
+    game = Game(2, 2, interactive=False, strategy='basic', rng=random.Random(1))
+    game.play(max_rounds=20)
+    assert game.strategy.name == 'basic'